@@ -11,7 +11,13 @@ if [ "$1" = "rest" ]; then
 elif [ "$1" = "worker" ]; then
     echo "Starting Celery worker..."
     celery -A src.tasks worker --loglevel=info
+elif [ "$1" = "poller" ]; then
+    echo "Starting database queue poller..."
+    python -m src.poller
+elif [ "$1" = "beat" ]; then
+    echo "Starting Celery beat..."
+    celery -A src.tasks beat --loglevel=info
 else
-    echo "Invalid argument. Use 'rest' or 'worker'"
+    echo "Invalid argument. Use 'rest', 'worker', 'poller' or 'beat'"
     exit 1
 fi
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Сравнение классификатора по ключевым словам с прежней реализацией
+
+Прежняя реализация (`AIService.analyze_text` до появления `RuleClassifier`)
+для каждой категории проверяет `any(word in text.lower() ...)`, то есть
+работает за O(категорий x слов x длина текста). `RuleClassifier` просматривает
+пакет текстов одним проходом скомпилированного регулярного выражения.
+`NaiveBayesClassifier` (обученный на синтетической разметке) оценивает все
+категории пакета одним векторизованным произведением.
+
+Запуск:
+    python -m scripts.bench_classifier [--categories 300] [--keywords 10] [--texts 2000]
+"""
+
+import argparse
+import random
+import string
+import time
+from typing import Dict, List
+
+from src.config.classifier import ClassifierRule
+from src.services.classifier import RuleClassifier
+from src.services.vector_classifier import NaiveBayesClassifier
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+
+
+def legacy_classify(rules: Dict[str, List[str]], text: str) -> str:
+    """Прежний алгоритм: первая категория, хотя бы одно слово которой входит в текст"""
+    for category, keywords in rules.items():
+        if any(word in text.lower() for word in keywords):
+            return category
+    return "info"
+
+
+def main(categories: int, keywords: int, texts: int) -> None:
+    rng = random.Random(42)
+    rules = {
+        f"category_{i}": [random_word(rng) for _ in range(keywords)]
+        for i in range(categories)
+    }
+    vocabulary = [word for words in rules.values() for word in words]
+    samples = [
+        " ".join(
+            rng.choice(vocabulary) if rng.random() < 0.1 else random_word(rng)
+            for _ in range(30)
+        )
+        for _ in range(texts)
+    ]
+
+    start = time.perf_counter()
+    classifier = RuleClassifier(
+        [ClassifierRule(category=c, keywords=k) for c, k in rules.items()]
+    )
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in samples:
+        legacy_classify(rules, text)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in samples:
+        classifier.classify(text)
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    classifier.classify_batch(samples)
+    batch_time = time.perf_counter() - start
+
+    labels = [classifier.classify(text)["category"] for text in samples]
+    model = NaiveBayesClassifier.train(samples, labels)
+
+    start = time.perf_counter()
+    for text in samples:
+        model.classify(text)
+    model_single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.classify_batch(samples)
+    model_batch_time = time.perf_counter() - start
+
+    print(
+        f"{categories} categories x {keywords} keywords, {texts} texts "
+        f"(compile: {compile_time * 1e3:.1f} ms)"
+    )
+    print(f"{'implementation':<34} {'texts/s':>12} {'speedup':>8}")
+    for name, elapsed in (
+        ("legacy any(word in text)", legacy_time),
+        ("RuleClassifier.classify", single_time),
+        ("RuleClassifier.classify_batch", batch_time),
+        ("NaiveBayesClassifier.classify", model_single_time),
+        ("NaiveBayesClassifier.classify_batch", model_batch_time),
+    ):
+        print(f"{name:<34} {texts / elapsed:>12.0f} {legacy_time / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--categories", type=int, default=300)
+    parser.add_argument("--keywords", type=int, default=10)
+    parser.add_argument("--texts", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.categories, args.keywords, args.texts)
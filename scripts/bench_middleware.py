@@ -0,0 +1,144 @@
+"""Накладные расходы промежуточных слоев на запрос
+
+Сравниваются прежняя реализация (`BaseHTTPMiddleware` для кэша и
+`@app.middleware("http")` для логирования, буферизация тела конкатенацией)
+и текущие ASGI-middleware. Для каждого сценария выводится среднее время
+запроса в микросекундах:
+
+- `hit` - ответ из кэша
+- `miss` - ответ вычисляется и записывается в кэш (уникальный query на запрос)
+- `stream` - промах с потоковым ответом из 1000 фрагментов по 1 КиБ
+- `bypass` - запрос к некэшируемому эндпоинту
+
+Запуск:
+    python -m scripts.bench_middleware [-n 2000]
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+import uuid
+from typing import Awaitable, Callable, Dict
+
+from aiocache import Cache
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.logger import logger
+from src.middlewares.cache import CacheMiddleware
+from src.middlewares.logging import RequestLoggingMiddleware
+
+ENDPOINTS: Dict[str, int] = {"/hit": 60, "/miss": 60, "/stream": 60}
+SCENARIOS = ("hit", "miss", "stream", "bypass")
+
+
+class LegacyCacheMiddleware(BaseHTTPMiddleware):
+    """Прежняя схема кэширования: `call_next` и буферизация через `+=`"""
+
+    def __init__(self, app, cache: Cache, cached_endpoints: Dict[str, int]):
+        super().__init__(app)
+        self._cache = cache
+        self._ttls = cached_endpoints
+
+    async def dispatch(self, request: Request, call_next):
+        ttl = self._ttls.get(request.url.path)
+        if request.method != "GET" or ttl is None:
+            return await call_next(request)
+        key = f"{request.url.path}?{request.query_params}"
+        cached = await self._cache.get(key)
+        if cached is not None:
+            return Response(**cached)
+        response = await call_next(request)
+        content = b""
+        async for chunk in response.body_iterator:
+            content += chunk
+        data = {
+            "content": content,
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+        }
+        await self._cache.set(key, data, ttl=ttl)
+        return Response(**data)
+
+
+async def legacy_log_requests(request: Request, call_next):
+    """Прежнее логирование запросов через `@app.middleware("http")`"""
+    request_id = str(uuid.uuid4())
+    with logger.contextualize(request_id=request_id):
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/hit")
+    @app.get("/miss")
+    @app.get("/bypass")
+    async def payload():
+        return {"items": list(range(100))}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(1000):
+                yield b"x" * 1024
+
+        return StreamingResponse(chunks())
+
+    cache = Cache(Cache.MEMORY)
+    if legacy:
+        app.add_middleware(
+            LegacyCacheMiddleware, cache=cache, cached_endpoints=ENDPOINTS
+        )
+        app.middleware("http")(legacy_log_requests)
+    else:
+        app.add_middleware(CacheMiddleware, cache=cache, cached_endpoints=ENDPOINTS)
+        app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+async def measure(request: Callable[[], Awaitable], n: int) -> float:
+    """Среднее время запроса в микросекундах"""
+    await request()
+    start = time.perf_counter()
+    for _ in range(n):
+        await request()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def main(n: int) -> None:
+    logger.remove()
+    results: Dict[str, Dict[str, float]] = {}
+    for name, legacy in (("before", True), ("after", False)):
+        transport = ASGITransport(app=build_app(legacy))
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            counter = itertools.count()
+
+            def request(scenario: str) -> Awaitable:
+                # Для промахов каждый запрос получает новый ключ кэша
+                params = {"i": next(counter)} if scenario != "hit" else None
+                return client.get(f"/{scenario}", params=params)
+
+            results[name] = {
+                scenario: await measure(
+                    lambda: request(scenario),
+                    n if scenario != "stream" else max(n // 20, 1),
+                )
+                for scenario in SCENARIOS
+            }
+
+    print(f"{'scenario':<10} {'before, us':>12} {'after, us':>12} {'speedup':>8}")
+    for scenario in SCENARIOS:
+        before, after = results["before"][scenario], results["after"][scenario]
+        print(f"{scenario:<10} {before:>12.1f} {after:>12.1f} {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=2000, help="Число запросов на сценарий")
+    asyncio.run(main(parser.parse_args().n))
@@ -0,0 +1,93 @@
+"""Отчет об индексах, используемых запросами `NotificationService.get_list`
+
+Для каждой типовой комбинации фильтров строится запрос первой страницы и
+выполняется `EXPLAIN`. Выводится список задействованных индексов либо
+`SEQUENTIAL SCAN`, если индекс не используется.
+
+Запуск:
+    CONFIG_FILE=./configs/config.yaml python -m scripts.explain_get_list
+"""
+
+import asyncio
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+from uuid import uuid4
+
+from src.config import Config
+from src.db import create_tables, get_db, init_engine
+from src.models import ProcessingStatus
+from src.services.notification_service import NotificationService
+from src.sql import Explain
+
+USER_ID = uuid4()
+
+COMBINATIONS: Dict[str, Dict[str, Any]] = {
+    "no filters": {},
+    "user_id": {"user_id": USER_ID},
+    "user_id + is_read=false": {"user_id": USER_ID, "is_read": False},
+    "user_id + is_read=true": {"user_id": USER_ID, "is_read": True},
+    "user_id + category (strict)": {
+        "user_id": USER_ID,
+        "category": "info",
+        "category_strict": True,
+    },
+    "user_id + processing_status": {
+        "user_id": USER_ID,
+        "processing_status": ProcessingStatus.PENDING,
+    },
+    "category (strict)": {"category": "info", "category_strict": True},
+    "processing_status": {"processing_status": ProcessingStatus.PENDING},
+    "created_at range": {
+        "created_at_start": datetime(2024, 1, 1),
+        "created_at_end": datetime(2024, 12, 31),
+    },
+}
+
+SQLITE_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+
+
+def _postgres_indexes(node: Dict[str, Any]) -> List[str]:
+    """Собрать имена индексов из узла JSON-плана PostgreSQL и его потомков"""
+    names = [node["Index Name"]] if "Index Name" in node else []
+    for child in node.get("Plans", []):
+        names.extend(_postgres_indexes(child))
+    return names
+
+
+def used_indexes(dialect: str, rows: Sequence[Any]) -> List[str]:
+    """Извлечь имена индексов из результата `EXPLAIN`
+
+    Аргументы:
+        dialect (str): Имя диалекта SQLAlchemy
+        rows (Sequence[Any]): Строки результата `Explain`
+
+    Возвращает:
+        List[str]: Имена использованных индексов
+    """
+    if dialect == "postgresql":
+        plan = rows[0][0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return _postgres_indexes(plan[0]["Plan"])
+    return [match.group(1) for row in rows for match in SQLITE_INDEX.finditer(row[-1])]
+
+
+async def main() -> None:
+    await init_engine(Config.db)
+    await create_tables()
+    async with get_db() as db:
+        dialect = db.get_bind().dialect.name
+        print(f"Dialect: {dialect}")
+        for name, filters in COMBINATIONS.items():
+            query, _ = NotificationService.build_query(**filters)
+            rows = (
+                await db.execute(Explain(NotificationService.paginate(query)))
+            ).all()
+            indexes = used_indexes(dialect, rows)
+            print(f"{name:<32} {', '.join(indexes) or 'SEQUENTIAL SCAN'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
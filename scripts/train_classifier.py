@@ -0,0 +1,46 @@
+"""Обучение модели `NaiveBayesClassifier` для категоризации уведомлений
+
+Входной файл - JSONL с объектами `{"text": ..., "category": ...}` или CSV
+с колонками `text` и `category`. Модель сохраняется каталогом, путь к
+которому указывается в `classifier.model_path` конфигурации; работающие
+процессы подхватывают новую модель без перезапуска.
+
+Запуск:
+    python -m scripts.train_classifier data.jsonl ./models/classifier [--features 262144]
+"""
+
+import argparse
+import csv
+import json
+from typing import List, Tuple
+
+from src.services.vector_classifier import NaiveBayesClassifier
+
+
+def read_samples(path: str) -> Tuple[List[str], List[str]]:
+    with open(path, encoding="utf-8", newline="") as file:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(file))
+        else:
+            rows = [json.loads(line) for line in file if line.strip()]
+    return [row["text"] for row in rows], [row["category"] for row in rows]
+
+
+def main(source: str, target: str, features: int, alpha: float) -> None:
+    texts, labels = read_samples(source)
+    model = NaiveBayesClassifier.train(texts, labels, features, alpha)
+    model.save(target)
+    print(
+        f"Trained on {len(texts)} texts: {len(model.categories)} categories, "
+        f"version {model.version} -> {target}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source")
+    parser.add_argument("target")
+    parser.add_argument("--features", type=int, default=2**18)
+    parser.add_argument("--alpha", type=float, default=1.0)
+    args = parser.parse_args()
+    main(args.source, args.target, args.features, args.alpha)
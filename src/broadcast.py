@@ -0,0 +1,207 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Dict, Set
+
+from redis.asyncio import Redis
+
+from .logger import logger
+
+Message = Dict[str, Any]
+
+
+class Subscription:
+    """Очередь сообщений одного подписчика канала
+
+    Очередь ограничена `max_size` сообщениями: если подписчик не успевает их
+    забирать, самые старые сообщения отбрасываются.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self._queue: asyncio.Queue[Message] = asyncio.Queue(max_size)
+
+    def put(self, message: Message) -> None:
+        """Добавить сообщение, вытесняя самое старое при переполнении"""
+        if self._queue.full():
+            self._queue.get_nowait()
+            logger.warning("Slow subscriber: broadcast message dropped")
+        self._queue.put_nowait(message)
+
+    async def get(self) -> Message:
+        """Дождаться следующего сообщения"""
+        return await self._queue.get()
+
+    def __aiter__(self) -> AsyncIterator[Message]:
+        return self
+
+    async def __anext__(self) -> Message:
+        return await self.get()
+
+
+class MemoryBroadcaster:
+    """Рассылка сообщений подписчикам каналов внутри процесса
+
+    Подходит для одного процесса API и тестов: сообщения, опубликованные
+    другими процессами (например, воркерами), не доставляются.
+
+    Аргументы:
+        queue_size (int, optional): Размер очереди каждого подписчика
+    """
+
+    def __init__(self, queue_size: int = 100) -> None:
+        self._queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def _deliver(self, channel: str, message: Message) -> None:
+        for subscription in list(self._subscribers.get(channel, ())):
+            subscription.put(message)
+
+    async def publish(self, channel: str, message: Message) -> None:
+        """Опубликовать сообщение в канал
+
+        Аргументы:
+            channel (str): Канал
+            message (Message): JSON-совместимое сообщение
+        """
+        self._deliver(channel, message)
+
+    async def _listen(self, channel: str) -> None:
+        """Вызывается при появлении первого подписчика канала в процессе"""
+
+    async def _unlisten(self, channel: str) -> None:
+        """Вызывается после ухода последнего подписчика канала в процессе"""
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[Subscription]:
+        """Подписаться на канал на время блока `async with`
+
+        Аргументы:
+            channel (str): Канал
+
+        Возвращает:
+            AsyncIterator[Subscription]: Очередь сообщений канала
+        """
+        subscription = Subscription(self._queue_size)
+        subscribers = self._subscribers.setdefault(channel, set())
+        subscribers.add(subscription)
+        if len(subscribers) == 1:
+            await self._listen(channel)
+        try:
+            yield subscription
+        finally:
+            subscribers.discard(subscription)
+            if not subscribers and self._subscribers.get(channel) is subscribers:
+                del self._subscribers[channel]
+                with suppress(Exception):
+                    await self._unlisten(channel)
+
+    async def release(self) -> None:
+        """Освободить ресурсы текущего цикла событий перед его завершением"""
+
+    async def close(self) -> None:
+        """Освободить ресурсы"""
+
+
+class RedisBroadcaster(MemoryBroadcaster):
+    """Рассылка сообщений между процессами через Redis pub/sub
+
+    Сообщения публикуются в Redis любым процессом (API или воркером).
+    Каждый процесс API держит одно pub/sub-соединение, подписанное на каналы
+    своих локальных подписчиков, и раздает полученные сообщения их очередям.
+
+    Аргументы:
+        uri (str): Адрес Redis
+        queue_size (int, optional): Размер очереди каждого подписчика
+    """
+
+    def __init__(self, uri: str, queue_size: int = 100) -> None:
+        super().__init__(queue_size)
+        self._uri = uri
+        self._clients: Dict[asyncio.AbstractEventLoop, Redis] = {}
+        self._pubsub: Any = None
+        self._reader: asyncio.Task | None = None
+
+    def _client(self) -> Redis:
+        """Клиент Redis текущего цикла событий
+
+        Соединения клиента привязаны к циклу событий, а синхронные задачи
+        воркера выполняются каждая в собственном цикле. Такой цикл закрывает
+        своего клиента вызовом `release` перед завершением.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            for closed in [key for key in self._clients if key.is_closed()]:
+                del self._clients[closed]
+            client = self._clients[loop] = Redis.from_url(self._uri)
+        return client
+
+    async def publish(self, channel: str, message: Message) -> None:
+        await self._client().publish(channel, json.dumps(message, default=str))
+
+    async def _listen(self, channel: str) -> None:
+        if self._pubsub is None:
+            self._pubsub = self._client().pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(channel)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+
+    async def _unlisten(self, channel: str) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(channel)
+
+    async def _read(self) -> None:
+        """Раздача сообщений из Redis локальным подписчикам"""
+        while self._subscribers:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Broadcast receive error: {e}")
+                await asyncio.sleep(1)
+                continue
+            if message is None or message["type"] != "message":
+                continue
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            try:
+                self._deliver(channel, json.loads(message["data"]))
+            except ValueError as e:
+                logger.warning(f"Broadcast message decode error: {e}")
+
+    async def release(self) -> None:
+        if self._pubsub is not None:
+            return
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._reader
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        for loop, client in list(self._clients.items()):
+            if loop is asyncio.get_running_loop():
+                await client.aclose()
+        self._clients.clear()
+
+
+def create_broadcaster(uri: str | None, queue_size: int = 100) -> MemoryBroadcaster:
+    """Создать рассыльщик: через Redis, если задан `uri`, иначе - внутри процесса"""
+    if uri is None:
+        return MemoryBroadcaster(queue_size)
+    return RedisBroadcaster(uri, queue_size)
+
+
+__all__ = [
+    "MemoryBroadcaster",
+    "RedisBroadcaster",
+    "Subscription",
+    "create_broadcaster",
+]
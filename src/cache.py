@@ -0,0 +1,184 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+
+from aiocache import Cache
+from aiocache.base import BaseCache
+from aiocache.serializers import JsonSerializer
+
+_NO_TTL = object()
+# Значение L1 для ключа, отсутствующего в L2 (например, версии тега, который
+# еще не инвалидировался)
+_ABSENT = object()
+
+
+def estimate_size(value: Any) -> int:
+    """Приблизительный размер значения в байтах для учета лимита L1-кэша"""
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_size(k) + estimate_size(v) for k, v in value.items()) + 8
+    if isinstance(value, (list, tuple, set)):
+        return sum(estimate_size(item) for item in value) + 8
+    return 8
+
+
+class BytesJsonSerializer(JsonSerializer):
+    """JSON-сериализатор, получающий значения от бэкенда без декодирования
+
+    Бэкенд Redis декодирует прочитанные значения в кодировке сериализатора,
+    а записи ответов (см. `cache_codec`) бинарные и не являются UTF-8.
+    Значения читаются как `bytes`, из которых разбирается JSON.
+    """
+
+    DEFAULT_ENCODING = None
+
+
+def create_backend(uri: str) -> BaseCache:
+    """Создать бэкенд aiocache по адресу `uri` для бинарных и JSON-значений"""
+    cache = Cache.from_url(uri)
+    cache.serializer = BytesJsonSerializer()
+    return cache
+
+
+class LRUCache:
+    """Ограниченный по размеру в байтах LRU-кэш в памяти процесса"""
+
+    _entries: "OrderedDict[str, Tuple[Any, int, float]]"
+
+    def __init__(self, max_bytes: int, max_ttl: float) -> None:
+        self.max_bytes = max_bytes
+        self.max_ttl = max_ttl
+        self.size = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any | None:
+        """Получить значение и отметить его как недавно использованное"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, _, expires_at = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """Сохранить значение на `min(ttl, max_ttl)` секунд, вытесняя давно не использованные"""
+        self.delete(key)
+        size = estimate_size(value) + len(key)
+        if size > self.max_bytes:
+            return
+        ttl = self.max_ttl if ttl is None else min(ttl, self.max_ttl)
+        self._entries[key] = (value, size, time.monotonic() + ttl)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def delete(self, key: str) -> None:
+        """Удалить значение"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self) -> None:
+        """Очистить кэш"""
+        self._entries.clear()
+        self.size = 0
+
+
+class TieredCache:
+    """Двухуровневый кэш: L1 в памяти процесса перед общим бэкендом aiocache (L2)
+
+    Чтения сначала обслуживаются из L1, промахи - из L2 с сохранением результата
+    в L1. Отсутствие ключа в L2 тоже запоминается в L1, поэтому повторные
+    чтения отсутствующих ключей (версий тегов) не обращаются к L2. Записи и
+    инкременты выполняются в L2 и дублируются в L1. Изменения, сделанные
+    другими процессами, становятся видны не позже чем через `l1_ttl` секунд,
+    поэтому этот лимит должен быть небольшим.
+    При `l1_max_bytes == 0` L1 отключен и обертка только ведет статистику L2.
+    """
+
+    def __init__(self, l2: BaseCache, l1_max_bytes: int, l1_ttl: float) -> None:
+        self.l1 = LRUCache(l1_max_bytes, l1_ttl)
+        self.l1_enabled = l1_max_bytes > 0
+        self.l2 = l2
+        self._counters = {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0}
+
+    def _count(self, tier: str, hit: bool) -> None:
+        self._counters[f"{tier}_{'hits' if hit else 'misses'}"] += 1
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        value = await self.multi_get([key])
+        return default if value[0] is None else value[0]
+
+    async def multi_get(self, keys: Sequence[str], **kwargs: Any) -> List[Any]:
+        values = (
+            [self.l1.get(key) for key in keys]
+            if self.l1_enabled
+            else [None] * len(keys)
+        )
+        missing = [i for i, value in enumerate(values) if value is None]
+        if self.l1_enabled:
+            self._counters["l1_hits"] += len(keys) - len(missing)
+            self._counters["l1_misses"] += len(missing)
+        if missing:
+            fetched = await self.l2.multi_get([keys[i] for i in missing], **kwargs)
+            for i, value in zip(missing, fetched):
+                self._count("l2", value is not None)
+                values[i] = value
+                self.l1.set(keys[i], _ABSENT if value is None else value)
+        return [None if value is _ABSENT else value for value in values]
+
+    async def set(
+        self, key: str, value: Any, ttl: Any = _NO_TTL, **kwargs: Any
+    ) -> bool:
+        if ttl is _NO_TTL:
+            result = await self.l2.set(key, value, **kwargs)
+            self.l1.set(key, value)
+        else:
+            result = await self.l2.set(key, value, ttl=ttl, **kwargs)
+            self.l1.set(key, value, ttl)
+        return result
+
+    async def multi_set(
+        self, pairs: Sequence[Tuple[str, Any]], ttl: Any = _NO_TTL, **kwargs: Any
+    ) -> bool:
+        if ttl is _NO_TTL:
+            result = await self.l2.multi_set(pairs, **kwargs)
+        else:
+            result = await self.l2.multi_set(pairs, ttl=ttl, **kwargs)
+        for key, value in pairs:
+            self.l1.set(key, value, None if ttl is _NO_TTL else ttl)
+        return result
+
+    async def increment(self, key: str, delta: int = 1) -> int:
+        value = await self.l2.increment(key, delta)
+        self.l1.set(key, value)
+        return value
+
+    async def delete(self, key: str) -> int:
+        self.l1.delete(key)
+        return await self.l2.delete(key)
+
+    async def clear(self) -> bool:
+        self.l1.clear()
+        return await self.l2.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики попаданий и промахов по уровням и заполненность L1"""
+        return {**self._counters, "l1_entries": len(self.l1), "l1_bytes": self.l1.size}
+
+
+__all__ = [
+    "BytesJsonSerializer",
+    "LRUCache",
+    "TieredCache",
+    "create_backend",
+    "estimate_size",
+]
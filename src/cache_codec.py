@@ -0,0 +1,301 @@
+import gzip
+import struct
+import time
+from typing import Any, Dict, List, Literal, Tuple
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - необязательная зависимость
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - необязательная зависимость
+    zstandard = None
+
+from .logger import logger
+
+Compression = Literal["none", "gzip", "zstd"]
+
+# Идентификаторы алгоритмов сжатия в заголовке записи
+COMPRESSION_IDS: Dict[str, int] = {"none": 0, "gzip": 1, "zstd": 2}
+
+# Маркер формата записи: записи другого формата (например, сохраненные до
+# появления кодека) считаются отсутствующими
+MAGIC = 0xC1
+
+
+def _compress(algorithm: int, data: bytes, level: int | None) -> bytes:
+    if algorithm == COMPRESSION_IDS["gzip"]:
+        return gzip.compress(data, compresslevel=level or 6, mtime=0)
+    return zstandard.ZstdCompressor(level=level or 3).compress(data)
+
+
+def _decompress(algorithm: int, data: bytes) -> bytes:
+    if algorithm == COMPRESSION_IDS["none"]:
+        return data
+    if algorithm == COMPRESSION_IDS["gzip"]:
+        return gzip.decompress(data)
+    if zstandard is None:
+        raise ValueError("zstd-compressed cache entry requires `zstandard`")
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+class CodecMetrics:
+    """Статистика кодирования записей кэша по маршрутам (режим измерения)"""
+
+    _routes: Dict[str, Dict[str, float]]
+
+    def __init__(self) -> None:
+        self._routes = {}
+
+    def _route(self, route: str) -> Dict[str, float]:
+        return self._routes.setdefault(
+            route,
+            {
+                "writes": 0,
+                "reads": 0,
+                "raw_bytes": 0,
+                "stored_bytes": 0,
+                "encode_seconds": 0.0,
+                "decode_seconds": 0.0,
+            },
+        )
+
+    def record_encode(
+        self, route: str, raw_size: int, stored_size: int, seconds: float
+    ) -> None:
+        stats = self._route(route)
+        stats["writes"] += 1
+        stats["raw_bytes"] += raw_size
+        stats["stored_bytes"] += stored_size
+        stats["encode_seconds"] += seconds
+
+    def record_decode(self, route: str, seconds: float) -> None:
+        stats = self._route(route)
+        stats["reads"] += 1
+        stats["decode_seconds"] += seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Средние значения по маршрутам: байт на ключ и время кодирования в мкс"""
+        result = {}
+        for route, stats in self._routes.items():
+            writes, reads = stats["writes"] or 1, stats["reads"] or 1
+            result[route] = {
+                "writes": stats["writes"],
+                "reads": stats["reads"],
+                "raw_bytes_per_key": round(stats["raw_bytes"] / writes),
+                "stored_bytes_per_key": round(stats["stored_bytes"] / writes),
+                "encode_us": round(stats["encode_seconds"] / writes * 1e6, 1),
+                "decode_us": round(stats["decode_seconds"] / reads * 1e6, 1),
+            }
+        return result
+
+
+class EntryCodec:
+    """Компактный бинарный формат записи кэша ответа
+
+    Запись - это заголовок фиксированной длины (маркер формата, алгоритм
+    сжатия, статус, срок свежести, число тегов), версии тегов, ETag,
+    `Content-Type` и тело ответа. Остальные заголовки ответа не хранятся:
+    `Content-Length` вычисляется заново при отдаче из кэша.
+    Тело сжимается, если его размер не меньше `compress_threshold` байт.
+
+    Аргументы:
+        compression (Compression, optional): Алгоритм сжатия тела. По умолчанию - без сжатия.
+        compress_threshold (int, optional): Минимальный размер тела для сжатия в байтах
+        compress_level (int | None, optional): Уровень сжатия. По умолчанию - стандартный для алгоритма.
+        measure (bool, optional): Собирать статистику размеров и времени кодирования
+
+    Вызывает исключения:
+        ValueError: Библиотека выбранного алгоритма сжатия не установлена
+    """
+
+    name = "binary"
+
+    _HEADER = struct.Struct("!BBHdB")
+
+    def __init__(
+        self,
+        compression: Compression = "none",
+        compress_threshold: int = 1024,
+        compress_level: int | None = None,
+        measure: bool = False,
+    ) -> None:
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the `zstandard` package")
+        self._compression = COMPRESSION_IDS[compression]
+        self._compress_threshold = compress_threshold
+        self._compress_level = compress_level
+        self.metrics = CodecMetrics() if measure else None
+
+    def encode(self, entry: Dict[str, Any], route: str = "") -> bytes:
+        """Закодировать запись кэша
+
+        Аргументы:
+            entry (Dict[str, Any]): Запись с ключами `content`, `status_code`,
+                `media_type`, `etag`, `tags` (список версий) и `expires_at`
+            route (str, optional): Маршрут для статистики режима измерения
+
+        Возвращает:
+            bytes: Закодированная запись
+        """
+        start = time.perf_counter()
+        content = entry["content"]
+        algorithm = COMPRESSION_IDS["none"]
+        if self._compression != algorithm and len(content) >= self._compress_threshold:
+            algorithm = self._compression
+            content = _compress(algorithm, content, self._compress_level)
+        raw = self._pack(entry, algorithm, content)
+        if self.metrics is not None:
+            self.metrics.record_encode(
+                route, len(entry["content"]), len(raw), time.perf_counter() - start
+            )
+        return raw
+
+    def decode(self, raw: Any, route: str = "") -> Dict[str, Any] | None:
+        """Раскодировать запись кэша
+
+        Аргументы:
+            raw (Any): Значение из кэша
+            route (str, optional): Маршрут для статистики режима измерения
+
+        Возвращает:
+            Dict[str, Any] | None: Запись или `None`, если значение в другом формате
+        """
+        if not isinstance(raw, (bytes, bytearray)):
+            return None
+        start = time.perf_counter()
+        try:
+            entry, algorithm, content = self._unpack(bytes(raw))
+            entry["content"] = _decompress(algorithm, content)
+        except Exception as e:
+            logger.warning(f"Cache entry decode error: {e}")
+            return None
+        if self.metrics is not None:
+            self.metrics.record_decode(route, time.perf_counter() - start)
+        return entry
+
+    def _pack(self, entry: Dict[str, Any], algorithm: int, content: bytes) -> bytes:
+        tags: List[int] = entry["tags"]
+        etag = entry["etag"].encode("latin-1")
+        media_type = (entry["media_type"] or "").encode("latin-1")
+        return b"".join(
+            (
+                self._HEADER.pack(
+                    MAGIC,
+                    algorithm,
+                    entry["status_code"],
+                    entry["expires_at"],
+                    len(tags),
+                ),
+                struct.pack(f"!{len(tags)}Q", *tags),
+                struct.pack("!H", len(etag)),
+                etag,
+                struct.pack("!H", len(media_type)),
+                media_type,
+                content,
+            )
+        )
+
+    def _unpack(self, raw: bytes) -> Tuple[Dict[str, Any], int, bytes]:
+        magic, algorithm, status_code, expires_at, count = self._HEADER.unpack_from(raw)
+        if magic != MAGIC:
+            raise ValueError("unknown cache entry format")
+        offset = self._HEADER.size
+        tags = list(struct.unpack_from(f"!{count}Q", raw, offset))
+        offset += 8 * count
+        fields = []
+        for _ in range(2):
+            (size,) = struct.unpack_from("!H", raw, offset)
+            fields.append(raw[offset + 2 : offset + 2 + size].decode("latin-1"))
+            offset += 2 + size
+        etag, media_type = fields
+        entry = {
+            "status_code": status_code,
+            "expires_at": expires_at,
+            "tags": tags,
+            "etag": etag,
+            "media_type": media_type or None,
+        }
+        return entry, algorithm, raw[offset:]
+
+
+class MsgpackEntryCodec(EntryCodec):
+    """Формат записи кэша на основе msgpack (требует пакет `msgpack`)
+
+    Хранит те же поля, что и `EntryCodec`, массивом msgpack.
+    """
+
+    name = "msgpack"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        if msgpack is None:
+            raise ValueError("msgpack cache codec requires the `msgpack` package")
+        super().__init__(*args, **kwargs)
+
+    def _pack(self, entry: Dict[str, Any], algorithm: int, content: bytes) -> bytes:
+        return msgpack.packb(
+            [
+                MAGIC,
+                algorithm,
+                entry["status_code"],
+                entry["expires_at"],
+                entry["tags"],
+                entry["etag"],
+                entry["media_type"],
+                content,
+            ]
+        )
+
+    def _unpack(self, raw: bytes) -> Tuple[Dict[str, Any], int, bytes]:
+        magic, algorithm, status_code, expires_at, tags, etag, media_type, content = (
+            msgpack.unpackb(raw)
+        )
+        if magic != MAGIC:
+            raise ValueError("unknown cache entry format")
+        entry = {
+            "status_code": status_code,
+            "expires_at": expires_at,
+            "tags": tags,
+            "etag": etag,
+            "media_type": media_type,
+        }
+        return entry, algorithm, content
+
+
+CODECS = {codec.name: codec for codec in (EntryCodec, MsgpackEntryCodec)}
+
+
+def create_codec(name: str = "binary", **kwargs: Any) -> EntryCodec:
+    """Создать кодек записей кэша по имени
+
+    Аргументы:
+        name (str, optional): Имя формата (`binary` или `msgpack`)
+        **kwargs: Параметры `EntryCodec`
+
+    Возвращает:
+        EntryCodec: Кодек записей
+
+    Вызывает исключения:
+        ValueError: Неизвестный формат или не установлена необходимая библиотека
+    """
+    if name not in CODECS:
+        raise ValueError(f"Unknown cache codec: {name}")
+    return CODECS[name](**kwargs)
+
+
+def identity(value: Any) -> Any:
+    """Передача значения в бэкенд кэша без сериализации (записи уже закодированы)"""
+    return value
+
+
+__all__ = [
+    "CODECS",
+    "CodecMetrics",
+    "Compression",
+    "EntryCodec",
+    "MsgpackEntryCodec",
+    "create_codec",
+    "identity",
+]
@@ -1,6 +1,7 @@
 from typing import Tuple, Type
 import os
 
+from pydantic import Field
 from pydantic_settings import (
     BaseSettings,
     PydanticBaseSettingsSource,
@@ -8,11 +9,15 @@ from pydantic_settings import (
     YamlConfigSettingsSource,
 )
 
+from .analysis_cache import AnalysisCacheConfig
+from .broadcast import BroadcastConfig
 from .broker import BrokerConfig
 from .cache import CacheConfig
+from .classifier import ClassifierConfig
 from .db import DBConfig
 from .logger import LoggerConfig
 from .server import ServerConfig
+from .worker import WorkerConfig
 
 
 class _Config(BaseSettings):
@@ -29,6 +34,10 @@ class _Config(BaseSettings):
     broker: BrokerConfig
     server: ServerConfig
     logger: LoggerConfig
+    worker: WorkerConfig = Field(default_factory=WorkerConfig)
+    classifier: ClassifierConfig = Field(default_factory=ClassifierConfig)
+    analysis_cache: AnalysisCacheConfig = Field(default_factory=AnalysisCacheConfig)
+    broadcast: BroadcastConfig = Field(default_factory=BroadcastConfig)
 
     @classmethod
     def settings_customise_sources(
@@ -42,6 +51,6 @@ class _Config(BaseSettings):
         return (YamlConfigSettingsSource(settings_cls),)
 
 
-Config = _Config()  # type:ignore[call-arg]
+Config = _Config()  # type: ignore[call-arg]
 
 __all__ = ["Config"]
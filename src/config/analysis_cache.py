@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+
+
+class AnalysisCacheConfig(BaseModel):
+    """Конфигурация кэша результатов анализа текстов уведомлений
+
+    Результаты хранятся в LRU-кэше процесса размером до `l1_max_bytes` байт
+    (`0` - отключен) и, если задан `uri`, в общем бэкенде aiocache (например,
+    Redis) на `ttl` секунд. Вытеснением в общем бэкенде управляет его
+    собственная политика (`maxmemory-policy` Redis). Общие счетчики попаданий
+    и промахов пополняются не чаще раза в `stats_interval` секунд.
+    """
+
+    l1_max_bytes: int = Field(default=16777216, ge=0)
+    l1_ttl: float = Field(default=3600, gt=0)
+    uri: str | None = Field(default=None)
+    ttl: int = Field(default=86400, gt=0)
+    stats_interval: float = Field(default=10, ge=0)
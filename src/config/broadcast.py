@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+
+
+class BroadcastConfig(BaseModel):
+    """Конфигурация рассылки событий уведомлений (SSE/WebSocket)
+
+    Без `uri` события рассылаются внутри процесса, что подходит только для
+    одного процесса API без отдельных воркеров. С `uri` (Redis) события,
+    опубликованные воркерами и любыми процессами API, доходят до подписчиков
+    во всех процессах API.
+    """
+
+    uri: str | None = Field(default=None)
+    queue_size: int = Field(default=100, gt=0)  # сообщений на подписчика
+    keepalive: float = Field(default=15, gt=0)  # секунд между пингами SSE
@@ -5,3 +5,4 @@ class BrokerConfig(BaseModel):
     """Конфигурация брокера сообщений для Celery"""
 
     uri: str = Field(..., alias="uri")
+    dispatch_chunk_size: int = Field(default=100, gt=0)
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, List, Literal
 
 from pydantic import BaseModel, Field
 
@@ -9,3 +9,19 @@ class CacheConfig(BaseModel):
     uri: str | None = Field(default=None)
     ttls: Dict[str, int] = Field(default={})
     max_content_size: int = Field(default=0)
+    tag_params: List[str] = Field(default_factory=lambda: ["user_id"])
+    l1_max_bytes: int = Field(default=0, ge=0)  # 0 - L1-кэш процесса отключен
+    l1_ttl: float = Field(default=5, gt=0)
+    stale_ttl: int = Field(default=0, ge=0)  # окно stale-while-revalidate
+    distributed_lock: bool = Field(default=False)
+    lock_lease: float = Field(default=5, gt=0)
+    codec: Literal["binary", "msgpack"] = Field(default="binary")
+    compression: Literal["none", "gzip", "zstd"] = Field(default="none")
+    compress_threshold: int = Field(default=1024, ge=0)  # байт тела ответа
+    compress_level: int | None = Field(default=None)
+    measure: bool = Field(default=False)  # статистика кодирования по маршрутам
+
+    @property
+    def tag_ttl(self) -> int:
+        """Время жизни версий тегов: не меньше срока хранения любой записи"""
+        return max(self.ttls.values(), default=0) + self.stale_ttl
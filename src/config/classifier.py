@@ -0,0 +1,39 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class ClassifierRule(BaseModel):
+    """Правило классификатора: ключевые слова категории и их вес"""
+
+    category: str
+    keywords: List[str] = Field(min_length=1)
+    weight: float = Field(default=1, gt=0)
+
+
+def default_rules() -> List[ClassifierRule]:
+    return [
+        ClassifierRule(category="critical", keywords=["error", "exception", "failed"]),
+        ClassifierRule(
+            category="warning", keywords=["warning", "attention", "careful"]
+        ),
+    ]
+
+
+class ClassifierConfig(BaseModel):
+    """Конфигурация классификатора уведомлений по ключевым словам
+
+    Правила берутся из `rules_file` (YAML с ключом `rules`), если он задан,
+    иначе - из `rules`. Файл перечитывается при изменении не чаще, чем раз в
+    `reload_interval` секунд.
+
+    Если задан `model_path` (каталог модели `NaiveBayesClassifier`), тексты,
+    для которых не сработало ни одно правило, категоризируются моделью.
+    """
+
+    rules: List[ClassifierRule] = Field(default_factory=default_rules)
+    rules_file: str | None = Field(default=None)
+    reload_interval: float = Field(default=5, ge=0)
+    default_category: str = Field(default="info")
+    default_confidence: float = Field(default=0.8, ge=0, le=1)
+    model_path: str | None = Field(default=None)
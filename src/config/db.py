@@ -1,7 +1,28 @@
+from typing import List, Literal
+
 from pydantic import BaseModel, Field
 
 
 class DBConfig(BaseModel):
-    """Конфигурация базы данных"""
+    """Конфигурация базы данных
+
+    Параметры пула соединений не применяются к SQLite в памяти (одно общее
+    соединение), `prepared_statement_cache_size` - только к драйверу asyncpg.
+
+    Чтения GET-эндпоинтов распределяются по репликам `replicas` (если заданы)
+    согласно `replica_strategy`; запись и воркеры работают с `uri`.
+    """
 
     uri: str = Field(..., alias="uri")
+    search_backend: Literal["auto", "like", "trigram", "fts5"] = Field(default="like")
+    pool_size: int = Field(default=5, ge=1)  # постоянные соединения пула
+    max_overflow: int = Field(default=10, ge=-1)  # сверх `pool_size`, -1 - без предела
+    pool_timeout: float = Field(default=30, gt=0)  # ожидание свободного соединения
+    pool_recycle: int = Field(default=-1, ge=-1)  # пересоздание соединения, секунд
+    pool_pre_ping: bool = Field(default=False)  # проверка соединения при выдаче
+    prepared_statement_cache_size: int = Field(default=100, ge=0)  # 0 - для pgbouncer
+    replicas: List[str] = Field(default_factory=list)  # адреса реплик для чтения
+    replica_strategy: Literal["round_robin", "least_connections"] = Field(
+        default="round_robin"
+    )
+    read_your_writes: float = Field(default=0, ge=0)  # чтение с `uri` после записи, с
@@ -7,3 +7,5 @@ class ServerConfig(BaseModel):
     """Конфигурация сервера"""
 
     cors: List[str] = Field(default_factory=lambda: ["*"])
+    long_poll_timeout: float = Field(default=60, gt=0)  # максимум `timeout` long-poll
+    export_chunk_size: int = Field(default=1000, gt=0)  # строк на часть выгрузки
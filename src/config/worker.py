@@ -0,0 +1,43 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class WorkerConfig(BaseModel):
+    """Конфигурация обработчика уведомлений
+
+    - `single` - одно уведомление на задачу и вызов `AIService.analyze_text`
+    - `batch` - уведомления публикуются и обрабатываются пакетами до
+      `batch_size` штук с одним вызовом `AIService.analyze_batch`
+
+    Среда выполнения задач (`runtime`):
+
+    - `sync` - каждая задача выполняется в собственном цикле событий
+    - `asyncio` - задачи процесса выполняются в одном долгоживущем цикле событий
+      (см. `AsyncRunner`) не более `max_in_flight` одновременно; рассчитан на
+      запуск воркера с `--pool=threads`
+
+    Доставка уведомлений обработчикам (`dispatch`):
+
+    - `broker` - API публикует задачи в брокер
+    - `db` - таблица `notifications` служит очередью: опрашивающие обработчики
+      (`python -m src.poller`) захватывают пакеты ожидающих уведомлений сами
+
+    Захваченное уведомление арендуется на `lease` секунд (аренда продлевается,
+    пока идет обработка); уведомления с истекшей арендой раз в `sweep_interval`
+    секунд возвращаются в очередь.
+
+    Счетчики непрочитанных уведомлений сверяются с таблицей уведомлений раз в
+    `reconcile_interval` секунд (Celery beat).
+    """
+
+    mode: Literal["single", "batch"] = Field(default="single")
+    batch_size: int = Field(default=50, gt=0)
+    batch_linger: float = Field(default=0.5, ge=0)  # секунд ожидания заполнения пакета
+    runtime: Literal["sync", "asyncio"] = Field(default="sync")
+    max_in_flight: int = Field(default=100, gt=0)
+    dispatch: Literal["broker", "db"] = Field(default="broker")
+    lease: float = Field(default=60, gt=0)  # секунд аренды уведомления обработчиком
+    poll_interval: float = Field(default=1, gt=0)
+    sweep_interval: float = Field(default=30, gt=0)
+    reconcile_interval: float = Field(default=3600, gt=0)
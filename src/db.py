@@ -1,44 +1,274 @@
+import itertools
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict, List, Sequence
 
+from sqlalchemy import exc, make_url
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.requests import Request
 
+from .config.db import DBConfig
 from .logger import logger
-from .models import Base
+from .migrations import build_indexes, migrate
+from .models import Base  # noqa: F401
 
 engine: AsyncEngine
+session_factory: async_sessionmaker[AsyncSession]
+replicas: "ReplicaBalancer | None" = None
+
+# Cookie и заголовок запроса с моментом (unix time), до которого чтения клиента
+# выполняются в основной базе (см. `db.read_your_writes`)
+READ_PRIMARY_COOKIE = "read_primary"
+READ_PRIMARY_HEADER = "x-read-primary"
+# Флаг `request.state`: ответ сохраняется в общий кэш и должен читаться из
+# основной базы (см. `CacheMiddleware`)
+READ_PRIMARY_STATE = "read_primary"
+
+
+class PoolMetrics:
+    """Счетчики выдачи соединений пулом"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def observe(self, wait: float) -> None:
+        """Учесть запрос соединения, ожидавший `wait` секунд"""
+        self.requests += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики и среднее время ожидания соединения"""
+        return {
+            "checkouts": self.requests - self.timeouts,
+            "timeouts": self.timeouts,
+            "waiting": self.waiting,
+            "wait_avg": self.wait_total / self.requests if self.requests else 0.0,
+            "wait_max": self.wait_max,
+        }
+
+
+class MeasuredQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, измеряющий ожидание выдачи соединения
+
+    Время выдачи включает ожидание освобождения соединения при исчерпанном
+    пуле и открытие нового соединения; запросы, не дождавшиеся
+    `pool_timeout`, учитываются в `timeouts`.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self) -> Any:
+        self.metrics.waiting += 1
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.waiting -= 1
+            self.metrics.observe(time.perf_counter() - start)
+
+
+def engine_options(uri: str, config: DBConfig) -> Dict[str, Any]:
+    """Параметры `create_async_engine` для адреса `uri` по конфигурации пула
+
+    Аргументы:
+        uri (str): Адрес базы данных
+        config (DBConfig): Конфигурация базы данных
+
+    Возвращает:
+        Dict[str, Any]: Именованные аргументы `create_async_engine`
+    """
+    url = make_url(uri)
+    options: Dict[str, Any] = {"pool_pre_ping": config.pool_pre_ping}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # База в памяти существует только в своем соединении
+        return options
+    options.update(
+        poolclass=MeasuredQueuePool,
+        pool_size=config.pool_size,
+        max_overflow=config.max_overflow,
+        pool_timeout=config.pool_timeout,
+        pool_recycle=config.pool_recycle,
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": config.prepared_statement_cache_size
+        }
+    return options
+
+
+def pool_stats(target: AsyncEngine) -> Dict[str, Any]:
+    """Состояние пула соединений движка `target`
+
+    Возвращает:
+        Dict[str, Any]: Класс пула, для пула-очереди - размер, число выданных
+            (`checked_out`), свободных и сверхлимитных соединений, а для
+            `MeasuredQueuePool` - также счетчики ожидания выдачи
+    """
+    pool = target.pool
+    result: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        result.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    if isinstance(pool, MeasuredQueuePool):
+        result.update(pool.metrics.stats())
+    return result
+
+
+def make_session_factory(target: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """Фабрика сессий движка `target`"""
+    return async_sessionmaker(
+        target,
+        autocommit=False,
+        autoflush=True,
+        expire_on_commit=False,
+        class_=AsyncSession,
+    )
+
+
+class ReplicaBalancer:
+    """Распределение сессий чтения по репликам
+
+    - `round_robin` - реплики по очереди
+    - `least_connections` - реплика с наименьшим числом открытых сессий чтения
+      процесса (при равенстве - по очереди)
+
+    Аргументы:
+        engines (Sequence[AsyncEngine]): Движки реплик
+        strategy (str, optional): Стратегия выбора. По умолчанию `round_robin`.
+    """
+
+    def __init__(
+        self, engines: Sequence[AsyncEngine], strategy: str = "round_robin"
+    ) -> None:
+        self.engines = list(engines)
+        self.strategy = strategy
+        self.active = [0] * len(self.engines)
+        self._factories = [make_session_factory(target) for target in self.engines]
+        self._counter = itertools.count()
+
+    def choose(self) -> int:
+        """Номер реплики для новой сессии"""
+        start = next(self._counter) % len(self.engines)
+        if self.strategy != "least_connections":
+            return start
+        order = [(start + i) % len(self.engines) for i in range(len(self.engines))]
+        return min(order, key=lambda index: self.active[index])
+
+    @asynccontextmanager
+    async def session(self) -> AsyncGenerator[AsyncSession, None]:
+        """Сессия выбранной реплики на время блока `async with`"""
+        index = self.choose()
+        self.active[index] += 1
+        try:
+            async with self._factories[index]() as session:
+                yield session
+        finally:
+            self.active[index] -= 1
+
+
+def read_primary(request: Request) -> bool:
+    """Нужно ли читать из основной базы: клиент недавно выполнял запись
+    или ответ будет сохранен в общий кэш"""
+    if getattr(request.state, READ_PRIMARY_STATE, False):
+        return True
+    value = request.cookies.get(READ_PRIMARY_COOKIE) or request.headers.get(
+        READ_PRIMARY_HEADER
+    )
+    try:
+        return float(value) > time.time()  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return False
 
 
 @logger.catch
-async def init_engine(uri: str) -> None:
-    """Инициализация AsyncEngine"""
-    global engine
-    engine = create_async_engine(uri, future=True)
+async def init_engine(config: DBConfig, read_replicas: bool = False) -> None:
+    """Инициализация AsyncEngine и фабрики сессий
+
+    Фабрика сессий создается один раз для движка и используется `get_db`
+    во всех запросах. С `read_replicas` создаются также движки реплик
+    `config.replicas` для `get_read_db`.
+    """
+    global engine, session_factory, replicas
+    engine = create_async_engine(
+        config.uri, future=True, **engine_options(config.uri, config)
+    )
+    session_factory = make_session_factory(engine)
+    replicas = None
+    if read_replicas and config.replicas:
+        replicas = ReplicaBalancer(
+            [
+                create_async_engine(uri, future=True, **engine_options(uri, config))
+                for uri in config.replicas
+            ],
+            config.replica_strategy,
+        )
+
+
+def get_engine() -> AsyncEngine:
+    """Получение инициализированного AsyncEngine"""
+    global engine  # noqa: F824
+    return engine
+
+
+def get_replica_engines() -> List[AsyncEngine]:
+    """Движки реплик для чтения (пустой список, если реплики не используются)"""
+    return replicas.engines if replicas is not None else []
 
 
 @logger.catch
 async def create_tables() -> None:
-    """Создание таблиц в базе данных"""
+    """Создание таблиц, применение миграций схемы базы данных и построение индексов"""
     global engine  # noqa: F824
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(migrate)
+    if engine.dialect.name == "postgresql":
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.run_sync(build_indexes)
 
 
 @asynccontextmanager
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Получение сессии базы данных"""
-    global engine  # noqa: F824
-    local_session = async_sessionmaker(
-        engine,
-        autocommit=False,
-        autoflush=True,
-        expire_on_commit=False,
-        class_=AsyncSession,
-    )
-    async with local_session() as session:
+    global session_factory  # noqa: F824
+    async with session_factory() as session:
         yield session
+
+
+@asynccontextmanager
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Получение сессии базы данных только для чтения
+
+    Сессия открывается на реплике, если реплики настроены и клиент не
+    выполнял запись в пределах окна `db.read_your_writes`; иначе - в основной
+    базе. Ответы, которыми заполняется кэш, всегда читаются из основной базы:
+    иначе отстающая реплика сохранила бы в кэш устаревшее тело под новыми
+    версиями тегов до истечения TTL.
+    """
+    global session_factory, replicas  # noqa: F824
+    if replicas is None or read_primary(request):
+        async with session_factory() as session:
+            yield session
+    else:
+        async with replicas.session() as session:
+            yield session
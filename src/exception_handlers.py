@@ -1,7 +1,7 @@
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
 
-from .exceptions import NotificationNotFoundExc
+from .exceptions import InvalidCursorExc, NotificationNotFoundExc
 from .logger import logger
 
 
@@ -22,6 +22,22 @@ async def handle_notification_not_found(
     )
 
 
+async def handle_invalid_cursor(req: Request, exc: InvalidCursorExc) -> JSONResponse:
+    """Обработчик исключения `InvalidCursorExc`
+
+    Аргументы:
+        req (Request): Объект запроса
+        exc (InvalidCursorExc): Объект вызванного исключения
+
+    Возвращает:
+        JSONResponse: Краткое описание ошибки
+    """
+    return JSONResponse(
+        content={"msg": "Invalid pagination cursor"},
+        status_code=status.HTTP_400_BAD_REQUEST,
+    )
+
+
 async def handle_any_exception(req: Request, exc: Exception) -> JSONResponse:
     """Обработчик всех возникших исключений, не учтенных в других обработчиках
 
@@ -2,3 +2,9 @@ class NotificationNotFoundExc(Exception):
     """Исключение вызываемое когда уведомление не найдено в базе"""
 
     pass
+
+
+class InvalidCursorExc(Exception):
+    """Исключение вызываемое когда курсор пагинации невозможно разобрать"""
+
+    pass
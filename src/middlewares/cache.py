@@ -1,34 +1,115 @@
+import asyncio
+import hashlib
 import re
-from typing import Dict, List, Tuple
+import time
+from contextlib import nullcontext
+from typing import (
+    Any,
+    AsyncContextManager,
+    Callable,
+    Dict,
+    List,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 from aiocache import Cache
-from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, _StreamingResponse
+from aiocache.lock import RedLock
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from ..cache_codec import EntryCodec, identity
+from ..db import READ_PRIMARY_STATE
 from ..logger import logger
+from ..services.cache_service import GLOBAL_TAG, CacheService
 
 
-class CacheMiddleware(BaseHTTPMiddleware):
-    """Кэширующий middleware"""
+class CacheMiddleware:
+    """Кэширующий ASGI-middleware
 
+    Записи помечаются тегами: по одному на каждый параметр пути маски
+    (`notification_id:<id>`) и на каждый query-параметр из `tag_params`
+    (`user_id:<id>`); запись без таких тегов получает тег `all`. Вместе с
+    записью хранятся версии ее тегов, и запись с устаревшей версией любого
+    тега считается отсутствующей (см. `CacheService.invalidate`).
+
+    Запись считается свежей `ttl` секунд и хранится еще `stale_ttl` секунд,
+    в течение которых отдается клиентам, пока один запрос обновляет ее в фоне.
+
+    Кэшируемые ответы получают заголовок `ETag` (хэш тела, вычисляется один раз
+    при записи), а запросы с совпадающим `If-None-Match` получают
+    `304 Not Modified` прямо из кэша без тела.
+
+    При промахе ответ передается клиенту по мере генерации и одновременно
+    копируется в буфер, ограниченный `max_size` байтами (0 - без ограничения).
+    Ответ, превысивший лимит, не кэшируется.
+
+    Записи хранятся в бэкенде уже закодированными `codec` (см. `EntryCodec`):
+    из заголовков ответа сохраняются только `Content-Type` и `ETag`.
+
+    Ответы с `Cache-Control: no-store` (например, потоки событий) не
+    кэшируются и передаются клиенту без задержки, а конкурентные запросы,
+    ожидавшие их, сразу выполняются самостоятельно. Запросы к `bypass_endpoints`
+    и с любым из `bypass_params` (потоки, выгрузки, long-poll) передаются
+    приложению без обращений к кэшу, ожидания и блокировок.
+    """
+
+    app: ASGIApp
     _cache: Cache
     _cached_patterns: List[Tuple[re.Pattern, int]]
+    _bypass_patterns: List[re.Pattern]
+    _bypass_params: Tuple[str, ...]
+    _routes: Dict[re.Pattern, str]
+    _codec: EntryCodec
     _max_size: int
+    _tag_params: Tuple[str, ...]
+    _stale_ttl: int
+    _distributed_lock: bool
+    _lock_lease: float
+    _inflight: Dict[str, asyncio.Future]
+    _refreshing: Set[str]
+    _background: Set[asyncio.Task]
 
     def __init__(
         self,
-        app: FastAPI,
+        app: ASGIApp,
         cache: Cache,
         cached_endpoints: Dict[str, int],
         max_size: int = 0,
+        tag_params: Sequence[str] = (),
+        stale_ttl: int = 0,
+        distributed_lock: bool = False,
+        lock_lease: float = 5.0,
+        codec: EntryCodec | None = None,
+        bypass_endpoints: Sequence[str] = (),
+        bypass_params: Sequence[str] = (),
     ):
-        super().__init__(app)
+        self.app = app
         self._cache = cache
         self._cached_patterns = [
             (self.path_mask_to_regex(mask), ttl)
             for mask, ttl in cached_endpoints.items()
         ]
+        self._routes = {
+            pattern: mask
+            for (pattern, _), mask in zip(self._cached_patterns, cached_endpoints)
+        }
+        self._bypass_patterns = [
+            self.path_mask_to_regex(mask) for mask in bypass_endpoints
+        ]
+        self._bypass_params = tuple(bypass_params)
+        self._codec = codec or EntryCodec()
         self._max_size = max_size
+        self._tag_params = tuple(tag_params)
+        self._stale_ttl = stale_ttl
+        self._distributed_lock = distributed_lock
+        self._lock_lease = lock_lease
+        self._inflight = {}
+        self._refreshing = set()
+        self._background = set()
         logger.debug("Cache initialized")
 
     @staticmethod
@@ -37,71 +118,372 @@ class CacheMiddleware(BaseHTTPMiddleware):
 
         Пример использования:
         `/v1/notifications/` -> `^/v1/notifications/?$`
-        `/v1/notifications/{notification_id}` -> `^/v1/notifications/[^/]+/?$`
-        `/v1/notifications/{notification_id}/status` -> `^/v1/notifications/[^/]+/status/?$`
+        `/v1/notifications/{notification_id}` -> `^/v1/notifications/(?P<notification_id>[^/]+)/?$`
+        `/v1/notifications/{notification_id}/status` -> `^/v1/notifications/(?P<notification_id>[^/]+)/status/?$`
         """
         segments = path_mask.strip("/").split("/")
         regex_segments = []
         for segment in segments:
             if segment.startswith("{") and segment.endswith("}"):
-                regex_segments.append(r"[^/]+")
+                name = segment[1:-1]
+                if name.isidentifier():
+                    regex_segments.append(rf"(?P<{name}>[^/]+)")
+                else:
+                    regex_segments.append(r"[^/]+")
             else:
                 regex_segments.append(re.escape(segment))
         return re.compile(f"^/{'/'.join(regex_segments)}/?$")
 
-    async def get_matching_ttl(self, path: str) -> int | None:
-        """Поиск соответствия по паттернам"""
+    def match_endpoint(self, path: str) -> Tuple[re.Match, int] | None:
+        """Поиск соответствия по паттернам с извлечением параметров пути"""
         for pattern, ttl in self._cached_patterns:
-            if pattern.match(path):
-                return ttl
+            match = pattern.match(path)
+            if match:
+                return match, ttl
         return None
 
-    async def dispatch(self, request: Request, call_next):
-        """Обработчик запросов"""
-        if request.method != "GET":
-            return await call_next(request)
+    def bypassed(self, request: Request) -> bool:
+        """Запрос передается приложению, минуя кэш"""
+        return any(
+            pattern.match(request.url.path) for pattern in self._bypass_patterns
+        ) or any(name in request.query_params for name in self._bypass_params)
 
-        path_ttl = await self.get_matching_ttl(request.url.path)
-        if path_ttl is None:
-            return await call_next(request)
+    async def get_matching_ttl(self, path: str) -> int | None:
+        """Поиск соответствия по паттернам"""
+        matched = self.match_endpoint(path)
+        return matched[1] if matched is not None else None
 
-        key = f"{request.url.path}?{request.query_params}"
+    def request_tags(self, match: re.Match, request: Request) -> List[str]:
+        """Теги записи кэша для запроса"""
+        tags = [
+            CacheService.tag(name, value) for name, value in match.groupdict().items()
+        ]
+        tags.extend(
+            CacheService.tag(name, request.query_params[name])
+            for name in self._tag_params
+            if name in request.query_params
+        )
+        return tags or [GLOBAL_TAG]
 
-        logger.debug(f"Request key: {key}")
+    async def _read(
+        self, key: str, tags: List[str], route: str
+    ) -> Tuple[Dict[str, Any] | None, Dict[str, int]]:
+        """Прочитать запись и текущие версии ее тегов одним запросом к кэшу
 
+        Запись с устаревшими версиями тегов считается отсутствующей.
+        """
         try:
-            cached_data = await self._cache.get(key)
-            if cached_data is not None:
-                logger.debug(f"Used cached data for endpoint: {key}")
-                return Response(**cached_data)
+            raw, *tag_versions = await self._cache.multi_get(
+                [key, *map(CacheService.tag_key, tags)], loads_fn=identity
+            )
+            versions = CacheService.parse_versions(tags, tag_versions)
+            if raw is None:
+                return None, versions
+            cached_data = self._codec.decode(raw, route)
+            if cached_data is not None and cached_data["tags"] == list(
+                versions.values()
+            ):
+                return cached_data, versions
+            return None, versions
         except Exception as e:
             logger.warning(f"Cache read error: {e}")
+            return None, {}
+
+    async def _write(
+        self,
+        key: str,
+        cache_data: Dict[str, Any],
+        ttl: int,
+        versions: Dict[str, int],
+        route: str,
+    ) -> None:
+        """Сохранить запись со сроком свежести `ttl` и окном `stale_ttl` сверх него"""
+        cache_data["tags"] = list(versions.values())
+        cache_data["expires_at"] = time.time() + ttl
+        try:
+            await self._cache.set(
+                key,
+                self._codec.encode(cache_data, route),
+                ttl=ttl + self._stale_ttl,
+                dumps_fn=identity,
+            )
+            logger.debug(f"Request saved with key: {key}")
+        except Exception as e:
+            logger.warning(f"Cache write error: {e}")
+
+    @staticmethod
+    def etag(content: bytes) -> str:
+        """Сильный ETag тела ответа"""
+        return f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+    @staticmethod
+    def etag_matches(request: Request | None, etag: str | None) -> bool:
+        """Проверить соответствие ETag заголовку `If-None-Match` (слабое сравнение)"""
+        if request is None or etag is None:
+            return False
+        header = request.headers.get("if-none-match")
+        if header is None:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+        return "*" in candidates or etag in candidates
+
+    @classmethod
+    def _to_response(cls, cached_data: Dict[str, Any], request: Request) -> Response:
+        """Ответ из записи кэша: `304 Not Modified` без тела при совпадении ETag"""
+        etag = cached_data.get("etag")
+        if cls.etag_matches(request, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"etag": etag}
+            )
+        return Response(
+            content=cached_data["content"],
+            status_code=cached_data["status_code"],
+            headers={"etag": cached_data["etag"]},
+            media_type=cached_data["media_type"],
+        )
+
+    def _lock(self, key: str) -> AsyncContextManager:
+        """Межпроцессная блокировка вычисления записи (если включена)"""
+        if not self._distributed_lock:
+            return nullcontext()
+        return RedLock(getattr(self._cache, "l2", self._cache), key, self._lock_lease)
+
+    async def _render(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        request: Request | None,
+        on_bypass: Callable[[], None] | None = None,
+    ) -> Dict[str, Any] | None:
+        """Выполнить запрос вложенным приложением, копируя ответ в буфер
+
+        Возвращает данные записи кэша либо `None`, если ответ не кэшируется.
+        `on_bypass` вызывается, как только ответ оказывается некэшируемым
+        из-за `Cache-Control: no-store`. Запрос читает данные из основной
+        базы, а не из реплик (см. `get_read_db`).
+        """
+        scope.setdefault("state", {})[READ_PRIMARY_STATE] = True
+        tee = _ResponseTee(send, request, self._max_size, self.etag, on_bypass)
+        await self.app(scope, receive, tee)
+        return tee.cache_data()
+
+    async def _refresh(
+        self, key: str, scope: Scope, ttl: int, tags: List[str], route: str
+    ) -> None:
+        """Фоновое обновление устаревшей записи (stale-while-revalidate)"""
+
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+        disconnected = asyncio.Event()
+
+        async def receive() -> Message:
+            # Тело запроса отдается один раз, после чего соединение "висит" до
+            # завершения ответа (как у клиента, ожидающего ответ)
+            if messages:
+                return messages.pop()
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
 
-        response = await call_next(request)
-
-        if 200 <= response.status_code < 300:
-            try:
-                if isinstance(response, _StreamingResponse):
-                    content = b""
-                    async for chunk in response.body_iterator:
-                        if self._max_size != 0 and len(content) > self._max_size:
-                            logger.warning(f"Content size more than: {self._max_size}")
-                            raise Exception()
-                        content += chunk  # type:ignore[operator]
-                    response = Response(
-                        content=content,
-                        status_code=response.status_code,
-                        headers=dict(response.headers),
-                        media_type=response.media_type,
+        async def send(message: Message) -> None:
+            pass
+
+        try:
+            async with self._lock(key):
+                cached_data, versions = await self._read(key, tags, route)
+                if (
+                    cached_data is not None
+                    and cached_data.get("expires_at", 0) > time.time()
+                ):
+                    return
+                cache_data = await self._render(scope, receive, send, None)
+                if cache_data is not None:
+                    await self._write(key, cache_data, ttl, versions, route)
+        except Exception as e:
+            logger.warning(f"Cache refresh error: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Обработчик запросов
+
+        - Свежая запись возвращается из кэша
+        - Устаревшая запись в пределах `stale_ttl` возвращается из кэша, а обновление
+          запускается в фоне (одно на ключ в процессе)
+        - При промахе конкурентные запросы с одним ключом ожидают единственное
+          вычисление ответа; с `distributed_lock` вычисление координируется между
+          процессами блокировкой в кэше
+        """
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+
+        matched = self.match_endpoint(scope["path"])
+        if matched is None:
+            return await self.app(scope, receive, send)
+        request = Request(scope)
+        if self.bypassed(request):
+            return await self.app(scope, receive, send)
+        match, path_ttl = matched
+        route = self._routes[match.re]
+
+        key = f"{scope['path']}?{request.query_params}"
+        tags = self.request_tags(match, request)
+
+        logger.debug(f"Request key: {key}")
+
+        cached_data, versions = await self._read(key, tags, route)
+        if cached_data is not None:
+            if (
+                cached_data.get("expires_at", 0) <= time.time()
+                and key not in self._refreshing
+            ):
+                self._refreshing.add(key)
+                task = asyncio.create_task(
+                    self._refresh(key, dict(scope), path_ttl, tags, route)
+                )
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+                logger.debug(f"Used stale cached data for endpoint: {key}")
+            else:
+                logger.debug(f"Used cached data for endpoint: {key}")
+            return await self._to_response(cached_data, request)(scope, receive, send)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            cached_data = await asyncio.shield(inflight)
+            if cached_data is not None:
+                logger.debug(f"Used coalesced response for endpoint: {key}")
+                response = self._to_response(cached_data, request)
+                return await response(scope, receive, send)
+            return await self.app(scope, receive, send)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            async with self._lock(key):
+                if self._distributed_lock:
+                    cached_data, versions = await self._read(key, tags, route)
+                    if cached_data is not None:
+                        future.set_result(cached_data)
+                        response = self._to_response(cached_data, request)
+                        return await response(scope, receive, send)
+                cache_data = await self._render(
+                    scope, receive, send, request, lambda: _release(future)
+                )
+                if cache_data is not None:
+                    await self._write(key, cache_data, path_ttl, versions, route)
+                _release(future, cache_data)
+        finally:
+            self._inflight.pop(key, None)
+            _release(future)
+
+
+def _release(future: asyncio.Future, result: Dict[str, Any] | None = None) -> None:
+    """Передать ожидающим запросам результат вычисления ответа (один раз)"""
+    if not future.done():
+        future.set_result(result)
+
+
+class _ResponseTee:
+    """Обертка `send`, передающая ответ клиенту и копирующая его в ограниченный буфер
+
+    Начало ответа придерживается до первого фрагмента тела: если тело состоит
+    из одного фрагмента (обычный JSON-ответ), к нему добавляется `ETag`, а при
+    совпадении `If-None-Match` клиенту вместо тела отправляется `304`.
+    Многофрагментные ответы передаются потоково, `ETag` для них вычисляется
+    только для записи кэша. Ответ с `Cache-Control: no-store` передается без
+    копирования, о чем сообщается вызовом `on_bypass`.
+    """
+
+    def __init__(
+        self,
+        send: Send,
+        request: Request | None,
+        max_size: int,
+        etag: Callable[[bytes], str],
+        on_bypass: Callable[[], None] | None = None,
+    ) -> None:
+        self._send = send
+        self._on_bypass = on_bypass
+        self._request = request
+        self._max_size = max_size
+        self._etag = etag
+        self._start: Message | None = None
+        self._status = 0
+        self._headers: List[Tuple[bytes, bytes]] = []
+        self._chunks: List[bytes] = []
+        self._size = 0
+        self._cacheable = False
+        self._complete = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._status = message["status"]
+            self._headers = list(message.get("headers", []))
+            self._cacheable = 200 <= self._status < 300
+            if self._cacheable and self._no_store():
+                self._cacheable = False
+                if self._on_bypass is not None:
+                    self._on_bypass()
+            if self._cacheable:
+                self._start = message
+                return
+            return await self._send(message)
+
+        if message["type"] != "http.response.body":
+            return await self._send(message)
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._cacheable:
+            if self._max_size != 0 and self._size + len(body) > self._max_size:
+                logger.warning(f"Content size more than: {self._max_size}")
+                self._cacheable = False
+                self._chunks.clear()
+            else:
+                self._chunks.append(body)
+                self._size += len(body)
+        self._complete = not more_body
+
+        start, self._start = self._start, None
+        if start is not None:
+            if self._cacheable and self._complete:
+                etag = self._etag(body)
+                start["headers"] = [*start.get("headers", []), (b"etag", etag.encode())]
+                if CacheMiddleware.etag_matches(self._request, etag):
+                    await self._send(
+                        {
+                            "type": "http.response.start",
+                            "status": status.HTTP_304_NOT_MODIFIED,
+                            "headers": [(b"etag", etag.encode())],
+                        }
                     )
-                cache_data = {
-                    "content": response.body,
-                    "status_code": response.status_code,
-                    "headers": dict(response.headers),
-                    "media_type": response.media_type,
-                }
-                await self._cache.set(key, cache_data, ttl=path_ttl)
-                logger.debug(f"Request saved with key: {key}")
-            except Exception as e:
-                logger.warning(f"Cache write error: {e}")
-        return response
+                    return await self._send({"type": "http.response.body"})
+            await self._send(start)
+        await self._send(message)
+
+    def _no_store(self) -> bool:
+        return any(
+            name.lower() == b"cache-control" and b"no-store" in value.lower()
+            for name, value in self._headers
+        )
+
+    def cache_data(self) -> Dict[str, Any] | None:
+        """Данные записи кэша или `None`, если ответ не кэшируется"""
+        if not (self._cacheable and self._complete):
+            return None
+        content = b"".join(self._chunks)
+        etag = self._etag(content)
+        media_type = next(
+            (
+                value.decode("latin-1")
+                for name, value in self._headers
+                if name.lower() == b"content-type"
+            ),
+            None,
+        )
+        return {
+            "etag": etag,
+            "content": content,
+            "status_code": self._status,
+            "media_type": media_type,
+        }
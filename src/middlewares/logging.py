@@ -0,0 +1,46 @@
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..logger import logger
+
+
+class RequestLoggingMiddleware:
+    """Промежуточный слой, отвечающий за логирование обработки запросов.
+
+    - Генерирует уникальный идентификатор запроса
+    - Вставляет в дочерние логи идентификатор запроса
+    - Добавляет в ответ заголовок `X-Request-ID`
+    - Сигнализирует в логах о возникших ошибках
+    """
+
+    def __init__(self, app: ASGIApp, header: str = "X-Request-ID"):
+        self.app = app
+        self._header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = str(uuid.uuid4())
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (self._header, request_id.encode("latin-1")),
+                ]
+                logger.success(f"Response: {message['status']}")
+            await send(message)
+
+        with logger.contextualize(request_id=request_id):
+            query = scope.get("query_string", b"").decode("latin-1")
+            url = scope["path"] + (f"?{query}" if query else "")
+            logger.info(f"Request: {scope['method']} {url}")
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception as e:
+                logger.error(f"Error: {str(e)}")
+                raise
+            finally:
+                logger.debug("Request finished")
@@ -0,0 +1,43 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..db import READ_PRIMARY_COOKIE
+
+# Методы, не изменяющие данные
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReadYourWritesMiddleware:
+    """Промежуточный слой, закрепляющий чтения клиента за основной базой после записи
+
+    Успешный ответ на изменяющий запрос получает cookie `read_primary` с
+    моментом окончания окна `window`: до него `get_read_db` открывает сессии в
+    основной базе, и клиент видит свои изменения независимо от отставания
+    реплик. Клиенты без cookie могут передавать это значение в заголовке
+    `X-Read-Primary`.
+    """
+
+    def __init__(self, app: ASGIApp, window: float):
+        self.app = app
+        self._window = window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self._window
+                cookie = (
+                    f"{READ_PRIMARY_COOKIE}={until:.3f}; "
+                    f"Max-Age={max(int(self._window), 1)}; Path=/; HttpOnly; "
+                    "SameSite=Lax"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode("latin-1")),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
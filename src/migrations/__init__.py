@@ -0,0 +1,151 @@
+from types import ModuleType
+from typing import List
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.exc import DBAPIError
+
+from ..logger import logger
+from ..models import Base, Notification, utcnow
+from . import (
+    m0001_get_list_indexes,
+    m0002_search_indexes,
+    m0003_processing_lease,
+    m0004_unread_counters,
+)
+
+# Миграции в порядке применения. Каждый модуль объявляет `VERSION`,
+# `DESCRIPTION` и идемпотентную функцию `upgrade(conn)`, выполняемую внутри
+# транзакции: она применяется и к существующей базе, и к только что созданной
+# по моделям (для структур, которые модели не описывают). Индексы на таблицах
+# с данными PostgreSQL строит без блокировки записи (`CREATE INDEX
+# CONCURRENTLY`), что невозможно внутри транзакции: миграция объявляет их в
+# `CONCURRENT_INDEXES` (имя -> определение), и они строятся `build_indexes`.
+MIGRATIONS: List[ModuleType] = [
+    m0001_get_list_indexes,
+    m0002_search_indexes,
+    m0003_processing_lease,
+    m0004_unread_counters,
+]
+
+# Ключ транзакционной advisory-блокировки PostgreSQL, под которой применяются
+# миграции: процессы API, поллера и воркеров, запущенные одновременно,
+# применяют их по очереди, а не параллельно
+LOCK_KEY = 0x6E6F7469666963
+# Ключ сессионной блокировки построения индексов (`build_indexes`). Отличается
+# от `LOCK_KEY`: транзакция, ожидающая блокировку, не дала бы завершиться
+# `CREATE INDEX CONCURRENTLY`, который ждет окончания всех транзакций
+INDEX_LOCK_KEY = LOCK_KEY + 1
+
+INVALID_INDEX = (
+    "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+    "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+)
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(length=255), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def lock(conn: Connection) -> None:
+    """Захватить блокировку миграций до конца транзакции (только PostgreSQL)
+
+    В SQLite запись сериализуется блокировкой всей базы.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LOCK_KEY})
+
+
+def migrate(conn: Connection) -> None:
+    """Привести схему базы данных к актуальной версии
+
+    - Миграции выполняются под блокировкой `lock`: процесс, дождавшийся ее,
+      видит версии, уже примененные другим процессом
+    - Пустая база создается по текущим моделям
+    - Применяются только отсутствующие в `schema_migrations` миграции
+
+    Аргументы:
+        conn (Connection): Синхронное соединение внутри открытой транзакции
+    """
+    lock(conn)
+    schema_migrations.create(conn, checkfirst=True)
+    applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+    if not inspect(conn).has_table(Notification.__tablename__):
+        Base.metadata.create_all(conn)
+
+    for migration in MIGRATIONS:
+        if migration.VERSION in applied:
+            continue
+        logger.info(f"Applying migration {migration.VERSION}: {migration.DESCRIPTION}")
+        migration.upgrade(conn)
+        conn.execute(
+            insert(schema_migrations).values(
+                version=migration.VERSION,
+                description=migration.DESCRIPTION,
+                applied_at=utcnow(),
+            )
+        )
+
+
+def build_indexes(conn: Connection) -> None:
+    """Построить индексы `CONCURRENT_INDEXES` миграций без блокировки записи
+
+    Выполняется в PostgreSQL после `migrate` на соединении в режиме
+    AUTOCOMMIT; отсутствующие индексы строятся `CREATE INDEX CONCURRENTLY`,
+    а недостроенные (невалидные) после сбоя - удаляются и строятся заново.
+    Индексы строит один процесс: остальные, не получив блокировку, пропускают
+    шаг. Ошибки только логируются - запросы работают и без индексов.
+
+    Аргументы:
+        conn (Connection): Синхронное соединение в режиме AUTOCOMMIT
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    if not conn.execute(
+        text("SELECT pg_try_advisory_lock(:key)"), {"key": INDEX_LOCK_KEY}
+    ).scalar():
+        return
+    try:
+        for migration in MIGRATIONS:
+            for name, definition in getattr(
+                migration, "CONCURRENT_INDEXES", {}
+            ).items():
+                try:
+                    if conn.execute(text(INVALID_INDEX), {"name": name}).scalar():
+                        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                    conn.execute(
+                        text(
+                            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                            f"{definition}"
+                        )
+                    )
+                except DBAPIError as exc:
+                    logger.warning(f"Index {name} was not built: {exc}")
+    finally:
+        conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": INDEX_LOCK_KEY})
+
+
+__all__ = [
+    "INDEX_LOCK_KEY",
+    "LOCK_KEY",
+    "MIGRATIONS",
+    "build_indexes",
+    "lock",
+    "migrate",
+    "schema_migrations",
+]
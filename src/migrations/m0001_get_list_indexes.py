@@ -0,0 +1,29 @@
+from sqlalchemy import Connection, text
+
+VERSION = 1
+DESCRIPTION = "Indexes for get_list filter combinations"
+
+# В PostgreSQL индексы строятся `build_indexes` без блокировки записи
+CONCURRENT_INDEXES = {
+    "ix_notifications_created_at_id": "ON notifications (created_at DESC, id DESC)",
+    "ix_notifications_user_id_created_at_id": (
+        "ON notifications (user_id, created_at DESC, id DESC)"
+    ),
+    "ix_notifications_unread_user_id_created_at_id": (
+        "ON notifications (user_id, created_at DESC, id DESC) WHERE read_at IS NULL"
+    ),
+    "ix_notifications_category_created_at_id": (
+        "ON notifications (category, created_at DESC, id DESC)"
+    ),
+    "ix_notifications_processing_status_created_at": (
+        "ON notifications (processing_status, created_at)"
+    ),
+}
+
+
+def upgrade(conn: Connection) -> None:
+    """Создать индексы под фильтры списка уведомлений и очередь обработки"""
+    if conn.dialect.name == "postgresql":
+        return
+    for name, definition in CONCURRENT_INDEXES.items():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} {definition}"))
@@ -0,0 +1,58 @@
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import DBAPIError
+
+from ..logger import logger
+
+VERSION = 2
+DESCRIPTION = "Search structures for title, text and category filters"
+
+POSTGRESQL_STATEMENTS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_title_trgm "
+    "ON notifications USING gin (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_text_trgm "
+    "ON notifications USING gin (text gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_category_trgm "
+    "ON notifications USING gin (category gin_trgm_ops)",
+]
+
+# Внешнее содержимое (`content=`) хранит в FTS5 только индекс, сами строки
+# читаются из `notifications` по `rowid`. После `VACUUM` rowid таблиц без
+# INTEGER PRIMARY KEY могут измениться, поэтому индекс перестраивается при
+# каждом запуске сервиса (см. `FtsSearchBackend.prepare`).
+SQLITE_STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS notifications_fts USING fts5("
+    "title, text, category, content='notifications', content_rowid='rowid', "
+    "tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS notifications_fts_ai AFTER INSERT ON notifications "
+    "BEGIN INSERT INTO notifications_fts(rowid, title, text, category) "
+    "VALUES (new.rowid, new.title, new.text, new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS notifications_fts_ad AFTER DELETE ON notifications "
+    "BEGIN INSERT INTO notifications_fts(notifications_fts, rowid, title, text, category) "
+    "VALUES ('delete', old.rowid, old.title, old.text, old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS notifications_fts_au "
+    "AFTER UPDATE OF title, text, category ON notifications "
+    "BEGIN INSERT INTO notifications_fts(notifications_fts, rowid, title, text, category) "
+    "VALUES ('delete', old.rowid, old.title, old.text, old.category); "
+    "INSERT INTO notifications_fts(rowid, title, text, category) "
+    "VALUES (new.rowid, new.title, new.text, new.category); END",
+    "INSERT INTO notifications_fts(notifications_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade(conn: Connection) -> None:
+    """Создать триграммные GIN-индексы (PostgreSQL) или теневую таблицу FTS5 (SQLite)
+
+    Если расширение `pg_trgm` или модуль FTS5 недоступны, миграция пропускает
+    создание структур: поиск продолжит работать через `ILIKE` (бэкенд `like`).
+    """
+    statements = {
+        "postgresql": POSTGRESQL_STATEMENTS,
+        "sqlite": SQLITE_STATEMENTS,
+    }.get(conn.dialect.name, [])
+    try:
+        with conn.begin_nested():
+            for statement in statements:
+                conn.execute(text(statement))
+    except DBAPIError as exc:
+        logger.warning(f"Search structures were not created: {exc}")
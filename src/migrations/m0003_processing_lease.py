@@ -0,0 +1,27 @@
+from sqlalchemy import Connection, inspect, text
+
+VERSION = 3
+DESCRIPTION = "Processing lease column for the database work queue"
+
+# В PostgreSQL индекс строится `build_indexes` без блокировки записи
+CONCURRENT_INDEXES = {
+    "ix_notifications_processing_status_lease": (
+        "ON notifications (processing_status, lease_expires_at)"
+    ),
+}
+
+
+def upgrade(conn: Connection) -> None:
+    """Добавить срок аренды обработки и индекс для поиска просроченных аренд"""
+    columns = {column["name"] for column in inspect(conn).get_columns("notifications")}
+    if "lease_expires_at" not in columns:
+        column_type = "TIMESTAMP WITH TIME ZONE"
+        if conn.dialect.name == "sqlite":
+            column_type = "DATETIME"
+        conn.execute(
+            text(f"ALTER TABLE notifications ADD COLUMN lease_expires_at {column_type}")
+        )
+    if conn.dialect.name == "postgresql":
+        return
+    for name, definition in CONCURRENT_INDEXES.items():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} {definition}"))
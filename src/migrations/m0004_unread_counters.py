@@ -0,0 +1,27 @@
+from sqlalchemy import Connection, inspect, text
+
+VERSION = 4
+DESCRIPTION = "Per-user unread notification counters"
+
+# Схема таблицы на момент миграции (не зависит от последующих правок модели
+# `UserUnreadCounter`)
+CREATE_TABLE = (
+    "CREATE TABLE user_unread_counters ("
+    "user_id UUID NOT NULL, "
+    "unread INTEGER DEFAULT '0' NOT NULL, "
+    "PRIMARY KEY (user_id))"
+)
+
+BACKFILL = (
+    "INSERT INTO user_unread_counters (user_id, unread) "
+    "SELECT user_id, count(*) FROM notifications "
+    "WHERE read_at IS NULL GROUP BY user_id"
+)
+
+
+def upgrade(conn: Connection) -> None:
+    """Создать таблицу счетчиков непрочитанных уведомлений и заполнить ее"""
+    if inspect(conn).has_table("user_unread_counters"):
+        return
+    conn.execute(text(CREATE_TABLE))
+    conn.execute(text(BACKFILL))
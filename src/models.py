@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Optional
 from uuid import UUID, uuid4
@@ -6,7 +6,7 @@ from uuid import UUID, uuid4
 from sqlalchemy import UUID as SUUID
 from sqlalchemy import DateTime
 from sqlalchemy import Enum as SEnum
-from sqlalchemy import Float, String, func
+from sqlalchemy import Float, Index, Integer, String, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -14,6 +14,17 @@ class Base(DeclarativeBase):
     pass
 
 
+def utcnow() -> datetime:
+    """Текущие дата и время в UTC
+
+    Используется как значение по умолчанию на стороне приложения, чтобы
+    отметки времени хранились в едином формате с микросекундами во всех СУБД
+    (SQLite `CURRENT_TIMESTAMP` отбрасывает доли секунды, что ломает сравнение
+    ключей курсорной пагинации).
+    """
+    return datetime.now(timezone.utc)
+
+
 class ProcessingStatus(str, Enum):
     """Статусы AI-обработки уведомления
 
@@ -46,7 +57,10 @@ class Notification(Base):
         String(length=255), nullable=False
     )  # Текст уведомления
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True),
+        default=utcnow,
+        server_default=func.now(),
+        nullable=False,
     )  # Дата и время создания уведомления
     read_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), nullable=True
@@ -62,3 +76,65 @@ class Notification(Base):
     processing_status: Mapped[ProcessingStatus] = mapped_column(
         SEnum(ProcessingStatus), default=ProcessingStatus.PENDING, nullable=False
     )  # Статус обработки
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )  # Срок аренды уведомления обработчиком (статус `processing`)
+
+
+class UserUnreadCounter(Base):
+    """Схема таблицы счетчиков непрочитанных уведомлений пользователей
+
+    Счетчик изменяется в той же транзакции, что и уведомления пользователя
+    (создание и отметка о прочтении), и периодически сверяется с таблицей
+    `notifications` (`NotificationService.reconcile_unread_counters`).
+    """
+
+    __tablename__ = "user_unread_counters"
+    user_id: Mapped[UUID] = mapped_column(
+        SUUID(), primary_key=True
+    )  # Идентификатор пользователя
+    unread: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )  # Количество непрочитанных уведомлений
+
+
+# Индексы под комбинации фильтров `NotificationService.get_list`.
+# Сортировка списка всегда `(created_at, id) DESC`, поэтому ключ сортировки
+# замыкает каждый индекс и позволяет обойтись без отдельного шага сортировки
+# как для OFFSET-, так и для курсорной пагинации.
+# Изменения набора индексов должны сопровождаться миграцией в `src/migrations`.
+Index(
+    "ix_notifications_created_at_id",
+    Notification.created_at.desc(),
+    Notification.id.desc(),
+)
+Index(
+    "ix_notifications_user_id_created_at_id",
+    Notification.user_id,
+    Notification.created_at.desc(),
+    Notification.id.desc(),
+)
+Index(
+    "ix_notifications_unread_user_id_created_at_id",
+    Notification.user_id,
+    Notification.created_at.desc(),
+    Notification.id.desc(),
+    postgresql_where=Notification.read_at.is_(None),
+    sqlite_where=Notification.read_at.is_(None),
+)
+Index(
+    "ix_notifications_category_created_at_id",
+    Notification.category,
+    Notification.created_at.desc(),
+    Notification.id.desc(),
+)
+Index(
+    "ix_notifications_processing_status_created_at",
+    Notification.processing_status,
+    Notification.created_at,
+)
+Index(
+    "ix_notifications_processing_status_lease",
+    Notification.processing_status,
+    Notification.lease_expires_at,
+)
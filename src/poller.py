@@ -0,0 +1,38 @@
+"""Обработчик очереди уведомлений в базе данных
+
+Используется при `worker.dispatch: "db"` вместо (или вместе с) воркерами
+Celery: захватывает пакеты ожидающих уведомлений напрямую из таблицы
+`notifications` и периодически возвращает в очередь уведомления с истекшей
+арендой. Процессов можно запускать сколько угодно.
+
+Запуск:
+    CONFIG_FILE=./configs/config.yaml python -m src.poller
+"""
+
+import asyncio
+import signal
+
+from .config import Config
+from .db import create_tables, get_engine, init_engine
+from .logger import logger
+from .tasks import init_cache, poll
+
+
+async def main() -> None:
+    await init_engine(Config.db)
+    await create_tables()
+    init_cache()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("Database queue poller started")
+    await poll(stop)
+    await get_engine().dispose()
+    logger.info("Database queue poller stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,38 +1,92 @@
-import uuid
-
-from aiocache import Cache
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .broadcast import create_broadcaster
+from .cache import TieredCache, create_backend
+from .cache_codec import create_codec
 from .config import Config
-from .db import create_tables, init_engine
-from .exception_handlers import handle_any_exception, handle_notification_not_found
-from .exceptions import NotificationNotFoundExc
+from .db import create_tables, get_engine, init_engine
+from .exception_handlers import (
+    handle_any_exception,
+    handle_invalid_cursor,
+    handle_notification_not_found,
+)
+from .exceptions import InvalidCursorExc, NotificationNotFoundExc
 from .logger import logger
 from .middlewares.cache import CacheMiddleware
+from .middlewares.logging import RequestLoggingMiddleware
+from .middlewares.read_your_writes import ReadYourWritesMiddleware
+from .services.analysis_cache import init_analysis_cache
+from .services.cache_service import CacheService
+from .services.event_service import EventService
+from .services.processing_buffer import processing_buffer
+from .services.search import init_search_backend
 from .v1.routes import notifications, health
 
 app = FastAPI()
 
+# Эндпоинты и параметры запросов, минующие кэш: потоки событий, выгрузка,
+# счетчик непрочитанных и long-poll статуса
+UNCACHED_ENDPOINTS = (
+    "/v1/notifications/stream",
+    "/v1/notifications/export",
+    "/v1/notifications/unread-count",
+)
+UNCACHED_PARAMS = ("wait_for",)
+
 
 # Подключение кэша к GET-эндпоинтам
 if Config.cache.uri is not None:
+    cache = TieredCache(
+        create_backend(Config.cache.uri),
+        l1_max_bytes=Config.cache.l1_max_bytes,
+        l1_ttl=Config.cache.l1_ttl,
+    )
+    codec = create_codec(
+        Config.cache.codec,
+        compression=Config.cache.compression,
+        compress_threshold=Config.cache.compress_threshold,
+        compress_level=Config.cache.compress_level,
+        measure=Config.cache.measure,
+    )
+    CacheService.init(cache, codec, Config.cache.tag_ttl)
     app.add_middleware(
         CacheMiddleware,
-        cache=Cache.from_url(Config.cache.uri),
+        cache=cache,
         cached_endpoints=Config.cache.ttls,
+        max_size=Config.cache.max_content_size,
+        tag_params=Config.cache.tag_params,
+        stale_ttl=Config.cache.stale_ttl,
+        distributed_lock=Config.cache.distributed_lock,
+        lock_lease=Config.cache.lock_lease,
+        codec=codec,
+        bypass_endpoints=UNCACHED_ENDPOINTS,
+        bypass_params=UNCACHED_PARAMS,
     )
 
+# Рассылка событий уведомлений подписчикам SSE/WebSocket
+EventService.init(create_broadcaster(Config.broadcast.uri, Config.broadcast.queue_size))
+
 
 @app.on_event("startup")
 async def on_startup():
     """Функция подготовки перед запуском FastApi-сервера"""
     logger.info("Initializing database")
-    await init_engine(Config.db.uri)
+    await init_engine(Config.db, read_replicas=True)
     await create_tables()
+    async with get_engine().begin() as conn:
+        await conn.run_sync(init_search_backend, Config.db.search_backend)
+    init_analysis_cache()
     logger.info("Server started on http://localhost:8000")
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Функция завершения работы FastApi-сервера"""
+    processing_buffer.flush()
+    await EventService.broadcaster().close()
+
+
 # Объявление CORS
 app.add_middleware(
     CORSMiddleware,
@@ -43,35 +97,12 @@ app.add_middleware(
 )
 
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Промежуточный слой, отвечающий за логирование обработки запросов.
-
-    - Генерирует уникальный идентификатор запроса
-    - Вставляет в дочерние логи идентификатор запроса
-    - Сигнализирует в логах о возникших ошибках
-
-    Аргументы:
-        request (Request): Объект запроса
-        call_next (Callable[[Any], Any]): Callable-объект для дальнейшей обработки запроса
-
-    Возвращает:
-        Response: Ответ запроса или исключение
-    """
-    request_id = str(uuid.uuid4())
-    with logger.contextualize(request_id=request_id):
-        logger.info(f"Request: {request.method} {request.url}")
-        try:
-            response = await call_next(request)
-            response.headers["X-Request-ID"] = request_id
-            logger.success(f"Response: {response.status_code}")
-            return response
-        except Exception as e:
-            logger.error(f"Error: {str(e)}")
-            raise
-        finally:
-            logger.debug("Request finished")
+# Чтение собственных записей из основной базы при работе с репликами
+if Config.db.replicas and Config.db.read_your_writes > 0:
+    app.add_middleware(ReadYourWritesMiddleware, window=Config.db.read_your_writes)
 
+# Логирование запросов
+app.add_middleware(RequestLoggingMiddleware)
 
 # Подключение роутеров
 app.include_router(notifications.router, prefix="/v1/notifications")
@@ -79,6 +110,9 @@ app.include_router(health.router, prefix="/v1/health")
 
 # Подключение обработчиков исключений
 app.add_exception_handler(
-    NotificationNotFoundExc, handle_notification_not_found  # type:ignore[arg-type]
+    NotificationNotFoundExc, handle_notification_not_found  # type: ignore[arg-type]
+)
+app.add_exception_handler(
+    InvalidCursorExc, handle_invalid_cursor  # type: ignore[arg-type]
 )
 app.add_exception_handler(Exception, handle_any_exception)
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncRunner:
+    """Долгоживущий цикл событий в отдельном потоке процесса
+
+    Корутины из синхронного кода (потоков пула Celery) выполняются в одном
+    цикле событий, поэтому движок базы данных и его пул соединений
+    переиспользуются между задачами. Одновременно выполняется не более
+    `max_in_flight` корутин, остальные ожидают своей очереди.
+
+    Аргументы:
+        max_in_flight (int): Максимальное число одновременно выполняемых корутин
+    """
+
+    def __init__(self, max_in_flight: int) -> None:
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="async-runner", daemon=True
+        )
+        self._thread.start()
+
+    async def _bounded(self, coro: Coroutine[Any, Any, T]) -> T:
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                return await coro
+            finally:
+                self.in_flight -= 1
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "Future[T]":
+        """Запланировать корутину и вернуть future с ее результатом"""
+        return asyncio.run_coroutine_threadsafe(self._bounded(coro), self._loop)
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Выполнить корутину и дождаться результата в вызывающем потоке"""
+        return self.submit(coro).result()
+
+    def stop(self) -> None:
+        """Остановить цикл событий и дождаться завершения потока"""
+        if not self._loop.is_running():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+__all__ = ["AsyncRunner"]
@@ -1,26 +1,49 @@
+import asyncio
+import random
+from typing import List
+
+from .classifier import get_classifier
+from .vector_classifier import get_model
+
+
 class AIService:
+    @staticmethod
+    def version() -> str:
+        """Версия категоризации: меняется при изменении правил или модели"""
+        version = get_classifier().version
+        model = get_model()
+        return version if model is None else f"{version}+{model.version}"
+
+    @staticmethod
+    def classify_batch(texts: List[str]) -> List[dict]:
+        """
+        Категоризация пакета текстов: правила по ключевым словам, а для текстов
+        без совпадений - статистическая модель (если она подключена)
+        """
+        results = get_classifier().classify_batch(texts)
+        model = get_model()
+        if model is not None:
+            unmatched = [
+                i for i, result in enumerate(results) if not result["keywords"]
+            ]
+            predicted = model.classify_batch([texts[i] for i in unmatched])
+            for i, result in zip(unmatched, predicted):
+                results[i] = result
+        return results
+
     @staticmethod
     async def analyze_text(text: str) -> dict:
         """
         Имитация работы AI API с задержкой 1-3 секунды
         """
-        import asyncio
-        import random
-
         await asyncio.sleep(random.uniform(1, 3))
+        return AIService.classify_batch([text])[0]
 
-        # Простая логика категоризации на основе ключевых слов
-        if any(word in text.lower() for word in ["error", "exception", "failed"]):
-            category = "critical"
-            confidence = random.uniform(0.7, 0.95)
-        elif any(word in text.lower() for word in ["warning", "attention", "careful"]):
-            category = "warning"
-            confidence = random.uniform(0.6, 0.9)
-        else:
-            category = "info"
-            confidence = random.uniform(0.8, 0.99)
-        return {
-            "category": category,
-            "confidence": confidence,
-            "keywords": random.sample(text.split(), min(3, len(text.split()))),
-        }
+    @staticmethod
+    async def analyze_batch(texts: List[str]) -> List[dict]:
+        """
+        Имитация пакетного запроса к AI API: одна задержка 1-3 секунды на весь
+        пакет, результаты в порядке входных текстов
+        """
+        await asyncio.sleep(random.uniform(1, 3))
+        return AIService.classify_batch(texts)
@@ -0,0 +1,196 @@
+import hashlib
+import re
+import time
+import unicodedata
+from typing import Any, Dict, List, Sequence
+
+from aiocache.base import BaseCache
+
+from ..cache import LRUCache, create_backend
+from ..config import Config
+from ..logger import logger
+
+WHITESPACE = re.compile(r"\s+")
+
+# Ключи общих счетчиков попаданий и промахов (при подключенном общем бэкенде)
+HITS_KEY = "analysis:stats:hits"
+MISSES_KEY = "analysis:stats:misses"
+
+
+def normalize(text: str) -> str:
+    """Нормализованный текст: форма Unicode NFC и схлопнутые пробельные символы"""
+    return WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_key(text: str, version: str) -> str:
+    """Ключ результата анализа текста для версии категоризации `version`"""
+    digest = hashlib.sha256(normalize(text).encode()).hexdigest()
+    return f"analysis:{version}:{digest}"
+
+
+def hit_ratio(hits: int, misses: int) -> float:
+    """Доля попаданий (0, если обращений не было)"""
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+class AnalysisCache:
+    """Кэш результатов анализа текстов уведомлений
+
+    Шаблонные уведомления часто имеют одинаковый текст, поэтому результат
+    анализа запоминается по хэшу нормализованного текста и версии
+    категоризации (`AIService.version`): изменение правил или модели делает
+    прежние записи недоступными. Первый уровень - LRU-кэш процесса, второй
+    (необязательный) - общий для всех воркеров бэкенд aiocache с TTL.
+    Ошибки общего бэкенда только логируются.
+
+    Общие счетчики попаданий и промахов копятся в процессе и переносятся в
+    бэкенд не чаще раза в `stats_interval` секунд, чтобы попадания в кэш
+    процесса не требовали обращений к бэкенду.
+
+    Аргументы:
+        l1_max_bytes (int): Размер LRU-кэша процесса в байтах (0 - отключен)
+        l1_ttl (float): Время жизни записи в LRU-кэше процесса
+        ttl (int): Время жизни записи в общем бэкенде
+        l2 (BaseCache | None, optional): Общий бэкенд
+        stats_interval (float, optional): Период переноса общих счетчиков в секундах
+    """
+
+    def __init__(
+        self,
+        l1_max_bytes: int,
+        l1_ttl: float,
+        ttl: int,
+        l2: BaseCache | None = None,
+        stats_interval: float = 10,
+    ) -> None:
+        self.l1 = LRUCache(l1_max_bytes, l1_ttl)
+        self.l2 = l2
+        self.ttl = ttl
+        self.stats_interval = stats_interval
+        self._counters = {"l1_hits": 0, "l2_hits": 0, "misses": 0}
+        self._pending = {"hits": 0, "misses": 0}
+        self._flushed_at = float("-inf")
+
+    async def get_many(self, texts: Sequence[str], version: str) -> List[dict | None]:
+        """Получить сохраненные результаты анализа текстов
+
+        Аргументы:
+            texts (Sequence[str]): Тексты уведомлений
+            version (str): Версия категоризации
+
+        Возвращает:
+            List[dict | None]: Результаты в порядке текстов (`None` - промах)
+        """
+        keys = [text_key(text, version) for text in texts]
+        values: List[dict | None] = [self.l1.get(key) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        self._counters["l1_hits"] += len(keys) - len(missing)
+        if missing and self.l2 is not None:
+            try:
+                fetched = await self.l2.multi_get([keys[i] for i in missing])
+            except Exception as e:
+                logger.warning(f"Analysis cache read error: {e}")
+                fetched = [None] * len(missing)
+            for i, value in zip(missing, fetched):
+                if value is not None:
+                    values[i] = value
+                    self.l1.set(keys[i], value)
+            missing = [i for i in missing if values[i] is None]
+            self._counters["l2_hits"] += len(fetched) - len(missing)
+        self._counters["misses"] += len(missing)
+        if self.l2 is not None and keys:
+            self._pending["hits"] += len(keys) - len(missing)
+            self._pending["misses"] += len(missing)
+            if time.monotonic() - self._flushed_at >= self.stats_interval:
+                await self._flush_stats()
+        return values
+
+    async def _flush_stats(self) -> None:
+        """Перенести накопленные счетчики процесса в общий бэкенд"""
+        self._flushed_at = time.monotonic()
+        for name, key in (("hits", HITS_KEY), ("misses", MISSES_KEY)):
+            value = self._pending[name]
+            if not value:
+                continue
+            try:
+                await self.l2.increment(key, value)
+            except Exception as e:
+                logger.warning(f"Analysis cache stats error: {e}")
+                return
+            self._pending[name] -= value
+
+    async def set_many(
+        self, texts: Sequence[str], results: Sequence[dict], version: str
+    ) -> None:
+        """Сохранить результаты анализа текстов
+
+        Аргументы:
+            texts (Sequence[str]): Тексты уведомлений
+            results (Sequence[dict]): Результаты анализа в порядке текстов
+            version (str): Версия категоризации
+        """
+        pairs = [
+            (text_key(text, version), result) for text, result in zip(texts, results)
+        ]
+        for key, result in pairs:
+            self.l1.set(key, result)
+        if self.l2 is not None and pairs:
+            try:
+                await self.l2.multi_set(pairs, ttl=self.ttl)
+            except Exception as e:
+                logger.warning(f"Analysis cache write error: {e}")
+
+    async def stats(self) -> Dict[str, Any]:
+        """Счетчики попаданий и промахов процесса и, при общем бэкенде, всех процессов"""
+        hits = self._counters["l1_hits"] + self._counters["l2_hits"]
+        result: Dict[str, Any] = {
+            **self._counters,
+            "hit_ratio": hit_ratio(hits, self._counters["misses"]),
+            "l1_entries": len(self.l1),
+            "l1_bytes": self.l1.size,
+        }
+        if self.l2 is not None:
+            await self._flush_stats()
+            try:
+                shared_hits, shared_misses = (
+                    int(value or 0)
+                    for value in await self.l2.multi_get([HITS_KEY, MISSES_KEY])
+                )
+            except Exception as e:
+                logger.warning(f"Analysis cache stats error: {e}")
+            else:
+                result["shared"] = {
+                    "hits": shared_hits,
+                    "misses": shared_misses,
+                    "hit_ratio": hit_ratio(shared_hits, shared_misses),
+                }
+        return result
+
+    def clear(self) -> None:
+        """Очистить кэш процесса и его счетчики"""
+        self.l1.clear()
+        self._counters = dict.fromkeys(self._counters, 0)
+
+
+analysis_cache = AnalysisCache(
+    Config.analysis_cache.l1_max_bytes,
+    Config.analysis_cache.l1_ttl,
+    Config.analysis_cache.ttl,
+    stats_interval=Config.analysis_cache.stats_interval,
+)
+
+
+def init_analysis_cache() -> None:
+    """Подключить общий бэкенд кэша результатов анализа из конфигурации"""
+    if Config.analysis_cache.uri is not None:
+        analysis_cache.l2 = create_backend(Config.analysis_cache.uri)
+
+
+__all__ = [
+    "AnalysisCache",
+    "analysis_cache",
+    "init_analysis_cache",
+    "normalize",
+    "text_key",
+]
@@ -0,0 +1,138 @@
+import random
+from typing import Any, Dict, Iterable, Sequence
+from uuid import UUID
+
+from aiocache.base import BaseCache
+
+from ..cache_codec import EntryCodec
+from ..logger import logger
+
+# Тег записей, не привязанных ни к уведомлению, ни к пользователю
+# (например, список уведомлений без фильтра `user_id`)
+GLOBAL_TAG = "all"
+
+
+class CacheService:
+    """Инвалидация закэшированных ответов по тегам
+
+    Каждая запись кэша помечается тегами вида `notification_id:<id>`,
+    `user_id:<id>` или `all` и хранит версии этих тегов на момент записи.
+    Инвалидация заменяет версию тега новой случайной, после чего все записи с
+    прежней версией считаются отсутствующими. Версии хранятся в том же
+    бэкенде, что и сами записи, поэтому инвалидация из воркера видна
+    API-процессам.
+
+    Версия живет `tag_ttl` секунд - не меньше любой записи, поэтому ключи
+    версий не накапливаются. Истекшая версия читается как 0 и не совпадает
+    ни с одной прежней; счетчик, начавший заново с 1, мог бы совпасть с
+    версией еще живой записи.
+    """
+
+    _cache: BaseCache | None = None
+    _codec: EntryCodec | None = None
+    _tag_ttl: int = 0
+
+    @classmethod
+    def init(
+        cls,
+        cache: BaseCache | None,
+        codec: EntryCodec | None = None,
+        tag_ttl: int = 0,
+    ) -> None:
+        """Подключить бэкенд кэша, в котором хранятся версии тегов, и кодек записей
+
+        Аргументы:
+            cache (BaseCache | None): Бэкенд кэша
+            codec (EntryCodec | None, optional): Кодек записей ответов
+            tag_ttl (int, optional): Время жизни версий тегов (0 - бессрочно)
+        """
+        cls._cache = cache
+        cls._codec = codec
+        cls._tag_ttl = tag_ttl
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Статистика подключенного кэша (для `TieredCache` - по уровням L1/L2)
+
+        В режиме измерения кодека добавляется раздел `routes`: средний размер
+        записи в байтах и время кодирования/декодирования по маршрутам.
+        """
+        stats = getattr(cls._cache, "stats", None)
+        result = stats() if callable(stats) else {}
+        if cls._codec is not None and cls._codec.metrics is not None:
+            result["routes"] = cls._codec.metrics.snapshot()
+        return result
+
+    @staticmethod
+    def tag_key(tag: str) -> str:
+        """Ключ версии тега в кэше"""
+        return f"tag:{tag}"
+
+    @staticmethod
+    def tag(name: str, value: object) -> str:
+        """Сформировать тег, приводя идентификаторы UUID к каноническому виду"""
+        try:
+            value = UUID(str(value))
+        except ValueError:
+            pass
+        return f"{name}:{value}"
+
+    @staticmethod
+    def notification_tags(
+        notification_ids: Iterable[UUID] = (), user_ids: Iterable[UUID] = ()
+    ) -> Sequence[str]:
+        """Теги, затрагиваемые изменением уведомлений
+
+        Аргументы:
+            notification_ids (Iterable[UUID], optional): Идентификаторы измененных уведомлений
+            user_ids (Iterable[UUID], optional): Идентификаторы владельцев уведомлений
+
+        Возвращает:
+            Sequence[str]: Уникальные теги, включая `GLOBAL_TAG`
+        """
+        tags = {CacheService.tag("notification_id", _id) for _id in notification_ids}
+        tags |= {CacheService.tag("user_id", _id) for _id in user_ids}
+        tags.add(GLOBAL_TAG)
+        return sorted(tags)
+
+    @staticmethod
+    def parse_versions(tags: Sequence[str], values: Sequence[Any]) -> Dict[str, int]:
+        """Сопоставить тегам их версии, прочитанные из кэша (`None` - версия 0)"""
+        return {tag: int(value or 0) for tag, value in zip(tags, values)}
+
+    @classmethod
+    async def invalidate(cls, *tags: str, cache: BaseCache | None = None) -> None:
+        """Инвалидировать записи кэша с указанными тегами
+
+        Новые версии всех тегов записываются одним обращением к бэкенду.
+        Ошибки кэша не прерывают вызывающую операцию и только логируются.
+
+        Аргументы:
+            *tags (str): Теги для инвалидации
+            cache (BaseCache | None, optional): Бэкенд кэша. По умолчанию - подключенный через `init`.
+        """
+        if cache is None:
+            cache = cls._cache
+        if cache is None or not tags:
+            return
+        version = random.getrandbits(62) + 1
+        try:
+            await cache.multi_set(
+                [(cls.tag_key(tag), version) for tag in tags],
+                ttl=cls._tag_ttl or None,
+            )
+        except Exception as e:
+            logger.warning(f"Cache invalidation error: {e}")
+        logger.bind(tags=tags).debug("Cache tags invalidated")
+
+    @classmethod
+    async def invalidate_notifications(
+        cls, notification_ids: Iterable[UUID] = (), user_ids: Iterable[UUID] = ()
+    ) -> None:
+        """Инвалидировать записи кэша, затронутые изменением уведомлений
+
+        Аргументы:
+            notification_ids (Iterable[UUID], optional): Идентификаторы измененных уведомлений
+            user_ids (Iterable[UUID], optional): Идентификаторы владельцев уведомлений
+        """
+        await cls.invalidate(*cls.notification_tags(notification_ids, user_ids))
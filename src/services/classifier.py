@@ -0,0 +1,264 @@
+import hashlib
+import json
+import math
+import os
+import re
+import time
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import yaml
+
+from ..config import Config
+from ..config.classifier import ClassifierConfig, ClassifierRule
+from ..logger import logger
+
+# Разделитель текстов пакета: ключевые слова не могут его содержать, поэтому
+# совпадение не может захватить соседние тексты
+SEPARATOR = "\x00"
+
+# Максимальное число ключевых слов в результате классификации
+MAX_KEYWORDS = 3
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Регулярное выражение, совпадающее с любым из слов, в форме префиксного дерева
+
+    Общие префиксы слов объединяются (`error|errors|exception` ->
+    `e(?:rrors?|xception)`), поэтому в каждой позиции текста движок проверяет
+    один символ на узел дерева вместо перебора всех слов. Из нескольких слов,
+    начинающихся в одной позиции, выбирается самое длинное.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str | None:
+        terminal = "" in node
+        if terminal and len(node) == 1:
+            return None
+        branches, chars = [], []
+        for char in sorted(key for key in node if key):
+            rest = build(node[char])
+            if rest is None:
+                chars.append(re.escape(char))
+            else:
+                branches.append(re.escape(char) + rest)
+        if chars:
+            branches.append(chars[0] if len(chars) == 1 else f"[{''.join(chars)}]")
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if terminal:
+            pattern = f"(?:{pattern})?"
+        return pattern
+
+    return build(trie) or ""
+
+
+class RuleClassifier:
+    """Классификатор текстов по взвешенным ключевым словам
+
+    Все ключевые слова всех категорий компилируются в одно регулярное
+    выражение в форме префиксного дерева (см. `trie_pattern`), поэтому текст
+    просматривается один раз независимо от числа категорий и слов, а пакет
+    текстов - одним проходом по их объединению. Поиск ведется по подстроке
+    без учета регистра, как и прежняя проверка `word in text.lower()`:
+    выражение обернуто в опережающую проверку `(?=(...))` и применяется в
+    каждой позиции текста, поэтому перекрывающиеся слова (`paymentor` ->
+    `payment`, `mentor`) находятся все. Из самого длинного слова, найденного в
+    позиции, берутся и все слова-префиксы (`failed` -> `fail`, `failed`).
+
+    Оценка категории - сумма весов ее различных найденных ключевых слов.
+    Выбирается категория с наибольшей оценкой (при равенстве - объявленная
+    раньше), а уверенность равна `best / total * (1 - exp(-best))`: она растет
+    с весом найденных слов и падает, если другие категории тоже набрали очки.
+    Текст без совпадений получает `default_category` с `default_confidence`.
+
+    Аргументы:
+        rules (Sequence[ClassifierRule]): Правила в порядке приоритета
+        default_category (str, optional): Категория текста без совпадений
+        default_confidence (float, optional): Уверенность для категории по умолчанию
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[ClassifierRule],
+        default_category: str = "info",
+        default_confidence: float = 0.8,
+    ) -> None:
+        self.default_category = default_category
+        self.default_confidence = default_confidence
+        self.categories: List[str] = []
+        self._keywords: Dict[str, List[Tuple[int, float]]] = {}
+        for rule in rules:
+            if rule.category not in self.categories:
+                self.categories.append(rule.category)
+            index = self.categories.index(rule.category)
+            for keyword in rule.keywords:
+                keyword = keyword.replace(SEPARATOR, "").lower()
+                if keyword:
+                    self._keywords.setdefault(keyword, []).append((index, rule.weight))
+        # Слова, начинающиеся в той же позиции, что и найденное: его префиксы
+        self._prefixes: Dict[str, List[str]] = {
+            keyword: sorted(
+                (word for word in self._keywords if keyword.startswith(word)),
+                key=len,
+                reverse=True,
+            )
+            for keyword in self._keywords
+        }
+        self._pattern = (
+            re.compile(f"(?=({trie_pattern(self._keywords)}))")
+            if self._keywords
+            else None
+        )
+        self.version = self.rules_version(rules, default_category, default_confidence)
+
+    @staticmethod
+    def rules_version(
+        rules: Sequence[ClassifierRule],
+        default_category: str,
+        default_confidence: float,
+    ) -> str:
+        """Короткий хэш набора правил (меняется при любом изменении правил)"""
+        payload = json.dumps(
+            [
+                [rule.model_dump() for rule in rules],
+                default_category,
+                default_confidence,
+            ],
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+    def _result(self, matched: List[str]) -> dict:
+        scores: Dict[int, float] = {}
+        for keyword in matched:
+            for index, weight in self._keywords[keyword]:
+                scores[index] = scores.get(index, 0.0) + weight
+        if not scores:
+            return {
+                "category": self.default_category,
+                "confidence": self.default_confidence,
+                "keywords": [],
+            }
+        best = max(scores, key=lambda index: (scores[index], -index))
+        return {
+            "category": self.categories[best],
+            "confidence": scores[best]
+            / sum(scores.values())
+            * (1 - math.exp(-scores[best])),
+            "keywords": matched[:MAX_KEYWORDS],
+        }
+
+    def classify(self, text: str) -> dict:
+        """Классифицировать текст
+
+        Аргументы:
+            text (str): Текст уведомления
+
+        Возвращает:
+            dict: `{category, confidence, keywords}`
+        """
+        return self.classify_batch([text])[0]
+
+    def classify_batch(self, texts: Sequence[str]) -> List[dict]:
+        """Классифицировать пакет текстов одним проходом регулярного выражения
+
+        Аргументы:
+            texts (Sequence[str]): Тексты уведомлений
+
+        Возвращает:
+            List[dict]: Результаты `{category, confidence, keywords}` в порядке текстов
+        """
+        matched: List[Dict[str, None]] = [{} for _ in texts]
+        if self._pattern is not None and texts:
+            parts = [text.replace(SEPARATOR, " ").lower() for text in texts]
+            starts = [0, *accumulate(len(part) + 1 for part in parts)]
+            for match in self._pattern.finditer(SEPARATOR.join(parts)):
+                keywords = matched[bisect_right(starts, match.start()) - 1]
+                keywords.update(dict.fromkeys(self._prefixes[match.group(1)]))
+        return [self._result(list(keywords)) for keywords in matched]
+
+
+def load_rules(path: str) -> List[ClassifierRule]:
+    """Загрузить правила из YAML-файла с ключом `rules`"""
+    with open(path, encoding="utf-8") as file:
+        data = yaml.safe_load(file) or {}
+    return [ClassifierRule(**rule) for rule in data.get("rules", [])]
+
+
+def build_classifier(config: ClassifierConfig) -> RuleClassifier:
+    """Скомпилировать классификатор по конфигурации"""
+    rules = load_rules(config.rules_file) if config.rules_file else config.rules
+    return RuleClassifier(rules, config.default_category, config.default_confidence)
+
+
+classifier: RuleClassifier | None = None
+_config: ClassifierConfig | None = None
+_rules_mtime: float | None = None
+_checked_at = 0.0
+
+
+def _mtime(path: str | None) -> float | None:
+    try:
+        return os.stat(path).st_mtime if path else None
+    except OSError:
+        return None
+
+
+def init_classifier(config: ClassifierConfig) -> RuleClassifier:
+    """Скомпилировать и установить текущий классификатор
+
+    Аргументы:
+        config (ClassifierConfig): Конфигурация правил
+
+    Возвращает:
+        RuleClassifier: Новый классификатор
+    """
+    global classifier, _config, _rules_mtime, _checked_at
+    _rules_mtime = _mtime(config.rules_file)
+    classifier = build_classifier(config)
+    _config = config
+    _checked_at = time.monotonic()
+    logger.info(
+        f"Classifier loaded: {len(classifier.categories)} categories, "
+        f"version {classifier.version}"
+    )
+    return classifier
+
+
+def get_classifier() -> RuleClassifier:
+    """Получить текущий классификатор
+
+    При первом обращении классификатор создается по `Config.classifier`.
+    Если правила загружены из файла, не чаще раза в `reload_interval` секунд
+    проверяется время его изменения, и измененный файл перекомпилируется.
+    Ошибка в новом файле логируется, а в работе остается прежний набор правил.
+    """
+    global _checked_at, _rules_mtime
+    if classifier is None or _config is None:
+        return init_classifier(Config.classifier)
+    now = time.monotonic()
+    if _config.rules_file and now - _checked_at >= _config.reload_interval:
+        _checked_at = now
+        mtime = _mtime(_config.rules_file)
+        if mtime != _rules_mtime:
+            try:
+                return init_classifier(_config)
+            except Exception as e:
+                _rules_mtime = mtime
+                logger.warning(f"Classifier rules reload error: {e}")
+    return classifier
+
+
+__all__ = [
+    "RuleClassifier",
+    "build_classifier",
+    "get_classifier",
+    "init_classifier",
+    "load_rules",
+]
@@ -0,0 +1,69 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Sequence, Tuple
+from uuid import UUID
+
+from ..exceptions import InvalidCursorExc
+from ..models import Notification
+
+
+def encode_cursor(created_at: datetime, _id: UUID) -> str:
+    """Упаковать ключ сортировки `(created_at, id)` в непрозрачный курсор
+
+    Аргументы:
+        created_at (datetime): Дата и время создания уведомления
+        _id (UUID): Идентификатор уведомления
+
+    Возвращает:
+        str: Курсор в формате base64url без выравнивания
+    """
+    raw = f"{created_at.isoformat()}|{_id.hex}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Распаковать курсор в ключ сортировки `(created_at, id)`
+
+    Аргументы:
+        cursor (str): Курсор, полученный из `encode_cursor`
+
+    Вызывает исключения:
+        InvalidCursorExc: Если курсор поврежден
+
+    Возвращает:
+        Tuple[datetime, UUID]: Дата создания и идентификатор уведомления
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, _id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(hex=_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursorExc from exc
+
+
+def page_cursors(
+    items: Sequence[Notification],
+    limit: int,
+    after: str | None = None,
+    before: str | None = None,
+) -> Tuple[str | None, str | None]:
+    """Вычислить курсоры соседних страниц
+
+    Аргументы:
+        items (Sequence[Notification]): Уведомления текущей страницы
+        limit (int): Лимит записей на странице
+        after (str | None, optional): Курсор, по которому получена страница. По умолчанию `None`.
+        before (str | None, optional): Курсор, по которому получена страница. По умолчанию `None`.
+
+    Возвращает:
+        Tuple[str | None, str | None]: Курсоры следующей и предыдущей страниц
+    """
+    if not items:
+        return None, None
+    first = encode_cursor(items[0].created_at, items[0].id)
+    last = encode_cursor(items[-1].created_at, items[-1].id)
+    full = len(items) >= limit
+    if before is not None:
+        return last, first if full else None
+    return last if full else None, first if after is not None else None
@@ -0,0 +1,189 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Collection, Dict, Iterable, Mapping, Tuple
+from uuid import UUID
+
+from ..broadcast import MemoryBroadcaster, Subscription
+from ..logger import logger
+from ..models import Notification, ProcessingStatus
+
+
+class EventService:
+    """Рассылка событий уведомлений подписчикам пользователя (SSE/WebSocket)
+
+    События публикуются в канал пользователя `notifications:<user_id>`:
+
+    - `created` - создано уведомление (поля уведомления)
+    - `status` - изменился статус обработки (`id`, `status` и, при
+      завершении, `category` и `confidence`)
+
+    События `status` дополнительно публикуются в канал уведомления
+    `notification:<id>` (ожидание статуса одного уведомления, см.
+    `wait_for_status`).
+
+    Ошибки рассылки не прерывают вызывающую операцию и только логируются.
+    """
+
+    _broadcaster: MemoryBroadcaster = MemoryBroadcaster()
+
+    @classmethod
+    def init(cls, broadcaster: MemoryBroadcaster) -> None:
+        """Подключить рассыльщик событий"""
+        cls._broadcaster = broadcaster
+
+    @classmethod
+    def broadcaster(cls) -> MemoryBroadcaster:
+        """Подключенный рассыльщик событий"""
+        return cls._broadcaster
+
+    @staticmethod
+    def channel(user_id: UUID) -> str:
+        """Канал событий пользователя"""
+        return f"notifications:{UUID(str(user_id))}"
+
+    @staticmethod
+    def notification_channel(_id: UUID) -> str:
+        """Канал событий статуса уведомления"""
+        return f"notification:{UUID(str(_id))}"
+
+    @staticmethod
+    def created_event(obj: Notification) -> Dict[str, Any]:
+        """Событие создания уведомления"""
+        return {
+            "event": "created",
+            "id": str(obj.id),
+            "user_id": str(obj.user_id),
+            "title": obj.title,
+            "text": obj.text,
+            "created_at": obj.created_at.isoformat() if obj.created_at else None,
+            "processing_status": ProcessingStatus.PENDING.value,
+        }
+
+    @staticmethod
+    def status_event(
+        _id: UUID, user_id: UUID, status: ProcessingStatus, **fields: Any
+    ) -> Dict[str, Any]:
+        """Событие изменения статуса обработки уведомления"""
+        return {
+            "event": "status",
+            "id": str(_id),
+            "user_id": str(user_id),
+            "status": ProcessingStatus(status).value,
+            **{name: value for name, value in fields.items() if value is not None},
+        }
+
+    @classmethod
+    async def publish(cls, events: Iterable[Dict[str, Any]]) -> None:
+        """Опубликовать события в каналы их пользователей
+
+        Аргументы:
+            events (Iterable[Dict[str, Any]]): События с полем `user_id`
+        """
+        for event in events:
+            try:
+                await cls._broadcaster.publish(cls.channel(event["user_id"]), event)
+                if event["event"] == "status":
+                    channel = cls.notification_channel(event["id"])
+                    await cls._broadcaster.publish(channel, event)
+            except Exception as e:
+                logger.warning(f"Event publish error: {e}")
+
+    @classmethod
+    async def publish_created(cls, objects: Iterable[Notification]) -> None:
+        """Опубликовать события создания уведомлений"""
+        await cls.publish(cls.created_event(obj) for obj in objects)
+
+    @classmethod
+    async def publish_status(
+        cls,
+        owners: Mapping[UUID, UUID] | Iterable[Tuple[UUID, UUID]],
+        status: ProcessingStatus,
+        **fields: Any,
+    ) -> None:
+        """Опубликовать одинаковое изменение статуса нескольких уведомлений
+
+        Аргументы:
+            owners (Mapping[UUID, UUID] | Iterable[Tuple[UUID, UUID]]): Пары
+                (идентификатор уведомления, идентификатор пользователя)
+            status (ProcessingStatus): Новый статус
+            **fields (Any): Дополнительные поля события
+        """
+        pairs = owners.items() if isinstance(owners, Mapping) else owners
+        await cls.publish(
+            cls.status_event(_id, user_id, status, **fields) for _id, user_id in pairs
+        )
+
+    @classmethod
+    @asynccontextmanager
+    async def subscribe(cls, user_id: UUID) -> AsyncIterator[Subscription]:
+        """Подписаться на события пользователя на время блока `async with`"""
+        async with cls._broadcaster.subscribe(cls.channel(user_id)) as subscription:
+            yield subscription
+
+    @classmethod
+    @asynccontextmanager
+    async def subscribe_notification(cls, _id: UUID) -> AsyncIterator[Subscription]:
+        """Подписаться на изменения статуса уведомления на время блока `async with`"""
+        channel = cls.notification_channel(_id)
+        async with cls._broadcaster.subscribe(channel) as subscription:
+            yield subscription
+
+    @staticmethod
+    async def wait_for_status(
+        subscription: Subscription, statuses: Collection[str], timeout: float
+    ) -> str | None:
+        """Дождаться события статуса из `statuses`
+
+        Аргументы:
+            subscription (Subscription): Подписка на канал уведомления
+            statuses (Collection[str]): Ожидаемые статусы
+            timeout (float): Максимальное время ожидания в секундах
+
+        Возвращает:
+            str | None: Дождавшийся статус, иначе - последний полученный статус
+                или `None`, если за `timeout` событий не было
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        last = None
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event = await asyncio.wait_for(subscription.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            last = event.get("status", last)
+            if last in statuses:
+                break
+        return last
+
+    @staticmethod
+    def format_sse(event: Dict[str, Any]) -> str:
+        """Сообщение Server-Sent Events"""
+        return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+    @classmethod
+    async def stream(cls, user_id: UUID, keepalive: float) -> AsyncIterator[str]:
+        """Поток событий пользователя в формате Server-Sent Events
+
+        Первым отправляется комментарий (клиент сразу получает заголовки
+        ответа), затем события по мере публикации. Без событий каждые
+        `keepalive` секунд отправляется комментарий, чтобы прокси не
+        закрывали соединение.
+
+        Аргументы:
+            user_id (UUID): Идентификатор пользователя
+            keepalive (float): Интервал пингов в секундах
+
+        Возвращает:
+            AsyncIterator[str]: Сообщения SSE
+        """
+        async with cls.subscribe(user_id) as subscription:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield cls.format_sse(event)
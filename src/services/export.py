@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Sequence
+from uuid import UUID
+
+from sqlalchemy import Row
+
+from ..models import Notification
+
+# Выгружаемые колонки уведомления в порядке полей NDJSON и столбцов CSV
+EXPORT_COLUMNS = (
+    Notification.id,
+    Notification.user_id,
+    Notification.title,
+    Notification.text,
+    Notification.created_at,
+    Notification.read_at,
+    Notification.category,
+    Notification.confidence,
+    Notification.processing_status,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+
+class ExportFormat(str, Enum):
+    """Форматы выгрузки уведомлений
+
+    - NDJSON - один JSON-объект на строку
+    - CSV - заголовок и строка на уведомление
+    """
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        """MIME-тип ответа"""
+        if self is ExportFormat.CSV:
+            return "text/csv; charset=utf-8"
+        return "application/x-ndjson"
+
+
+def plain(value: Any) -> Any:
+    """Значение колонки в JSON-совместимом виде"""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+async def encode_ndjson(
+    partitions: AsyncIterator[Sequence[Row]],
+) -> AsyncIterator[bytes]:
+    """Кодировать части выборки в NDJSON (один фрагмент ответа на часть)"""
+    async for rows in partitions:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, map(plain, row)))) + "\n" for row in rows
+        ).encode()
+
+
+async def encode_csv(partitions: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    """Кодировать части выборки в CSV (заголовок, затем один фрагмент на часть)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue().encode()
+    async for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([plain(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+
+
+def encode(
+    export_format: ExportFormat, partitions: AsyncIterator[Sequence[Row]]
+) -> AsyncIterator[bytes]:
+    """Кодировать части выборки в формат `export_format`"""
+    if export_format is ExportFormat.CSV:
+        return encode_csv(partitions)
+    return encode_ndjson(partitions)
+
+
+__all__ = ["EXPORT_COLUMNS", "EXPORT_FIELDS", "ExportFormat", "encode"]
@@ -1,13 +1,70 @@
-from datetime import datetime
-from typing import Any, Dict, Sequence, Tuple
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Sequence,
+    Tuple,
+)
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    case,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
-from ..exceptions import NotificationNotFoundExc
+from ..exceptions import InvalidCursorExc, NotificationNotFoundExc
 from ..logger import logger
-from ..models import Notification, ProcessingStatus
+from ..models import Notification, ProcessingStatus, UserUnreadCounter, utcnow
+from ..sql import Explain
+from .cache_service import CacheService
+from .cursor import decode_cursor
+from .event_service import EventService
+from .export import EXPORT_COLUMNS
+from .search import SearchTerms, get_search_backend
+
+
+class CountMode(str, Enum):
+    """Способы подсчета общего количества записей в списке уведомлений
+
+    - EXACT - точный `count(*)` отдельным запросом
+    - ESTIMATED - оценка планировщика PostgreSQL (в остальных СУБД - точный подсчет)
+    - WINDOW - `count(*) OVER ()` в том же запросе, что и страница
+    - NONE - подсчет не выполняется
+    """
+
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    WINDOW = "window"
+    NONE = "none"
+
+
+class Ordering(str, Enum):
+    """Порядок сортировки списка уведомлений
+
+    - CREATED_AT - по дате создания, от новых к старым
+    - RELEVANCE - по релевантности нестрогих текстовых фильтров, затем по дате создания
+    """
+
+    CREATED_AT = "created_at"
+    RELEVANCE = "relevance"
 
 
 class NotificationService:
@@ -30,19 +87,59 @@ class NotificationService:
         """
         obj = Notification(user_id=user_id, title=title, text=text)
         db.add(obj)
+        await NotificationService._add_unread(db, {user_id: 1})
         await db.commit()
         logger.bind(notification_id=obj.id, user_id=user_id, title=title).info(
             "Notification has been created"
         )
+        await CacheService.invalidate_notifications(user_ids=[user_id])
+        await EventService.publish_created([obj])
         return obj
 
     @staticmethod
-    async def get(db: AsyncSession, _id: UUID) -> Notification:
+    async def create_many(
+        db: AsyncSession, items: Sequence[Dict[str, Any]]
+    ) -> List[Notification]:
+        """Записать пакет уведомлений в базу данных одним запросом
+
+        Строки вставляются многострочным `INSERT ... RETURNING` в рамках одной
+        транзакции, порядок возвращаемых объектов совпадает с порядком `items`.
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            items (Sequence[Dict[str, Any]]): Поля уведомлений (`user_id`, `title`, `text`)
+
+        Возвращает:
+            List[Notification]: Объекты созданных уведомлений
+        """
+        if not items:
+            return []
+        result = await db.scalars(
+            insert(Notification).returning(Notification, sort_by_parameter_order=True),
+            [dict(item) for item in items],
+        )
+        objects = list(result.all())
+        await NotificationService._add_unread(
+            db, Counter(obj.user_id for obj in objects)
+        )
+        await db.commit()
+        logger.bind(count=len(objects)).info("Notifications have been created")
+        await CacheService.invalidate_notifications(
+            user_ids={obj.user_id for obj in objects}
+        )
+        await EventService.publish_created(objects)
+        return objects
+
+    @staticmethod
+    async def get(
+        db: AsyncSession, _id: UUID, for_update: bool = False
+    ) -> Notification:
         """Получить уведомление из базы данных
 
         Аргументы:
             db (AsyncSession): Активная сессия базы данных
             _id (UUID): Идентификатор уведомления
+            for_update (bool, optional): Заблокировать строку до конца транзакции. По умолчанию `False`.
 
         Вызывает исключения:
             NotificationNotFoundExc: Если уведомление с идентификатором не найдено
@@ -50,7 +147,10 @@ class NotificationService:
         Возвращает:
             Notification: Объект уведомления
         """
-        obj = await db.get(Notification, _id)
+        if for_update:
+            obj = await db.get(Notification, _id, with_for_update=True)
+        else:
+            obj = await db.get(Notification, _id)
         if obj is None:
             logger.bind(notification_id=_id).warning("Notification not found")
             raise NotificationNotFoundExc
@@ -58,8 +158,7 @@ class NotificationService:
         return obj
 
     @staticmethod
-    async def get_list(
-        db: AsyncSession,
+    def build_query(
         user_id: UUID | None = None,
         title: str | None = None,
         title_strict: bool = True,
@@ -73,40 +172,20 @@ class NotificationService:
         confidence_start: float | None = None,
         confidence_end: float | None = None,
         processing_status: ProcessingStatus | None = None,
-        limit: int = 10,
-        offset: int = 0,
         is_read: bool | None = None,
-    ) -> Tuple[Sequence[Notification], int]:
-        """Получить список уведомлений на основе фильтров
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """Построить запрос выборки уведомлений по фильтрам без сортировки и пагинации
 
-        Аргументы:
-            db (AsyncSession): Активная сессия базы данных
-            user_id (UUID | None, optional): Идентификатор пользователя. По умолчанию `None`.
-            title (str | None, optional): Заголовок уведомления. По умолчанию `None`.
-            title_strict (bool, optional): Если True поиск полного соответствия, иначе поиск подстроки. По умолчанию `True`.
-            text (str | None, optional): Текст уведомления. По умолчанию `None`.
-            created_at_start (datetime | None, optional): Время и дата начала создания уведомления. По умолчанию `None`.
-            created_at_end (datetime | None, optional): Время и дата завершения создания уведомления. По умолчанию `None`.
-            readed_at_start (datetime | None, optional): Время и дата начала прочтения уведомления. По умолчанию `None`.
-            readed_at_end (datetime | None, optional): Время и дата завершения прочтения уведомления. По умолчанию `None`.
-            category (str | None, optional): Категория уведомления. По умолчанию `None`.
-            category_strict (bool, optional): Если True поиск полного соответствия, иначе поиск подстроки.
-            По умолчанию `False`.
-            confidence_start (float | None, optional): Нижний порог оценки соответствия контента категории уведомления.
-            По умолчанию `None`.
-            confidence_end (float | None, optional): Верхний порог оценки соответствия контента категории уведомления.
-            По умолчанию `None`.
-            processing_status (ProcessingStatus | None, optional): Статус обработки уведомления. По умолчанию `None`.
-            limit (int, optional): Лимит записей в запросе. По умолчанию `10`.
-            offset (int, optional): Смещение по записям. По умолчанию `0`.
-            is_read (bool | None, optional): Отобразить только прочтенные уведомления. По умолчанию `None`.
+        Нестрогие фильтры `title`, `text` и `category` выполняются текущим поисковым
+        бэкендом (см. `services.search`). Аргументы совпадают с одноименными
+        аргументами `NotificationService.get_list`.
 
         Возвращает:
-            Tuple[Sequence[Notification], int]: Последовательность найденных уведомлений и общее количество найденных по
-            фильтрам записей
+            Tuple[Select, Dict[str, Any]]: Запрос и словарь примененных фильтров для логирования
         """
         query = select(Notification)
         used_filters: Dict[str, Any] = dict()
+        search = get_search_backend()
 
         if is_read is not None:
             used_filters.update({"is_read": is_read})
@@ -124,11 +203,11 @@ class NotificationService:
             if title_strict:
                 query = query.where(Notification.title == title)
             else:
-                query = query.where(Notification.title.ilike(f"%{title}%"))
+                query = query.where(search.match(Notification.title, title))
 
         if text is not None:
             used_filters.update({"text": text})
-            query = query.where(Notification.text.ilike(f"%{text}%"))
+            query = query.where(search.match(Notification.text, text))
 
         if created_at_start is not None:
             used_filters.update({"created_at_start": created_at_start})
@@ -151,7 +230,7 @@ class NotificationService:
             if category_strict:
                 query = query.where(Notification.category == category)
             else:
-                query = query.where(Notification.category.ilike(f"%{category}%"))
+                query = query.where(search.match(Notification.category, category))
 
         if confidence_start is not None:
             used_filters.update({"confidence_start": confidence_start})
@@ -164,20 +243,243 @@ class NotificationService:
             used_filters.update({"processing_status": processing_status})
             query = query.where(Notification.processing_status == processing_status)
 
-        query = query.order_by(Notification.created_at.desc())
+        return query, used_filters
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar() or 0
+    @staticmethod
+    def paginate(
+        query: Select,
+        limit: int = 10,
+        offset: int = 0,
+        after: str | None = None,
+        before: str | None = None,
+        rank: ColumnElement[float] | None = None,
+    ) -> Select:
+        """Добавить к запросу сортировку `(created_at, id) DESC` и ограничение страницы
+
+        Аргументы:
+            query (Select): Запрос, построенный `NotificationService.build_query`
+            limit (int, optional): Лимит записей в запросе. По умолчанию `10`.
+            offset (int, optional): Смещение по записям, игнорируется при указании курсора. По умолчанию `0`.
+            after (str | None, optional): Курсор, после которого начинается страница. По умолчанию `None`.
+            before (str | None, optional): Курсор, перед которым заканчивается страница. Записи страницы
+            возвращаются в порядке возрастания. По умолчанию `None`.
+            rank (ColumnElement[float] | None, optional): Выражение релевантности. Если указано, записи
+            сортируются по нему по убыванию; курсоры в этом режиме не поддерживаются. По умолчанию `None`.
 
-        query = query.limit(limit).offset(offset)
+        Вызывает исключения:
+            InvalidCursorExc: Если курсор поврежден или указан вместе с `rank`
 
-        result = await db.execute(query)
-        notifications = result.scalars().all()
+        Возвращает:
+            Select: Запрос страницы
+        """
+        if rank is not None:
+            if after is not None or before is not None:
+                raise InvalidCursorExc
+            return (
+                query.order_by(
+                    rank.desc(), Notification.created_at.desc(), Notification.id.desc()
+                )
+                .limit(limit)
+                .offset(offset)
+            )
+        sort_key = tuple_(Notification.created_at, Notification.id)
+        if before is not None:
+            return (
+                query.where(sort_key > decode_cursor(before))
+                .order_by(Notification.created_at.asc(), Notification.id.asc())
+                .limit(limit)
+            )
+        query = query.order_by(Notification.created_at.desc(), Notification.id.desc())
+        if after is not None:
+            return query.where(sort_key < decode_cursor(after)).limit(limit)
+        return query.limit(limit).offset(offset)
+
+    @staticmethod
+    async def get_list(
+        db: AsyncSession,
+        user_id: UUID | None = None,
+        title: str | None = None,
+        title_strict: bool = True,
+        text: str | None = None,
+        created_at_start: datetime | None = None,
+        created_at_end: datetime | None = None,
+        readed_at_start: datetime | None = None,
+        readed_at_end: datetime | None = None,
+        category: str | None = None,
+        category_strict: bool = False,
+        confidence_start: float | None = None,
+        confidence_end: float | None = None,
+        processing_status: ProcessingStatus | None = None,
+        limit: int = 10,
+        offset: int = 0,
+        is_read: bool | None = None,
+        after: str | None = None,
+        before: str | None = None,
+        count_mode: CountMode = CountMode.EXACT,
+        ordering: Ordering = Ordering.CREATED_AT,
+    ) -> Tuple[Sequence[Notification], int | None]:
+        """Получить список уведомлений на основе фильтров
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            user_id (UUID | None, optional): Идентификатор пользователя. По умолчанию `None`.
+            title (str | None, optional): Заголовок уведомления. По умолчанию `None`.
+            title_strict (bool, optional): Если True поиск полного соответствия, иначе поиск подстроки. По умолчанию `True`.
+            text (str | None, optional): Текст уведомления. По умолчанию `None`.
+            created_at_start (datetime | None, optional): Время и дата начала создания уведомления. По умолчанию `None`.
+            created_at_end (datetime | None, optional): Время и дата завершения создания уведомления. По умолчанию `None`.
+            readed_at_start (datetime | None, optional): Время и дата начала прочтения уведомления. По умолчанию `None`.
+            readed_at_end (datetime | None, optional): Время и дата завершения прочтения уведомления. По умолчанию `None`.
+            category (str | None, optional): Категория уведомления. По умолчанию `None`.
+            category_strict (bool, optional): Если True поиск полного соответствия, иначе поиск подстроки.
+            По умолчанию `False`.
+            confidence_start (float | None, optional): Нижний порог оценки соответствия контента категории уведомления.
+            По умолчанию `None`.
+            confidence_end (float | None, optional): Верхний порог оценки соответствия контента категории уведомления.
+            По умолчанию `None`.
+            processing_status (ProcessingStatus | None, optional): Статус обработки уведомления. По умолчанию `None`.
+            limit (int, optional): Лимит записей в запросе. По умолчанию `10`.
+            offset (int, optional): Смещение по записям. По умолчанию `0`.
+            is_read (bool | None, optional): Отобразить только прочтенные уведомления. По умолчанию `None`.
+            after (str | None, optional): Курсор, после которого начинается страница (более старые записи).
+            Если указан, `offset` игнорируется. По умолчанию `None`.
+            before (str | None, optional): Курсор, перед которым заканчивается страница (более новые записи).
+            Если указан, `offset` игнорируется. По умолчанию `None`.
+            count_mode (CountMode, optional): Способ подсчета общего количества записей. При курсорной пагинации
+            `CountMode.WINDOW` возвращает количество записей за курсором. По умолчанию `CountMode.EXACT`.
+            ordering (Ordering, optional): Порядок сортировки. `Ordering.RELEVANCE` учитывается только при наличии
+            нестрогих текстовых фильтров и поддерживающего ранжирование поискового бэкенда, курсоры в этом режиме
+            не поддерживаются. По умолчанию `Ordering.CREATED_AT`.
+
+        Вызывает исключения:
+            InvalidCursorExc: Если курсор поврежден, указаны одновременно `after` и `before` или курсор указан
+            при сортировке по релевантности
+
+        Возвращает:
+            Tuple[Sequence[Notification], int | None]: Последовательность найденных уведомлений и общее количество
+            найденных по фильтрам записей (`None` для `CountMode.NONE`)
+        """
+        query, used_filters = NotificationService.build_query(
+            user_id=user_id,
+            title=title,
+            title_strict=title_strict,
+            text=text,
+            created_at_start=created_at_start,
+            created_at_end=created_at_end,
+            readed_at_start=readed_at_start,
+            readed_at_end=readed_at_end,
+            category=category,
+            category_strict=category_strict,
+            confidence_start=confidence_start,
+            confidence_end=confidence_end,
+            processing_status=processing_status,
+            is_read=is_read,
+        )
+
+        if after is not None and before is not None:
+            raise InvalidCursorExc
+
+        total: int | None = None
+        if count_mode == CountMode.EXACT:
+            total = await NotificationService._count_exact(db, query)
+        elif count_mode == CountMode.ESTIMATED:
+            total = await NotificationService._count_estimated(db, query)
+
+        if after is not None:
+            used_filters.update({"after": after})
+        if before is not None:
+            used_filters.update({"before": before})
+        rank = None
+        if ordering == Ordering.RELEVANCE:
+            terms: SearchTerms = {
+                column: value
+                for column, value, strict in (
+                    (Notification.title, title, title_strict),
+                    (Notification.text, text, False),
+                    (Notification.category, category, category_strict),
+                )
+                if value is not None and not strict
+            }
+            rank = get_search_backend().rank(terms)
+        query = NotificationService.paginate(
+            query, limit=limit, offset=offset, after=after, before=before, rank=rank
+        )
+
+        notifications: Sequence[Notification]
+        if count_mode == CountMode.WINDOW:
+            rows = (await db.execute(query.add_columns(func.count().over()))).all()
+            notifications = [row[0] for row in rows]
+            if rows:
+                total = rows[0][1]
+            elif limit > 0 and (offset == 0 or after is not None or before is not None):
+                total = 0
+            else:
+                # Пустая страница при `limit=0` или за концом выборки ничего не
+                # говорит о количестве: считается тот же запрос без пагинации
+                total = await NotificationService._count_exact(
+                    db, query.limit(None).offset(None).order_by(None)
+                )
+        else:
+            result = await db.execute(query)
+            notifications = result.scalars().all()
+        if before is not None:
+            notifications = notifications[::-1]
 
         logger.bind(**used_filters).info(f"Notifications found: {total}")
         return (notifications, total)
 
+    @staticmethod
+    async def stream_list(
+        db: AsyncSession, chunk_size: int = 1000, **filters: Any
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Выгрузить уведомления по фильтрам частями через серверный курсор
+
+        Строки читаются курсором (`yield_per`) частями по `chunk_size` без
+        создания ORM-объектов, поэтому потребление памяти не зависит от
+        размера выборки. Порядок - `(created_at, id) DESC`.
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            chunk_size (int, optional): Размер части. По умолчанию `1000`.
+            **filters (Any): Фильтры `NotificationService.build_query`
+
+        Возвращает:
+            AsyncIterator[Sequence[Row]]: Части выборки, строки с колонками `EXPORT_COLUMNS`
+        """
+        query, used_filters = NotificationService.build_query(**filters)
+        query = (
+            query.with_only_columns(*EXPORT_COLUMNS)
+            .order_by(Notification.created_at.desc(), Notification.id.desc())
+            .execution_options(yield_per=chunk_size)
+        )
+        logger.bind(**used_filters).info("Notifications export started")
+        result = await db.stream(query)
+        count = 0
+        async for partition in result.partitions():
+            count += len(partition)
+            yield partition
+        logger.bind(count=count).info("Notifications export finished")
+
+    @staticmethod
+    async def _count_exact(db: AsyncSession, query: Select) -> int:
+        """Точный подсчет записей запроса"""
+        count_query = select(func.count()).select_from(query.subquery())
+        total_result = await db.execute(count_query)
+        return total_result.scalar() or 0
+
+    @staticmethod
+    async def _count_estimated(db: AsyncSession, query: Select) -> int:
+        """Оценка количества записей запроса по статистике планировщика PostgreSQL
+
+        Для остальных СУБД выполняется точный подсчет.
+        """
+        if db.get_bind().dialect.name != "postgresql":
+            return await NotificationService._count_exact(db, query)
+        plan = (await db.execute(Explain(query))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
     @staticmethod
     async def mark_as_read(db: AsyncSession, _id: UUID) -> None:
         """Пометить уведомление прочитанным
@@ -189,10 +491,176 @@ class NotificationService:
         Вызывает исключения:
             NotificationNotFoundExc: Если уведомление с идентификатором не найдено
         """
-        obj = await NotificationService.get(db, _id)
-        obj.read_at = func.now()
+        obj = await NotificationService.get(db, _id, for_update=True)
+        if obj.read_at is None:
+            obj.read_at = func.now()
+            await NotificationService._add_unread(db, {obj.user_id: -1})
         await db.commit()
         logger.bind(notification_id=obj.id).info("The notification is marked as read")
+        await CacheService.invalidate_notifications([obj.id], [obj.user_id])
+
+    @staticmethod
+    def _insert(db: AsyncSession) -> Any:
+        """Конструктор INSERT диалекта сессии (с поддержкой `ON CONFLICT`)"""
+        if db.get_bind().dialect.name == "postgresql":
+            return postgresql.insert
+        return sqlite.insert
+
+    @staticmethod
+    async def _add_unread(db: AsyncSession, deltas: Dict[UUID, int]) -> None:
+        """Изменить счетчики непрочитанных уведомлений в текущей транзакции
+
+        Счетчики изменяются одним `INSERT ... ON CONFLICT DO UPDATE` в порядке
+        идентификаторов пользователей, поэтому конкурирующие транзакции
+        блокируют строки счетчиков в одном порядке.
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            deltas (Dict[UUID, int]): Изменения счетчиков по пользователям
+        """
+        values = [
+            {"user_id": user_id, "unread": delta}
+            for user_id, delta in sorted(deltas.items(), key=lambda item: str(item[0]))
+            if delta
+        ]
+        if not values:
+            return
+        stmt = NotificationService._insert(db)(UserUnreadCounter).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserUnreadCounter.user_id],
+            set_={"unread": UserUnreadCounter.unread + stmt.excluded.unread},
+        )
+        await db.execute(stmt)
+
+    @staticmethod
+    async def get_unread_count(db: AsyncSession, user_id: UUID) -> int:
+        """Количество непрочитанных уведомлений пользователя (чтение счетчика)
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            user_id (UUID): Идентификатор пользователя
+
+        Возвращает:
+            int: Количество непрочитанных уведомлений
+        """
+        unread = await db.scalar(
+            select(UserUnreadCounter.unread).where(UserUnreadCounter.user_id == user_id)
+        )
+        return unread or 0
+
+    @staticmethod
+    async def reconcile_unread_counters(db: AsyncSession) -> int:
+        """Сверить счетчики непрочитанных уведомлений с таблицей уведомлений
+
+        Исправляет счетчики, разошедшиеся с фактическим количеством
+        непрочитанных уведомлений, и создает недостающие.
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+
+        Возвращает:
+            int: Число исправленных и созданных счетчиков
+        """
+        actual = (
+            select(func.count())
+            .where(
+                Notification.user_id == UserUnreadCounter.user_id,
+                Notification.read_at.is_(None),
+            )
+            .correlate(UserUnreadCounter)
+            .scalar_subquery()
+        )
+        fixed = await db.execute(
+            update(UserUnreadCounter)
+            .where(UserUnreadCounter.unread != actual)
+            .values(unread=actual)
+            .execution_options(synchronize_session=False)
+        )
+        missing = (
+            NotificationService._insert(db)(UserUnreadCounter)
+            .from_select(
+                ["user_id", "unread"],
+                select(Notification.user_id, func.count())
+                .where(
+                    Notification.read_at.is_(None),
+                    ~exists().where(UserUnreadCounter.user_id == Notification.user_id),
+                )
+                .group_by(Notification.user_id),
+            )
+            .on_conflict_do_nothing()
+        )
+        added = await db.execute(missing)
+        await db.commit()
+        count = max(fixed.rowcount, 0) + max(added.rowcount, 0)
+        if count:
+            logger.bind(count=count).warning("Unread counters reconciled")
+        return count
+
+    @staticmethod
+    async def _mark_read_where(db: AsyncSession, *criteria: ColumnElement) -> int:
+        """Пометить прочитанными непрочитанные уведомления одним UPDATE
+
+        Возвращает:
+            int: Число помеченных уведомлений
+        """
+        stmt = (
+            update(Notification)
+            .where(Notification.read_at.is_(None), *criteria)
+            .values(read_at=func.now())
+            .returning(Notification.id, Notification.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await db.execute(stmt)).all()
+        await NotificationService._add_unread(
+            db,
+            {
+                user_id: -count
+                for user_id, count in Counter(row.user_id for row in rows).items()
+            },
+        )
+        await db.commit()
+        if rows:
+            logger.bind(count=len(rows)).info("Notifications are marked as read")
+            await CacheService.invalidate_notifications(
+                [row.id for row in rows], {row.user_id for row in rows}
+            )
+        return len(rows)
+
+    @staticmethod
+    async def mark_many_as_read(db: AsyncSession, ids: Sequence[UUID]) -> int:
+        """Пометить прочитанными уведомления по идентификаторам
+
+        Уже прочитанные и отсутствующие уведомления пропускаются.
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            ids (Sequence[UUID]): Идентификаторы уведомлений
+
+        Возвращает:
+            int: Число помеченных уведомлений
+        """
+        if not ids:
+            return 0
+        return await NotificationService._mark_read_where(db, Notification.id.in_(ids))
+
+    @staticmethod
+    async def mark_all_as_read(
+        db: AsyncSession, user_id: UUID, before: datetime | None = None
+    ) -> int:
+        """Пометить прочитанными все непрочитанные уведомления пользователя
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            user_id (UUID): Идентификатор пользователя
+            before (datetime | None, optional): Только уведомления, созданные не позже этого момента. По умолчанию - все.
+
+        Возвращает:
+            int: Число помеченных уведомлений
+        """
+        criteria = [Notification.user_id == user_id]
+        if before is not None:
+            criteria.append(Notification.created_at <= before)
+        return await NotificationService._mark_read_where(db, *criteria)
 
     @staticmethod
     async def set_status(db: AsyncSession, _id: UUID, status: ProcessingStatus) -> None:
@@ -203,6 +671,8 @@ class NotificationService:
         logger.bind(notification_id=obj.id).info(
             f"Notification status changed from `{old_status}` to `{status}`"
         )
+        await CacheService.invalidate_notifications([obj.id], [obj.user_id])
+        await EventService.publish_status({obj.id: obj.user_id}, status)
 
     @staticmethod
     async def add_ai_results(
@@ -232,3 +702,362 @@ class NotificationService:
         logger.bind(notification_id=obj.id).info(
             "AI evaluation results added to notification"
         )
+        await CacheService.invalidate_notifications([obj.id], [obj.user_id])
+        await EventService.publish_status(
+            {obj.id: obj.user_id},
+            ProcessingStatus.COMPLETED,
+            category=obj.category,
+            confidence=obj.confidence,
+        )
+
+    @staticmethod
+    async def claim_pending(
+        db: AsyncSession,
+        ids: Sequence[UUID] | None = None,
+        limit: int | None = None,
+        lease: float | None = None,
+    ) -> Sequence[Row]:
+        """Перевести ожидающие обработки уведомления в статус `processing`
+
+        Выборка и смена статуса выполняются одним UPDATE ... RETURNING, поэтому
+        уведомление достается только одному обработчику, а уже обработанные
+        (или повторно доставленные) идентификаторы пропускаются. В PostgreSQL
+        строки выбираются с `FOR UPDATE SKIP LOCKED`, и конкурирующие
+        обработчики не ждут друг друга, а получают разные пакеты.
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            ids (Sequence[UUID] | None, optional): Ограничить выборку идентификаторами. По умолчанию - любые ожидающие.
+            limit (int | None, optional): Максимальное число уведомлений (самые старые). По умолчанию - без ограничения.
+            lease (float | None, optional): Срок аренды в секундах, после которого
+                незавершенная обработка возвращается в очередь (см. `requeue_expired`). По умолчанию - без срока.
+
+        Возвращает:
+            Sequence[Row]: Строки `(id, text, user_id)` захваченных уведомлений
+        """
+        candidates = select(Notification.id).where(
+            Notification.processing_status == ProcessingStatus.PENDING
+        )
+        if ids is not None:
+            candidates = candidates.where(Notification.id.in_(ids))
+        if limit is not None:
+            candidates = candidates.order_by(Notification.created_at).limit(limit)
+        candidates = candidates.with_for_update(skip_locked=True)
+        stmt = (
+            update(Notification)
+            .where(
+                Notification.id.in_(candidates.scalar_subquery()),
+                Notification.processing_status == ProcessingStatus.PENDING,
+            )
+            .values(
+                processing_status=ProcessingStatus.PROCESSNG,
+                lease_expires_at=NotificationService.lease_deadline(lease),
+            )
+            .returning(Notification.id, Notification.text, Notification.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await db.execute(stmt)).all()
+        await db.commit()
+        if rows:
+            logger.bind(count=len(rows)).info("Notifications claimed for processing")
+            await CacheService.invalidate_notifications(
+                [row.id for row in rows], {row.user_id for row in rows}
+            )
+            await EventService.publish_status(
+                [(row.id, row.user_id) for row in rows], ProcessingStatus.PROCESSNG
+            )
+        return rows
+
+    @staticmethod
+    async def save_ai_results(
+        db: AsyncSession, results: Sequence[Dict[str, Any]]
+    ) -> int:
+        """Записать результаты AI-обработки пакета уведомлений одним UPDATE
+
+        Изменяются только уведомления, все еще находящиеся в статусе
+        `processing`: строки, аренду которых за время обработки перехватил
+        другой воркер или которые уже получили итоговый статус, не
+        перезаписываются. Кэш инвалидируется и события рассылаются только для
+        измененных строк.
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            results (Sequence[Dict[str, Any]]): Значения по уведомлениям: `id` и
+                обновляемые поля (`category`, `confidence`, `processing_status`).
+                Набор полей должен совпадать у всех элементов.
+
+        Возвращает:
+            int: Число измененных уведомлений
+        """
+        if not results:
+            return 0
+        columns = Notification.__table__.c
+        values = {
+            field: case(
+                {
+                    item["id"]: literal(item[field], columns[field].type)
+                    for item in results
+                },
+                value=Notification.id,
+            )
+            for field in results[0]
+            if field != "id"
+        }
+        stmt = (
+            update(Notification)
+            .where(
+                Notification.id.in_([item["id"] for item in results]),
+                Notification.processing_status == ProcessingStatus.PROCESSNG,
+            )
+            .values(**values)
+            .returning(Notification.id, Notification.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        owners = {row.id: row.user_id for row in await db.execute(stmt)}
+        await db.commit()
+        logger.bind(count=len(owners), skipped=len(results) - len(owners)).info(
+            "AI evaluation results added to notifications"
+        )
+        if not owners:
+            return 0
+        await CacheService.invalidate_notifications(owners, set(owners.values()))
+        await EventService.publish(
+            EventService.status_event(
+                item["id"],
+                owners[item["id"]],
+                item["processing_status"],
+                category=item.get("category"),
+                confidence=item.get("confidence"),
+            )
+            for item in results
+            if item["id"] in owners
+        )
+        return len(owners)
+
+    @staticmethod
+    async def _transition(
+        db: AsyncSession,
+        _id: UUID,
+        from_status: ProcessingStatus,
+        returning: Sequence[InstrumentedAttribute],
+        **values: Any,
+    ) -> Row | None:
+        """Условно изменить уведомление одним UPDATE ... RETURNING
+
+        Строка изменяется, только если ее статус равен `from_status`.
+
+        Возвращает:
+            Row | None: Значения `returning` или `None`, если строка не изменена
+        """
+        stmt = (
+            update(Notification)
+            .where(
+                Notification.id == _id,
+                Notification.processing_status == from_status,
+            )
+            .values(**values)
+            .returning(*returning)
+            .execution_options(synchronize_session=False)
+        )
+        row = (await db.execute(stmt)).first()
+        await db.commit()
+        if row is not None:
+            logger.bind(notification_id=_id).info(
+                f"Notification status changed from `{from_status}` to "
+                f"`{values['processing_status']}`"
+            )
+            await CacheService.invalidate_notifications([_id], [row.user_id])
+            await EventService.publish_status(
+                {_id: row.user_id},
+                values["processing_status"],
+                category=values.get("category"),
+                confidence=values.get("confidence"),
+            )
+        return row
+
+    @staticmethod
+    async def claim_for_processing(
+        db: AsyncSession, _id: UUID, lease: float | None = None
+    ) -> Row | None:
+        """Захватить уведомление на обработку (`pending` -> `processing`)
+
+        Повторная доставка той же задачи или конкурирующий обработчик получают
+        `None` без дополнительных запросов.
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            _id (UUID): Идентификатор уведомления
+            lease (float | None, optional): Срок аренды в секундах. По умолчанию - без срока.
+
+        Возвращает:
+            Row | None: Строка `(text, user_id)` или `None`, если уведомление не найдено или уже захвачено
+        """
+        return await NotificationService._transition(
+            db,
+            _id,
+            ProcessingStatus.PENDING,
+            (Notification.text, Notification.user_id),
+            processing_status=ProcessingStatus.PROCESSNG,
+            lease_expires_at=NotificationService.lease_deadline(lease),
+        )
+
+    @staticmethod
+    async def complete_processing(
+        db: AsyncSession,
+        _id: UUID,
+        category: str | None = None,
+        confidence: float | None = None,
+    ) -> bool:
+        """Записать результаты AI-обработки (`processing` -> `completed`)
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            _id (UUID): Идентификатор уведомления
+            category (str | None, optional): Категория уведомления. По умолчанию `None`.
+            confidence (float | None, optional): Оценка соответствия категории к тексту уведомления. По умолчанию `None`.
+
+        Возвращает:
+            bool: `True`, если уведомление находилось в обработке и было обновлено
+        """
+        values: Dict[str, Any] = {
+            "processing_status": ProcessingStatus.COMPLETED,
+            "lease_expires_at": None,
+        }
+        if category is not None:
+            values["category"] = category
+        if confidence is not None:
+            values["confidence"] = confidence
+        row = await NotificationService._transition(
+            db, _id, ProcessingStatus.PROCESSNG, (Notification.user_id,), **values
+        )
+        return row is not None
+
+    @staticmethod
+    async def fail_processing(db: AsyncSession, _id: UUID) -> bool:
+        """Отметить ошибку AI-обработки (`processing` -> `failed`)
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            _id (UUID): Идентификатор уведомления
+
+        Возвращает:
+            bool: `True`, если уведомление находилось в обработке и было обновлено
+        """
+        row = await NotificationService._transition(
+            db,
+            _id,
+            ProcessingStatus.PROCESSNG,
+            (Notification.user_id,),
+            processing_status=ProcessingStatus.FAILED,
+            lease_expires_at=None,
+        )
+        return row is not None
+
+    @staticmethod
+    def lease_deadline(lease: float | None) -> datetime | None:
+        """Момент истечения аренды, взятой сейчас на `lease` секунд"""
+        return None if lease is None else utcnow() + timedelta(seconds=lease)
+
+    @staticmethod
+    async def extend_lease(db: AsyncSession, ids: Sequence[UUID], lease: float) -> int:
+        """Продлить аренду обрабатываемых уведомлений (heartbeat обработчика)
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            ids (Sequence[UUID]): Идентификаторы уведомлений
+            lease (float): Новый срок аренды в секундах от текущего момента
+
+        Возвращает:
+            int: Число уведомлений, аренда которых продлена
+        """
+        stmt = (
+            update(Notification)
+            .where(
+                Notification.id.in_(ids),
+                Notification.processing_status == ProcessingStatus.PROCESSNG,
+            )
+            .values(lease_expires_at=NotificationService.lease_deadline(lease))
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def requeue_expired(db: AsyncSession) -> int:
+        """Вернуть в очередь уведомления с истекшей арендой обработки
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+
+        Возвращает:
+            int: Число возвращенных в очередь уведомлений
+        """
+        stmt = (
+            update(Notification)
+            .where(
+                Notification.processing_status == ProcessingStatus.PROCESSNG,
+                Notification.lease_expires_at < utcnow(),
+            )
+            .values(processing_status=ProcessingStatus.PENDING, lease_expires_at=None)
+            .returning(Notification.id, Notification.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await db.execute(stmt)).all()
+        await db.commit()
+        if rows:
+            logger.bind(count=len(rows)).warning("Expired processing leases requeued")
+            await CacheService.invalidate_notifications(
+                [row.id for row in rows], {row.user_id for row in rows}
+            )
+            await EventService.publish_status(
+                [(row.id, row.user_id) for row in rows], ProcessingStatus.PENDING
+            )
+        return len(rows)
+
+    @staticmethod
+    async def redispatch_stale_pending(
+        db: AsyncSession, lease: float, limit: int
+    ) -> Sequence[UUID]:
+        """Отметить повторную публикацию уведомлений, ожидающих обработки дольше `lease` секунд
+
+        Уведомление отбирается, если оно создано раньше чем `lease` секунд назад
+        и не публиковалось повторно в течение последних `lease` секунд: срок
+        следующей публикации записывается в `lease_expires_at` ожидающего
+        уведомления. Поэтому при накопившейся очереди одни и те же уведомления
+        не публикуются заново при каждом запуске `sweep`.
+
+        Аргументы:
+            db (AsyncSession): Активная сессия базы данных
+            lease (float): Время ожидания в секундах до повторной публикации
+            limit (int): Максимальное число идентификаторов
+
+        Возвращает:
+            Sequence[UUID]: Идентификаторы для повторной публикации (самые старые первыми)
+        """
+        now = utcnow()
+        stale = (
+            Notification.processing_status == ProcessingStatus.PENDING,
+            Notification.created_at < now - timedelta(seconds=lease),
+            or_(
+                Notification.lease_expires_at.is_(None),
+                Notification.lease_expires_at < now,
+            ),
+        )
+        candidates = (
+            select(Notification.id)
+            .where(*stale)
+            .order_by(Notification.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(Notification)
+            .where(Notification.id.in_(candidates.scalar_subquery()), *stale)
+            .values(lease_expires_at=NotificationService.lease_deadline(lease))
+            .returning(Notification.id, Notification.created_at)
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await db.execute(stmt)).all()
+        await db.commit()
+        return [row.id for row in sorted(rows, key=lambda row: row.created_at)]
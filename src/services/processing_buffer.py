@@ -0,0 +1,81 @@
+import asyncio
+from typing import Callable, List, Sequence
+from uuid import UUID
+
+from ..config import Config
+from ..logger import logger
+
+# Секунд до повторной публикации после ошибки брокера
+RETRY_DELAY = 1.0
+
+
+def publish_batch(notification_ids: List[UUID]) -> None:
+    """Опубликовать пакет уведомлений задачей `notification_batch_processing`"""
+    # Импорт при вызове: модуль задач сам импортирует сервисы
+    from ..tasks import notification_batch_processing
+
+    notification_batch_processing.delay(notification_ids)
+
+
+class ProcessingBuffer:
+    """Буфер публикации уведомлений на обработку (режим `batch`)
+
+    Идентификаторы накапливаются в процессе API и публикуются одним сообщением,
+    когда их набирается `batch_size`, либо через `linger` секунд после
+    добавления первого из них. Если брокер недоступен, неопубликованные
+    идентификаторы возвращаются в буфер и публикуются повторно через
+    `RETRY_DELAY` секунд.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        linger: float,
+        publish: Callable[[List[UUID]], None] = publish_batch,
+    ) -> None:
+        self._batch_size = batch_size
+        self._linger = linger
+        self._publish = publish
+        self._ids: List[UUID] = []
+        self._timer: asyncio.TimerHandle | None = None
+
+    def add(self, notification_ids: Sequence[UUID]) -> None:
+        """Добавить уведомления в буфер (вызывается из цикла событий)"""
+        self._ids.extend(notification_ids)
+        if len(self._ids) >= self._batch_size or self._linger == 0:
+            self.flush()
+        elif self._timer is None:
+            self._schedule(self._linger)
+
+    def _schedule(self, delay: float) -> None:
+        """Запланировать публикацию в текущем цикле событий"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._timer = loop.call_later(delay, self.flush)
+
+    def flush(self) -> None:
+        """Опубликовать накопленные уведомления
+
+        При ошибке публикации пакета он и все следующие остаются в буфере.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        ids, self._ids = self._ids, []
+        for start in range(0, len(ids), self._batch_size):
+            try:
+                self._publish(ids[start : start + self._batch_size])
+            except Exception:
+                logger.exception(
+                    f"Failed to publish {len(ids) - start} notifications, retrying"
+                )
+                self._ids[:0] = ids[start:]
+                self._schedule(RETRY_DELAY)
+                return
+
+
+processing_buffer = ProcessingBuffer(
+    Config.worker.batch_size, Config.worker.batch_linger
+)
@@ -0,0 +1,178 @@
+from functools import reduce
+from operator import add
+from typing import Dict
+
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    bindparam,
+    column,
+    func,
+    literal_column,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.orm import InstrumentedAttribute
+
+from ..logger import logger
+
+SearchTerms = Dict[InstrumentedAttribute, str]
+
+
+class SearchBackend:
+    """Поисковый бэкенд по умолчанию: поиск подстроки через `ILIKE '%...%'`
+
+    Работает в любой СУБД, но требует полного просмотра таблицы.
+    Ранжирование по релевантности не поддерживается.
+    """
+
+    name = "like"
+
+    def available(self, conn: Connection) -> bool:
+        """Созданы ли в базе данных структуры, необходимые бэкенду"""
+        return True
+
+    def prepare(self, conn: Connection) -> None:
+        """Подготовить структуры бэкенда при запуске сервиса"""
+
+    def match(self, column: InstrumentedAttribute, value: str) -> ColumnElement[bool]:
+        """Условие поиска подстроки `value` в колонке `column`"""
+        return column.ilike(f"%{value}%")
+
+    def rank(self, terms: SearchTerms) -> ColumnElement[float] | None:
+        """Выражение релевантности (больше - релевантнее) или `None`, если ранжирование недоступно"""
+        return None
+
+
+class TrigramSearchBackend(SearchBackend):
+    """Поиск в PostgreSQL с использованием расширения `pg_trgm`
+
+    `ILIKE '%...%'` обслуживается GIN-индексами `gin_trgm_ops` (см. миграцию
+    `m0002_search_indexes`), релевантность - сумма `word_similarity` по колонкам.
+    """
+
+    name = "trigram"
+
+    def available(self, conn: Connection) -> bool:
+        return (
+            conn.dialect.name == "postgresql"
+            and conn.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ).scalar()
+            is not None
+        )
+
+    def rank(self, terms: SearchTerms) -> ColumnElement[float] | None:
+        if not terms:
+            return None
+        return reduce(
+            add, (func.word_similarity(value, col) for col, value in terms.items())
+        )
+
+
+class FtsSearchBackend(SearchBackend):
+    """Поиск в SQLite через теневую таблицу FTS5 с токенизатором `trigram`
+
+    Таблица `notifications_fts` хранит копию `title`, `text` и `category` под
+    тем же `rowid`, что и строка `notifications`, и поддерживается триггерами
+    (см. миграцию `m0002_search_indexes`). Токенизатор `trigram` ищет подстроки
+    без учета регистра, но только длиной от 3 символов - более короткие запросы
+    выполняются через `ILIKE`.
+
+    У `notifications` нет INTEGER PRIMARY KEY, поэтому `VACUUM` может
+    перенумеровать ее rowid. Индекс перестраивается при запуске сервиса
+    (`prepare`), чтобы он не ссылался на устаревшие rowid.
+    """
+
+    name = "fts5"
+    min_length = 3
+    fts = table("notifications_fts", column("rowid"))
+
+    def available(self, conn: Connection) -> bool:
+        return (
+            conn.dialect.name == "sqlite"
+            and conn.execute(
+                text(
+                    "SELECT 1 FROM sqlite_master "
+                    "WHERE type = 'table' AND name = 'notifications_fts'"
+                )
+            ).scalar()
+            is not None
+        )
+
+    def prepare(self, conn: Connection) -> None:
+        conn.execute(
+            text("INSERT INTO notifications_fts(notifications_fts) VALUES ('rebuild')")
+        )
+
+    @staticmethod
+    def _phrase(column: InstrumentedAttribute, value: str) -> str:
+        escaped = value.replace('"', '""')
+        return f'{column.key} : "{escaped}"'
+
+    def _match_fts(self, query: str) -> ColumnElement[bool]:
+        return literal_column("notifications_fts").op("MATCH")(
+            bindparam(None, query, unique=True)
+        )
+
+    def match(self, column: InstrumentedAttribute, value: str) -> ColumnElement[bool]:
+        if len(value) < self.min_length:
+            return super().match(column, value)
+        rowids = select(self.fts.c.rowid).where(
+            self._match_fts(self._phrase(column, value))
+        )
+        return literal_column("notifications.rowid").in_(rowids)
+
+    def rank(self, terms: SearchTerms) -> ColumnElement[float] | None:
+        phrases = [
+            self._phrase(col, value)
+            for col, value in terms.items()
+            if len(value) >= self.min_length
+        ]
+        if not phrases:
+            return None
+        return (
+            select(-func.bm25(literal_column("notifications_fts")))
+            .where(
+                self.fts.c.rowid == literal_column("notifications.rowid"),
+                self._match_fts(" OR ".join(phrases)),
+            )
+            .scalar_subquery()
+        )
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (SearchBackend(), TrigramSearchBackend(), FtsSearchBackend())
+}
+AUTO_BACKENDS = {"postgresql": "trigram", "sqlite": "fts5"}
+
+backend: SearchBackend = BACKENDS["like"]
+
+
+def init_search_backend(conn: Connection, name: str) -> None:
+    """Выбрать и подготовить поисковый бэкенд
+
+    В режиме `auto` бэкенд выбирается по диалекту. Если структуры бэкенда
+    (таблица `notifications_fts` или расширение `pg_trgm`) не созданы
+    миграцией, используется `like`.
+
+    Аргументы:
+        conn (Connection): Синхронное соединение с базой данных
+        name (str): Имя бэкенда (`like`, `trigram`, `fts5`) или `auto` для выбора по диалекту
+    """
+    global backend
+    if name == "auto":
+        name = AUTO_BACKENDS.get(conn.dialect.name, "like")
+    backend = BACKENDS[name]
+    if not backend.available(conn):
+        logger.warning(f"Search backend {name} is not available, falling back to like")
+        backend = BACKENDS["like"]
+    backend.prepare(conn)
+    logger.info(f"Search backend: {backend.name}")
+
+
+def get_search_backend() -> SearchBackend:
+    """Получить текущий поисковый бэкенд"""
+    return backend
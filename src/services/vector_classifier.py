@@ -0,0 +1,277 @@
+import json
+import os
+import re
+import tempfile
+import time
+import zlib
+from contextlib import suppress
+from typing import IO, Any, Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from ..config import Config
+from ..logger import logger
+
+TOKEN = re.compile(r"\w+")
+
+# Максимальное число ключевых слов в результате классификации
+MAX_KEYWORDS = 3
+
+WEIGHTS_FILE = "weights.npy"
+PRIORS_FILE = "priors.npy"
+META_FILE = "meta.json"
+
+# Размер части пакета, оцениваемой за один раз: выборка весов
+# `ненулевых элементов x категорий` должна помещаться в кэш процессора
+CHUNK_SIZE = 256
+
+
+def tokenize(text: str) -> List[str]:
+    """Слова текста в нижнем регистре"""
+    return TOKEN.findall(text.lower())
+
+
+def feature_index(token: str, n_features: int) -> int:
+    """Номер признака слова (стабильный между процессами хэш)"""
+    return zlib.crc32(token.encode()) % n_features
+
+
+def hash_batch(
+    texts: Sequence[str], n_features: int
+) -> Tuple[np.ndarray, np.ndarray, List[List[str]]]:
+    """Разреженное представление пакета текстов в пространстве хэшированных признаков
+
+    Возвращает:
+        Tuple[np.ndarray, np.ndarray, List[List[str]]]: Номера строк и признаков
+            ненулевых элементов (строки отсортированы) и различные слова каждого текста
+    """
+    rows: List[int] = []
+    cols: List[int] = []
+    tokens: List[List[str]] = []
+    for row, text in enumerate(texts):
+        unique = list(dict.fromkeys(tokenize(text)))
+        tokens.append(unique)
+        rows.extend([row] * len(unique))
+        cols.extend(feature_index(token, n_features) for token in unique)
+    return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64), tokens
+
+
+def _write_atomic(path: str, name: str, write: Callable[[IO[bytes]], Any]) -> None:
+    """Записать файл `name` каталога `path` через временный файл и `os.replace`"""
+    file = tempfile.NamedTemporaryFile(dir=path, prefix=f".{name}.", delete=False)
+    try:
+        with file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(file.name, os.path.join(path, name))
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(file.name)
+        raise
+
+
+class NaiveBayesClassifier:
+    """Мультиномиальный наивный байесовский классификатор на хэшированных словах
+
+    Модель - матрица логарифмов вероятностей признаков `n_features x categories`
+    и вектор логарифмов априорных вероятностей категорий. Пакет текстов
+    преобразуется в разреженную матрицу признаков, и оценки всех категорий
+    вычисляются одним разреженным матричным произведением (выборка строк
+    весов и сегментная сумма по текстам). Уверенность - апостериорная
+    вероятность выбранной категории.
+
+    Модель хранится каталогом из `.npy`-файлов и `meta.json`; веса
+    загружаются через memory-mapping и разделяются процессами воркеров
+    через страничный кэш ОС.
+
+    Аргументы:
+        categories (Sequence[str]): Категории в порядке столбцов весов
+        weights (np.ndarray): Логарифмы вероятностей признаков, `n_features x categories`
+        priors (np.ndarray): Логарифмы априорных вероятностей категорий
+        version (str, optional): Версия модели
+    """
+
+    def __init__(
+        self,
+        categories: Sequence[str],
+        weights: np.ndarray,
+        priors: np.ndarray,
+        version: str = "",
+    ) -> None:
+        self.categories = list(categories)
+        self.weights = weights
+        self.priors = priors
+        self.n_features = weights.shape[0]
+        self.version = version
+
+    @classmethod
+    def train(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        n_features: int = 2**18,
+        alpha: float = 1.0,
+    ) -> "NaiveBayesClassifier":
+        """Обучить модель на размеченных текстах
+
+        Аргументы:
+            texts (Sequence[str]): Тексты
+            labels (Sequence[str]): Категории текстов
+            n_features (int, optional): Размер пространства хэшированных признаков
+            alpha (float, optional): Параметр сглаживания Лапласа
+
+        Возвращает:
+            NaiveBayesClassifier: Обученная модель
+        """
+        categories = sorted(set(labels))
+        column = {category: index for index, category in enumerate(categories)}
+        rows, cols, _ = hash_batch(texts, n_features)
+        label_columns = np.asarray([column[label] for label in labels])
+        counts = np.zeros((n_features, len(categories)), dtype=np.float64)
+        np.add.at(counts, (cols, label_columns[rows]), 1)
+        counts += alpha
+        weights = np.log(counts / counts.sum(axis=0)).astype(np.float32)
+        documents = np.bincount(label_columns, minlength=len(categories))
+        priors = np.log(documents / documents.sum()).astype(np.float32)
+        version = (
+            f"nb-{zlib.crc32(weights.tobytes()) ^ zlib.crc32(priors.tobytes()):08x}"
+        )
+        return cls(categories, weights, priors, version)
+
+    def save(self, path: str) -> None:
+        """Сохранить модель в каталог `path`
+
+        Каждый файл записывается во временный файл того же каталога и атомарно
+        заменяет прежний: воркеры, отобразившие прежние веса в память,
+        продолжают читать их целиком. `meta.json` заменяется последним, поэтому
+        `get_model` перезагружает модель только после записи всех весов.
+        """
+        os.makedirs(path, exist_ok=True)
+        weights = np.ascontiguousarray(self.weights)
+        meta = {"categories": self.categories, "version": self.version}
+        _write_atomic(path, WEIGHTS_FILE, lambda file: np.save(file, weights))
+        _write_atomic(path, PRIORS_FILE, lambda file: np.save(file, self.priors))
+        _write_atomic(
+            path, META_FILE, lambda file: file.write(json.dumps(meta).encode())
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "NaiveBayesClassifier":
+        """Загрузить модель из каталога `path` (веса - через memory-mapping)"""
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as file:
+            meta = json.load(file)
+        weights = np.load(
+            os.path.join(path, WEIGHTS_FILE), mmap_mode="r" if mmap else None
+        )
+        priors = np.load(os.path.join(path, PRIORS_FILE))
+        return cls(meta["categories"], weights, priors, meta.get("version", ""))
+
+    def scores(
+        self, texts: Sequence[str]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[List[str]]]:
+        """Логарифмы апостериорных оценок категорий для пакета текстов
+
+        Возвращает:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, List[List[str]]]: Матрица
+                `texts x categories`, номера строк ненулевых элементов, их строки
+                весов и слова текстов
+        """
+        rows, cols, tokens = hash_batch(texts, self.n_features)
+        result = np.tile(self.priors, (len(texts), 1))
+        features = self.weights[cols]
+        if len(cols):
+            # Строки отсортированы: сумма по сегментам вместо поэлементного add.at
+            present, starts = np.unique(rows, return_index=True)
+            result[present] += np.add.reduceat(features, starts, axis=0)
+        return result, rows, features, tokens
+
+    def classify_batch(self, texts: Sequence[str]) -> List[dict]:
+        """Классифицировать пакет текстов
+
+        Аргументы:
+            texts (Sequence[str]): Тексты уведомлений
+
+        Возвращает:
+            List[dict]: Результаты `{category, confidence, keywords}` в порядке текстов
+        """
+        if len(texts) > CHUNK_SIZE:
+            return [
+                result
+                for start in range(0, len(texts), CHUNK_SIZE)
+                for result in self.classify_batch(texts[start : start + CHUNK_SIZE])
+            ]
+        if not texts:
+            return []
+        scores, rows, features, tokens = self.scores(texts)
+        best = scores.argmax(axis=1)
+        shifted = np.exp(scores - scores[np.arange(len(texts)), best][:, None])
+        confidence = 1 / shifted.sum(axis=1)
+        # Ключевые слова - слова, сильнее всего отличающие выбранную категорию
+        # от остальных; порядок внутри каждого текста по убыванию этой разницы
+        lift = features[np.arange(len(rows)), best[rows]] - features.mean(axis=1)
+        order = np.lexsort((-lift, rows))
+        offsets = np.searchsorted(rows[order], np.arange(len(texts)))
+        results = []
+        for row, words in enumerate(tokens):
+            start = offsets[row]
+            top = order[start : start + min(len(words), MAX_KEYWORDS)] - start
+            results.append(
+                {
+                    "category": self.categories[best[row]],
+                    "confidence": float(confidence[row]),
+                    "keywords": [words[i] for i in top],
+                }
+            )
+        return results
+
+    def classify(self, text: str) -> dict:
+        """Классифицировать текст"""
+        return self.classify_batch([text])[0]
+
+
+model: NaiveBayesClassifier | None = None
+_model_path: str | None = None
+_model_mtime: float | None = None
+_checked_at = 0.0
+
+
+def get_model() -> NaiveBayesClassifier | None:
+    """Модель из `Config.classifier.model_path` или `None`, если модель не задана
+
+    Модель загружается при первом обращении и перезагружается при изменении
+    `meta.json` (проверка не чаще раза в `reload_interval` секунд). Ошибка
+    загрузки логируется, в работе остается прежняя модель.
+    """
+    global model, _model_path, _model_mtime, _checked_at
+    path = Config.classifier.model_path
+    if path is None:
+        return None
+    now = time.monotonic()
+    if (
+        model is not None
+        and path == _model_path
+        and now - _checked_at < Config.classifier.reload_interval
+    ):
+        return model
+    _checked_at = now
+    try:
+        mtime = os.stat(os.path.join(path, META_FILE)).st_mtime
+        if model is None or path != _model_path or mtime != _model_mtime:
+            model = NaiveBayesClassifier.load(path)
+            _model_path, _model_mtime = path, mtime
+            logger.info(
+                f"Classifier model loaded: {len(model.categories)} categories, "
+                f"version {model.version}"
+            )
+    except Exception as e:
+        logger.warning(f"Classifier model load error: {e}")
+    return model
+
+
+__all__ = [
+    "NaiveBayesClassifier",
+    "get_model",
+    "hash_batch",
+    "tokenize",
+]
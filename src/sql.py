@@ -0,0 +1,45 @@
+from typing import Any
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+
+class Explain(Executable, ClauseElement):
+    """Конструкция `EXPLAIN` для произвольного запроса SQLAlchemy
+
+    - PostgreSQL: `EXPLAIN (FORMAT JSON) ...`, план возвращается одной JSON-строкой
+    - SQLite: `EXPLAIN QUERY PLAN ...`, план возвращается строками `(id, parent, notused, detail)`
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Executable) -> None:
+        self.statement = statement
+
+
+def _compile_nested(element: Explain, compiler: Any, **kw: Any) -> str:
+    """Скомпилировать вложенный запрос отдельно, с подставленными значениями параметров
+
+    Вложенный запрос компилируется собственным компилятором, поэтому его колонки
+    не регистрируются как колонки результата и к строкам плана не применяются
+    обработчики типов исходного запроса.
+    """
+    return str(
+        element.statement.compile(
+            dialect=compiler.dialect, compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + _compile_nested(element, compiler, **kw)
+
+
+@compiles(Explain, "sqlite")
+def _compile_explain_sqlite(element: Explain, compiler: Any, **kw: Any) -> str:
+    return "EXPLAIN QUERY PLAN " + _compile_nested(element, compiler, **kw)
+
+
+__all__ = ["Explain"]
@@ -1,59 +1,293 @@
+import asyncio
+import os
+import threading
 import traceback
+from contextlib import asynccontextmanager, suppress
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Sequence,
+    TypeVar,
+)
 from uuid import UUID
 
 from asgiref.sync import async_to_sync
 from celery import Celery, signals
 
+from .broadcast import create_broadcaster
+from .cache import create_backend
 from .config import Config
 from .db import get_db, init_engine
-from .exceptions import NotificationNotFoundExc
 from .logger import logger
 from .models import ProcessingStatus
+from .runner import AsyncRunner
 from .services.ai_service import AIService
+from .services.analysis_cache import analysis_cache, init_analysis_cache, normalize
+from .services.cache_service import CacheService
+from .services.event_service import EventService
 from .services.notification_service import NotificationService
+from .services.processing_buffer import processing_buffer
+
+T = TypeVar("T")
 
 # Инициализация приложения Celery
 app = Celery("notification", broker=Config.broker.uri)
 
+# Долгоживущий цикл событий процесса (`Config.worker.runtime == "asyncio"`)
+runner: AsyncRunner | None = None
+_runner_pid: int | None = None
+_runner_lock = threading.Lock()
+
+
+def init_cache() -> None:
+    """Подключение кэша для инвалидации записей API, кэша результатов анализа
+    и рассылки событий уведомлений"""
+    if Config.cache.uri is not None:
+        CacheService.init(
+            create_backend(Config.cache.uri), tag_ttl=Config.cache.tag_ttl
+        )
+    init_analysis_cache()
+    EventService.init(
+        create_broadcaster(Config.broadcast.uri, Config.broadcast.queue_size)
+    )
+
 
 @signals.worker_process_init.connect
 def on_start(*args, **kwargs):
     """Процедуры запускаемые при инициализации воркера Celery"""
-    async_to_sync(init_engine)(Config.db.uri)
+    if Config.worker.runtime == "asyncio":
+        get_runner()
+        return
+    async_to_sync(init_engine)(Config.db)
+    init_cache()
+
+
+def get_runner() -> AsyncRunner:
+    """Цикл событий процесса, создаваемый при первом обращении
+
+    Движок базы данных создается внутри этого цикла, поэтому его пул
+    соединений переиспользуется всеми задачами процесса. Процесс,
+    порожденный через fork, получает собственный цикл.
+    """
+    global runner, _runner_pid
+    with _runner_lock:
+        if runner is None or _runner_pid != os.getpid():
+            runner = AsyncRunner(Config.worker.max_in_flight)
+            _runner_pid = os.getpid()
+            runner.run(init_engine(Config.db))
+            init_cache()
+    return runner
+
+
+def run_async(func: Callable[..., Awaitable[T]], *args: Any) -> T:
+    """Выполнить корутинную функцию из синхронной задачи Celery
+
+    В среде `sync` функция выполняется в собственном цикле событий, клиент
+    рассылки событий этого цикла закрывается по ее завершении.
+
+    Аргументы:
+        func (Callable[..., Awaitable[T]]): Корутинная функция
+        *args (Any): Аргументы функции
+
+    Возвращает:
+        T: Результат функции
+    """
+    if Config.worker.runtime == "asyncio":
+        return get_runner().run(func(*args))
+
+    async def run_in_own_loop() -> T:
+        try:
+            return await func(*args)
+        finally:
+            await EventService.broadcaster().release()
+
+    return async_to_sync(run_in_own_loop)()
+
+
+@asynccontextmanager
+async def heartbeat(notification_ids: Sequence[UUID]) -> AsyncIterator[None]:
+    """Продлевать аренду уведомлений, пока выполняется вложенный блок
+
+    Аренда продлевается каждую треть `Config.worker.lease` в отдельной сессии,
+    поэтому долгая обработка не возвращается в очередь сборщиком
+    (`sweep`), а обработка умершего воркера - возвращается.
+
+    Аргументы:
+        notification_ids (Sequence[UUID]): Идентификаторы обрабатываемых уведомлений
+    """
+
+    async def beat() -> None:
+        while True:
+            await asyncio.sleep(Config.worker.lease / 3)
+            try:
+                async with get_db() as db:
+                    await NotificationService.extend_lease(
+                        db, notification_ids, Config.worker.lease
+                    )
+            except Exception as e:
+                logger.warning(f"Lease heartbeat error: {e}")
+
+    task = asyncio.create_task(beat())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
 
 
 async def calculate(notification_id: UUID) -> None:
     """Логика задачи по категоризации уведомления на основе ключевых слов
 
+    Каждый переход статуса выполняется одним условным UPDATE: уведомление,
+    уже захваченное другим обработчиком (в том числе при повторной доставке
+    задачи), пропускается без обращения к AI-сервису. Результат для уже
+    анализировавшегося текста берется из `analysis_cache`.
+
     Аргументы:
         notification_id (UUID): Идентификатор уведомления
     """
     logger.bind(notification_id=notification_id).debug("Start of processing")
     async with get_db() as db:
-        try:
-            await NotificationService.set_status(
-                db, notification_id, ProcessingStatus.PROCESSNG
+        claimed = await NotificationService.claim_for_processing(
+            db, notification_id, lease=Config.worker.lease
+        )
+        if claimed is None:
+            logger.bind(notification_id=notification_id).debug(
+                "Notification is missing or already claimed"
             )
-            obj = await NotificationService.get(db, notification_id)
-            result = await AIService.analyze_text(obj.text)
-            await NotificationService.add_ai_results(
+            return
+        try:
+            version = AIService.version()
+            (result,) = await analysis_cache.get_many([claimed.text], version)
+            if result is None:
+                async with heartbeat([notification_id]):
+                    result = await AIService.analyze_text(claimed.text)
+                await analysis_cache.set_many([claimed.text], [result], version)
+            await NotificationService.complete_processing(
                 db,
                 notification_id,
                 category=result.get("category"),
                 confidence=result.get("confidence"),
             )
-        except NotificationNotFoundExc:
-            pass
         except Exception:
-            await NotificationService.set_status(
-                db, notification_id, ProcessingStatus.FAILED
-            )
+            await NotificationService.fail_processing(db, notification_id)
             logger.bind(notification_id=notification_id).critical(
                 traceback.format_exc()
             )
     logger.bind(notification_id=notification_id).debug("End of processing")
 
 
+async def calculate_many(notification_ids: Sequence[UUID]) -> None:
+    """Конкурентная категоризация пакета уведомлений
+
+    Аргументы:
+        notification_ids (Sequence[UUID]): Идентификаторы уведомлений
+    """
+    await asyncio.gather(*(calculate(_id) for _id in notification_ids))
+
+
+async def analyze_texts(
+    texts: Sequence[str], notification_ids: Sequence[UUID]
+) -> List[dict]:
+    """Результаты анализа текстов пакета с учетом `analysis_cache`
+
+    Аргументы:
+        texts (Sequence[str]): Тексты уведомлений
+        notification_ids (Sequence[UUID]): Идентификаторы уведомлений (для продления аренды)
+
+    Возвращает:
+        List[dict]: Результаты в порядке текстов
+    """
+    version = AIService.version()
+    results = await analysis_cache.get_many(texts, version)
+    unique = {
+        normalize(texts[i]): texts[i]
+        for i, result in enumerate(results)
+        if result is None
+    }
+    if unique:
+        async with heartbeat(notification_ids):
+            analyzed = await AIService.analyze_batch(list(unique.values()))
+        await analysis_cache.set_many(list(unique.values()), analyzed, version)
+        by_text = dict(zip(unique, analyzed, strict=True))
+        results = [
+            by_text[normalize(text)] if result is None else result
+            for text, result in zip(texts, results)
+        ]
+    return results
+
+
+async def calculate_batch(notification_ids: Sequence[UUID] | None = None) -> int:
+    """Категоризация пакета уведомлений одним вызовом AI-сервиса
+
+    Захватывает до `Config.worker.batch_size` ожидающих уведомлений одним
+    запросом, анализирует их тексты `AIService.analyze_batch` и записывает
+    все результаты одним bulk UPDATE. В AI-сервис передаются только различные
+    тексты, отсутствующие в `analysis_cache`. При ошибке AI-сервиса весь
+    пакет помечается как `failed`.
+
+    Аргументы:
+        notification_ids (Sequence[UUID] | None, optional): Ограничить пакет идентификаторами. По умолчанию - любые ожидающие.
+
+    Возвращает:
+        int: Число обработанных уведомлений
+    """
+    async with get_db() as db:
+        rows = await NotificationService.claim_pending(
+            db,
+            notification_ids,
+            limit=Config.worker.batch_size,
+            lease=Config.worker.lease,
+        )
+        if not rows:
+            return 0
+        logger.bind(count=len(rows)).debug("Start of batch processing")
+        values: List[Dict[str, Any]]
+        try:
+            results = await analyze_texts(
+                [row.text for row in rows], [row.id for row in rows]
+            )
+            values = [
+                {
+                    "id": row.id,
+                    "category": result.get("category"),
+                    "confidence": result.get("confidence"),
+                    "processing_status": ProcessingStatus.COMPLETED,
+                    "lease_expires_at": None,
+                }
+                for row, result in zip(rows, results, strict=True)
+            ]
+        except Exception:
+            values = [
+                {
+                    "id": row.id,
+                    "processing_status": ProcessingStatus.FAILED,
+                    "lease_expires_at": None,
+                }
+                for row in rows
+            ]
+            logger.bind(count=len(rows)).critical(traceback.format_exc())
+        await NotificationService.save_ai_results(db, values)
+    logger.bind(count=len(rows)).debug("End of batch processing")
+    return len(rows)
+
+
+async def calculate_batches(notification_ids: Sequence[UUID]) -> None:
+    """Категоризация уведомлений пакетами по `Config.worker.batch_size`
+
+    Аргументы:
+        notification_ids (Sequence[UUID]): Идентификаторы уведомлений
+    """
+    batch_size = Config.worker.batch_size
+    for start in range(0, len(notification_ids), batch_size):
+        await calculate_batch(notification_ids[start : start + batch_size])
+
+
 @app.task
 def notification_processing(notification_id: UUID) -> None:
     """Задача (Синхронная обертка) по категоризации уведомления на основе ключевых слов
@@ -61,4 +295,145 @@ def notification_processing(notification_id: UUID) -> None:
     Аргументы:
         notification_id (UUID): Идентификатор уведомления
     """
-    async_to_sync(calculate)(notification_id)
+    run_async(calculate, notification_id)
+
+
+@app.task
+def notification_batch_processing(notification_ids: List[UUID]) -> None:
+    """Задача (Синхронная обертка) по категоризации пакета уведомлений
+
+    В режиме `batch` уведомления обрабатываются пакетами (см. `calculate_batch`),
+    иначе - конкурентно по одному.
+
+    Аргументы:
+        notification_ids (List[UUID]): Идентификаторы уведомлений
+    """
+    if Config.worker.mode == "batch":
+        run_async(calculate_batches, notification_ids)
+    else:
+        run_async(calculate_many, notification_ids)
+
+
+async def sweep() -> Dict[str, int]:
+    """Вернуть в очередь зависшие уведомления
+
+    - Уведомления с истекшей арендой обработки снова становятся `pending`
+    - При доставке через брокер уведомления, ожидающие дольше
+      `Config.worker.lease` (например, после неудачной публикации), публикуются
+      повторно, но не чаще раза в `Config.worker.lease`; дубликаты
+      отбрасываются условным захватом
+
+    Возвращает:
+        Dict[str, int]: Число возвращенных в очередь и повторно опубликованных уведомлений
+    """
+    async with get_db() as db:
+        requeued = await NotificationService.requeue_expired(db)
+        redispatched: Sequence[UUID] = []
+        if Config.worker.dispatch == "broker":
+            redispatched = await NotificationService.redispatch_stale_pending(
+                db, Config.worker.lease, Config.worker.batch_size
+            )
+    dispatch_processing(redispatched)
+    return {"requeued": requeued, "redispatched": len(redispatched)}
+
+
+@app.task
+def sweep_processing() -> Dict[str, int]:
+    """Периодическая задача (Синхронная обертка) возврата зависших уведомлений в очередь"""
+    return run_async(sweep)
+
+
+async def reconcile() -> int:
+    """Сверить счетчики непрочитанных уведомлений с таблицей уведомлений
+
+    Возвращает:
+        int: Число исправленных и созданных счетчиков
+    """
+    async with get_db() as db:
+        return await NotificationService.reconcile_unread_counters(db)
+
+
+@app.task
+def reconcile_unread_counters() -> int:
+    """Периодическая задача (Синхронная обертка) сверки счетчиков непрочитанных уведомлений"""
+    return run_async(reconcile)
+
+
+app.conf.beat_schedule = {
+    "sweep-processing": {
+        "task": sweep_processing.name,
+        "schedule": Config.worker.sweep_interval,
+    },
+    "reconcile-unread-counters": {
+        "task": reconcile_unread_counters.name,
+        "schedule": Config.worker.reconcile_interval,
+    },
+}
+
+
+async def poll(stop: asyncio.Event) -> None:
+    """Цикл обработчика очереди в базе данных (`Config.worker.dispatch == "db"`)
+
+    Пакеты ожидающих уведомлений захватываются напрямую из таблицы
+    (`SELECT ... FOR UPDATE SKIP LOCKED`), поэтому несколько обработчиков
+    работают параллельно без брокера. Пока очередь не пуста, пакеты
+    обрабатываются без пауз, иначе - с интервалом `Config.worker.poll_interval`.
+    Раз в `Config.worker.sweep_interval` секунд выполняется `sweep`.
+
+    Аргументы:
+        stop (asyncio.Event): Событие остановки цикла
+    """
+    loop = asyncio.get_running_loop()
+    next_sweep = loop.time()
+    while not stop.is_set():
+        if loop.time() >= next_sweep:
+            try:
+                await sweep()
+            except Exception:
+                logger.critical(traceback.format_exc())
+            next_sweep = loop.time() + Config.worker.sweep_interval
+        try:
+            processed = await calculate_batch()
+        except Exception:
+            logger.critical(traceback.format_exc())
+            processed = 0
+        if processed == 0:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), Config.worker.poll_interval)
+
+
+def dispatch_processing(notification_ids: Sequence[UUID]) -> None:
+    """Поставить уведомления в очередь на обработку пачками
+
+    Вместо одного сообщения на уведомление в брокер публикуется одно сообщение
+    на каждые `Config.broker.dispatch_chunk_size` идентификаторов. При доставке
+    через базу данных публикация не требуется: уведомления уже в очереди.
+
+    Аргументы:
+        notification_ids (Sequence[UUID]): Идентификаторы уведомлений
+    """
+    if Config.worker.dispatch == "db":
+        return
+    chunk_size = Config.broker.dispatch_chunk_size
+    for start in range(0, len(notification_ids), chunk_size):
+        notification_batch_processing.delay(
+            list(notification_ids[start : start + chunk_size])
+        )
+
+
+def enqueue_processing(notification_id: UUID) -> None:
+    """Поставить уведомление в очередь на обработку
+
+    В режиме `batch` уведомление попадает в `processing_buffer`, иначе
+    публикуется отдельным сообщением. При доставке через базу данных
+    уведомление уже находится в очереди.
+
+    Аргументы:
+        notification_id (UUID): Идентификатор уведомления
+    """
+    if Config.worker.dispatch == "db":
+        return
+    if Config.worker.mode == "batch":
+        processing_buffer.add([notification_id])
+    else:
+        notification_processing.delay(notification_id)
@@ -1,9 +1,51 @@
+from typing import Any, Dict
+
 from fastapi import APIRouter
-from typing import Dict
+
+from ...db import get_engine, get_replica_engines, pool_stats
+from ...services.analysis_cache import analysis_cache
+from ...services.cache_service import CacheService
 
 router = APIRouter()
 
+
 @router.get("/", response_model=Dict[str, str])
 async def health_check() -> Dict[str, str]:
     """Проверить работоспособность сервера"""
     return {"status": "healthy"}
+
+
+@router.get("/cache", response_model=Dict[str, Any])
+async def cache_stats() -> Dict[str, Any]:
+    """Получить счетчики попаданий и промахов кэша по уровням
+
+    При включенном `cache.measure` ответ содержит раздел `routes` с размером
+    записей и временем их кодирования по маршрутам.
+    """
+    return CacheService.stats()
+
+
+@router.get("/analysis", response_model=Dict[str, Any])
+async def analysis_cache_stats() -> Dict[str, Any]:
+    """Получить счетчики попаданий и промахов кэша результатов анализа
+
+    При подключенном общем бэкенде раздел `shared` содержит счетчики всех
+    воркеров.
+    """
+    return await analysis_cache.stats()
+
+
+@router.get("/db", response_model=Dict[str, Any])
+async def db_pool_stats() -> Dict[str, Any]:
+    """Получить состояние пула соединений базы данных
+
+    `checked_out` - соединения, выданные сессиям, `waiting` - запросы,
+    ожидающие соединение, `wait_avg`/`wait_max` - время выдачи соединения в
+    секундах, `timeouts` - выдачи, не дождавшиеся `db.pool_timeout`. При
+    работе с репликами раздел `replicas` содержит состояние их пулов.
+    """
+    result = pool_stats(get_engine())
+    replica_engines = get_replica_engines()
+    if replica_engines:
+        result["replicas"] = [pool_stats(target) for target in replica_engines]
+    return result
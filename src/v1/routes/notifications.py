@@ -1,22 +1,52 @@
-from typing import Annotated
+import asyncio
+from contextlib import suppress
+from typing import Annotated, Any, Dict, List
 from uuid import UUID
 
-from fastapi import APIRouter, Body, Depends, Query, Response, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Query,
+    Response,
+    WebSocket,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...db import get_db
+from ...config import Config
+from ...db import get_db, get_read_db
+from ...models import ProcessingStatus
+from ...services.cursor import page_cursors
+from ...services.event_service import EventService
+from ...services.export import encode
 from ...services.notification_service import NotificationService
-from ...tasks import notification_processing
+from ...tasks import dispatch_processing, enqueue_processing
 from ..schemas.notifications import (
     Notification,
+    NotificationBatchItem,
+    NotificationBatchResult,
     NotificationCreate,
+    NotificationExport,
     NotificationFilters,
     NotificationsList,
+    NotificationsRead,
+    NotificationsReadAll,
+    NotificationsReadResult,
     NotificationStatus,
+    UnreadCount,
 )
 
 router = APIRouter()
 
+# Ответы, которые не должны кэшироваться `CacheMiddleware` и прокси
+NO_STORE = {"Cache-Control": "no-store"}
+
+# Статусы обработки, после которых уведомление больше не меняет статус
+TERMINAL_STATUSES = (ProcessingStatus.COMPLETED, ProcessingStatus.FAILED)
+
 
 @router.post("/", response_model=Notification, status_code=status.HTTP_201_CREATED)
 async def create_notification(
@@ -26,31 +56,203 @@ async def create_notification(
     """Создать уведомление"""
     async with session as db:
         obj = await NotificationService.create(db, **data.model_dump())
-    notification_processing.delay(obj.id)
+    enqueue_processing(obj.id)
     return Notification.model_validate(obj)
 
 
+@router.post(
+    "/batch", response_model=NotificationBatchResult, status_code=status.HTTP_200_OK
+)
+async def create_notifications_batch(
+    data: Annotated[List[Dict[str, Any]], Body(max_length=1000)],
+    session: Annotated[AsyncSession, Depends(get_db)],
+) -> NotificationBatchResult:
+    """Создать пакет уведомлений
+
+    Невалидные элементы не прерывают обработку пакета: для них в ответе
+    возвращаются ошибки валидации, для остальных - идентификаторы.
+    """
+    items: List[NotificationBatchItem] = []
+    valid: List[NotificationCreate] = []
+    valid_indexes: List[int] = []
+    for index, raw in enumerate(data):
+        try:
+            valid.append(NotificationCreate.model_validate(raw))
+            valid_indexes.append(index)
+        except ValidationError as exc:
+            items.append(
+                NotificationBatchItem(
+                    index=index,
+                    errors=exc.errors(
+                        include_url=False, include_context=False, include_input=False
+                    ),
+                )
+            )
+
+    async with session as db:
+        objects = await NotificationService.create_many(
+            db, [item.model_dump() for item in valid]
+        )
+    dispatch_processing([obj.id for obj in objects])
+
+    items.extend(
+        NotificationBatchItem(index=index, id=obj.id)
+        for index, obj in zip(valid_indexes, objects)
+    )
+    items.sort(key=lambda item: item.index)
+    return NotificationBatchResult(
+        created=len(objects), failed=len(data) - len(objects), items=items
+    )
+
+
+@router.post(
+    "/read", response_model=NotificationsReadResult, status_code=status.HTTP_200_OK
+)
+async def mark_notifications_as_read(
+    data: Annotated[NotificationsRead, Body()],
+    session: Annotated[AsyncSession, Depends(get_db)],
+) -> NotificationsReadResult:
+    """Пометить прочитанными уведомления из списка одним запросом к базе данных
+
+    Уже прочитанные и несуществующие уведомления пропускаются.
+    """
+    async with session as db:
+        updated = await NotificationService.mark_many_as_read(db, data.ids)
+    return NotificationsReadResult(updated=updated)
+
+
+@router.post(
+    "/read-all", response_model=NotificationsReadResult, status_code=status.HTTP_200_OK
+)
+async def mark_all_notifications_as_read(
+    data: Annotated[NotificationsReadAll, Body()],
+    session: Annotated[AsyncSession, Depends(get_db)],
+) -> NotificationsReadResult:
+    """Пометить прочитанными все непрочитанные уведомления пользователя"""
+    async with session as db:
+        updated = await NotificationService.mark_all_as_read(
+            db, data.user_id, data.before
+        )
+    return NotificationsReadResult(updated=updated)
+
+
 @router.get("/", response_model=NotificationsList, status_code=status.HTTP_200_OK)
 async def get_notifications_list(
     filters: Annotated[NotificationFilters, Query()],
-    session: Annotated[AsyncSession, Depends(get_db)],
+    session: Annotated[AsyncSession, Depends(get_read_db)],
 ) -> NotificationsList:
     """Получить список уведомлений по фильтрам"""
     async with session as db:
         objects, count = await NotificationService.get_list(db, **filters.model_dump())
+    next_cursor, prev_cursor = page_cursors(
+        objects, filters.limit, after=filters.after, before=filters.before
+    )
     return NotificationsList(
-        data=objects,  # type:ignore[arg-type]
+        data=objects,  # type: ignore[arg-type]
         count=count,
         limit=filters.limit,
         offset=filters.offset,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+    )
+
+
+@router.get("/unread-count", response_model=UnreadCount, status_code=status.HTTP_200_OK)
+async def get_unread_count(
+    user_id: Annotated[UUID, Query(description="Идентификатор пользователя")],
+    session: Annotated[AsyncSession, Depends(get_db)],
+    response: Response,
+) -> UnreadCount:
+    """Получить количество непрочитанных уведомлений пользователя
+
+    Значение читается из счетчика, поддерживаемого при создании и прочтении
+    уведомлений, без подсчета строк, поэтому не кэшируется.
+    """
+    async with session as db:
+        unread = await NotificationService.get_unread_count(db, user_id)
+    response.headers.update(NO_STORE)
+    return UnreadCount(user_id=user_id, unread=unread)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_notifications(
+    params: Annotated[NotificationExport, Query()],
+    session: Annotated[AsyncSession, Depends(get_read_db)],
+) -> StreamingResponse:
+    """Выгрузить все уведомления по фильтрам списка (без пагинации)
+
+    Строки читаются из базы данных курсором и отдаются частями по мере
+    кодирования, поэтому память не растет с размером выгрузки. Порядок -
+    от новых к старым.
+    """
+
+    async def chunks():
+        async with session as db:
+            partitions = NotificationService.stream_list(
+                db,
+                Config.server.export_chunk_size,
+                **params.model_dump(exclude={"format"}),
+            )
+            async for chunk in encode(params.format, partitions):
+                yield chunk
+
+    return StreamingResponse(
+        chunks(),
+        media_type=params.format.media_type,
+        headers={
+            **NO_STORE,
+            "Content-Disposition": (
+                f'attachment; filename="notifications.{params.format.value}"'
+            ),
+        },
     )
 
 
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_notification_events(
+    user_id: Annotated[UUID, Query(description="Идентификатор пользователя")],
+) -> StreamingResponse:
+    """Поток событий уведомлений пользователя (Server-Sent Events)
+
+    События `created` (новое уведомление) и `status` (изменение статуса
+    обработки, при завершении - с категорией) заменяют опрос эндпоинта
+    статуса.
+    """
+    return StreamingResponse(
+        EventService.stream(user_id, Config.broadcast.keepalive),
+        media_type="text/event-stream",
+        headers={**NO_STORE, "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def notification_events_websocket(
+    websocket: WebSocket,
+    user_id: Annotated[UUID, Query(description="Идентификатор пользователя")],
+) -> None:
+    """События уведомлений пользователя через WebSocket (JSON-сообщения)"""
+    await websocket.accept()
+    async with EventService.subscribe(user_id) as subscription:
+
+        async def forward() -> None:
+            async for event in subscription:
+                await websocket.send_json(event)
+
+        task = asyncio.create_task(forward())
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+
 @router.get(
     "/{notification_id}", response_model=Notification, status_code=status.HTTP_200_OK
 )
 async def get_notification_by_id(
-    notification_id: UUID, session: Annotated[AsyncSession, Depends(get_db)]
+    notification_id: UUID, session: Annotated[AsyncSession, Depends(get_read_db)]
 ) -> Notification:
     """Получить уведомление по идентификатору"""
     async with session as db:
@@ -64,12 +266,47 @@ async def get_notification_by_id(
     status_code=status.HTTP_200_OK,
 )
 async def get_notification_status_by_id(
-    notification_id: UUID, session: Annotated[AsyncSession, Depends(get_db)]
+    notification_id: UUID,
+    session: Annotated[AsyncSession, Depends(get_read_db)],
+    primary: Annotated[AsyncSession, Depends(get_db)],
+    response: Response,
+    wait_for: Annotated[
+        ProcessingStatus | None,
+        Query(description="Long-poll: дождаться указанного или итогового статуса"),
+    ] = None,
+    timeout: Annotated[
+        float,
+        Query(ge=0, description="Long-poll: максимальное время ожидания в секундах"),
+    ] = 30,
 ) -> NotificationStatus:
-    """Получить статус обработки уведомления"""
-    async with session as db:
-        obj = await NotificationService.get(db, notification_id)
-    return NotificationStatus(status=obj.processing_status)
+    """Получить статус обработки уведомления
+
+    С `wait_for` запрос ожидает (не дольше `timeout` секунд, ограниченных
+    `server.long_poll_timeout`), пока уведомление не перейдет в статус
+    `wait_for` или в итоговый статус (`completed`, `failed`), и возвращает
+    статус сразу после перехода. Ожидание не опрашивает базу данных: статус
+    читается один раз (из основной базы: отстающая реплика может не видеть
+    уже произошедший переход), а переходы приходят событиями. Такие ответы не
+    кэшируются.
+    """
+    if wait_for is None:
+        async with session as db:
+            obj = await NotificationService.get(db, notification_id)
+        return NotificationStatus(status=obj.processing_status)
+
+    response.headers.update(NO_STORE)
+    statuses = {wait_for.value, *(s.value for s in TERMINAL_STATUSES)}
+    # Подписка до чтения статуса: переход между чтением и ожиданием не теряется
+    async with EventService.subscribe_notification(notification_id) as subscription:
+        async with primary as db:
+            obj = await NotificationService.get(db, notification_id)
+        current = obj.processing_status
+        if current.value not in statuses:
+            timeout = min(timeout, Config.server.long_poll_timeout)
+            waited = await EventService.wait_for_status(subscription, statuses, timeout)
+            if waited is not None:
+                current = ProcessingStatus(waited)
+    return NotificationStatus(status=current)
 
 
 @router.post(
@@ -1,10 +1,12 @@
 from datetime import datetime
-from typing import Any, Dict, Sequence
+from typing import Any, Dict, List, Sequence
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from ...models import ProcessingStatus
+from ...services.export import ExportFormat
+from ...services.notification_service import CountMode, Ordering
 
 
 class NotificationCreate(BaseModel):
@@ -15,6 +17,28 @@ class NotificationCreate(BaseModel):
     text: str = Field(max_length=255, description="Текст уведомления")
 
 
+class NotificationBatchItem(BaseModel):
+    """Результат создания одного элемента пакета уведомлений"""
+
+    index: int = Field(..., description="Позиция элемента в теле запроса")
+    id: UUID | None = Field(
+        default=None, description="Идентификатор созданного уведомления"
+    )
+    errors: List[Dict[str, Any]] | None = Field(
+        default=None, description="Ошибки валидации элемента"
+    )
+
+
+class NotificationBatchResult(BaseModel):
+    """Тело ответа на пакетное создание уведомлений"""
+
+    created: int = Field(..., description="Количество созданных уведомлений")
+    failed: int = Field(..., description="Количество отклоненных элементов")
+    items: List[NotificationBatchItem] = Field(
+        default=[], description="Результаты по каждому элементу пакета"
+    )
+
+
 class Notification(BaseModel):
     """Объект уведомления"""
 
@@ -36,8 +60,8 @@ class Notification(BaseModel):
     )
 
 
-class NotificationFilters(BaseModel):
-    """Фильтры для поиска по уведомлений"""
+class NotificationSearch(BaseModel):
+    """Фильтры для поиска по уведомлениям без пагинации"""
 
     user_id: UUID | None = Field(default=None, description="Идентификатор пользователя")
     title: str | None = Field(default=None, description="Заголовок уведомления")
@@ -74,8 +98,6 @@ class NotificationFilters(BaseModel):
     processing_status: ProcessingStatus | None = Field(
         default=None, description="Статус обработки уведомления"
     )
-    limit: int = Field(default=10, description="Лимит записей в запросе")
-    offset: int = Field(default=0, description="Смещение по записям")
     is_read: bool | None = Field(
         default=None, description="Отобразить только прочтенные уведомления"
     )
@@ -106,6 +128,47 @@ class NotificationFilters(BaseModel):
         return cls.validate_range(values, "confidence_start", "confidence_end")
 
 
+class NotificationFilters(NotificationSearch):
+    """Фильтры для поиска по уведомлений"""
+
+    limit: int = Field(default=10, description="Лимит записей в запросе")
+    offset: int = Field(default=0, description="Смещение по записям")
+    after: str | None = Field(
+        default=None,
+        description="Курсор: вернуть записи старше указанной (`offset` игнорируется)",
+    )
+    before: str | None = Field(
+        default=None,
+        description="Курсор: вернуть записи новее указанной (`offset` игнорируется)",
+    )
+    count_mode: CountMode = Field(
+        default=CountMode.EXACT,
+        description="Способ подсчета общего количества записей: "
+        "`exact`, `estimated`, `window` или `none`",
+    )
+    ordering: Ordering = Field(
+        default=Ordering.CREATED_AT,
+        description="Порядок сортировки: `created_at` или `relevance` "
+        "(по нестрогим фильтрам `title`, `text`, `category`, без курсоров)",
+    )
+
+    @model_validator(mode="before")
+    @classmethod
+    def validate_cursor(cls, values: Any) -> Any:
+        if isinstance(values, Dict):
+            if values.get("after") is not None and values.get("before") is not None:
+                raise ValueError("`after` and `before` cannot be used together")
+        return values
+
+
+class NotificationExport(NotificationSearch):
+    """Фильтры и формат выгрузки уведомлений"""
+
+    format: ExportFormat = Field(
+        default=ExportFormat.NDJSON, description="Формат выгрузки: `ndjson` или `csv`"
+    )
+
+
 class NotificationsList(BaseModel):
     """Тело ответа список уведомлений"""
 
@@ -113,9 +176,49 @@ class NotificationsList(BaseModel):
     data: Sequence[Notification] = Field(
         default=[], description="Список найденных уведомлений"
     )
-    count: int = Field(default=0, description="Количество найденных записей")
+    count: int | None = Field(
+        default=0,
+        description="Количество найденных записей (`null`, если подсчет отключен)",
+    )
     limit: int = Field(..., description="Лимит записей")
     offset: int = Field(..., description="Смещение по записям")
+    next_cursor: str | None = Field(
+        default=None, description="Курсор следующей (более старой) страницы"
+    )
+    prev_cursor: str | None = Field(
+        default=None, description="Курсор предыдущей (более новой) страницы"
+    )
+
+
+class NotificationsRead(BaseModel):
+    """Тело запроса на отметку уведомлений прочитанными"""
+
+    ids: List[UUID] = Field(
+        ..., max_length=1000, description="Идентификаторы уведомлений"
+    )
+
+
+class NotificationsReadAll(BaseModel):
+    """Тело запроса на отметку всех уведомлений пользователя прочитанными"""
+
+    user_id: UUID = Field(..., description="Идентификатор пользователя")
+    before: datetime | None = Field(
+        default=None,
+        description="Только уведомления, созданные не позже указанного момента",
+    )
+
+
+class NotificationsReadResult(BaseModel):
+    """Тело ответа на отметку уведомлений прочитанными"""
+
+    updated: int = Field(..., description="Количество помеченных уведомлений")
+
+
+class UnreadCount(BaseModel):
+    """Количество непрочитанных уведомлений пользователя"""
+
+    user_id: UUID = Field(..., description="Идентификатор пользователя")
+    unread: int = Field(..., description="Количество непрочитанных уведомлений")
 
 
 class NotificationStatus(BaseModel):
@@ -0,0 +1,181 @@
+import time
+from typing import Any, Dict, List, Tuple
+
+
+def _encode(value: Any) -> bytes:
+    """Значение в том виде, в котором его хранит Redis"""
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+class FakeRedis:
+    """Клиент `redis.asyncio.Redis` в памяти для тестов бэкенда aiocache
+
+    Поддерживает команды, которые использует `RedisCache`, и хранит значения
+    байтами, как настоящий Redis с `decode_responses=False`. Счетчик `calls`
+    считает обращения к серверу (конвейер - одно обращение).
+    """
+
+    def __init__(self) -> None:
+        self.data: Dict[bytes, Tuple[bytes, float | None]] = {}
+        self.calls = 0
+
+    def _key(self, key: Any) -> bytes:
+        return _encode(key)
+
+    def _alive(self, key: bytes) -> bool:
+        entry = self.data.get(key)
+        if entry is None:
+            return False
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return False
+        return True
+
+    def ttl_of(self, key: Any) -> float | None:
+        """Оставшееся время жизни ключа (`None` - без срока)"""
+        key = self._key(key)
+        self._alive(key)
+        expires_at = self.data[key][1]
+        return None if expires_at is None else expires_at - time.monotonic()
+
+    def _set(self, key: Any, value: Any, ttl: float | None = None) -> bool:
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self.data[self._key(key)] = (_encode(value), expires_at)
+        return True
+
+    def _get(self, key: Any) -> bytes | None:
+        key = self._key(key)
+        return self.data[key][0] if self._alive(key) else None
+
+    def _incrby(self, key: Any, delta: int) -> int:
+        key = self._key(key)
+        expires_at = self.data[key][1] if self._alive(key) else None
+        value = int(self.data[key][0]) + delta if key in self.data else delta
+        self.data[key] = (_encode(value), expires_at)
+        return value
+
+    def _expire(self, key: Any, ttl: float) -> bool:
+        key = self._key(key)
+        if not self._alive(key):
+            return False
+        self.data[key] = (self.data[key][0], time.monotonic() + ttl)
+        return True
+
+    def _delete(self, *keys: Any) -> int:
+        deleted = 0
+        for key in map(self._key, keys):
+            if self._alive(key):
+                del self.data[key]
+                deleted += 1
+        return deleted
+
+    def _mset(self, *flattened: Any) -> bool:
+        for key, value in zip(flattened[::2], flattened[1::2]):
+            self._set(key, value)
+        return True
+
+    def _set_command(
+        self, key: Any, value: Any, ex: Any = None, px: Any = None, nx: bool = False
+    ) -> bool | None:
+        if nx and self._alive(self._key(key)):
+            return None
+        ttl = ex if ex is not None else (px / 1000 if px is not None else None)
+        return self._set(key, value, ttl)
+
+    def _execute_command(self, command: str, *args: Any) -> Any:
+        if command.upper() == "MSET":
+            return self._mset(*args)
+        raise NotImplementedError(command)
+
+    def _eval(self, script: str, numkeys: int, *args: Any) -> Any:
+        if "'del'" not in script:
+            raise NotImplementedError(script)
+        key, value = args[:2]
+        if self._get(key) == _encode(value):
+            return self._delete(key)
+        return 0
+
+    async def get(self, key: Any) -> bytes | None:
+        self.calls += 1
+        return self._get(key)
+
+    async def mget(self, *keys: Any) -> List[bytes | None]:
+        self.calls += 1
+        return [self._get(key) for key in keys]
+
+    async def set(self, key: Any, value: Any, **kwargs: Any) -> bool | None:
+        self.calls += 1
+        return self._set_command(key, value, **kwargs)
+
+    async def setex(self, key: Any, ttl: int, value: Any) -> bool:
+        self.calls += 1
+        return self._set(key, value, ttl)
+
+    async def psetex(self, key: Any, ttl: int, value: Any) -> bool:
+        self.calls += 1
+        return self._set(key, value, ttl / 1000)
+
+    async def incrby(self, key: Any, delta: int) -> int:
+        self.calls += 1
+        return self._incrby(key, delta)
+
+    async def expire(self, key: Any, ttl: int) -> bool:
+        self.calls += 1
+        return self._expire(key, ttl)
+
+    async def delete(self, *keys: Any) -> int:
+        self.calls += 1
+        return self._delete(*keys)
+
+    async def exists(self, key: Any) -> int:
+        self.calls += 1
+        return int(self._alive(self._key(key)))
+
+    async def execute_command(self, command: str, *args: Any) -> Any:
+        self.calls += 1
+        return self._execute_command(command, *args)
+
+    async def eval(self, script: str, numkeys: int, *args: Any) -> Any:
+        self.calls += 1
+        return self._eval(script, numkeys, *args)
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Конвейер команд `FakeRedis`, выполняемый одним обращением"""
+
+    def __init__(self, client: FakeRedis) -> None:
+        self._client = client
+        self._commands: List[Tuple[str, Tuple[Any, ...], Dict[str, Any]]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self._commands.clear()
+
+    def __getattr__(self, name: str) -> Any:
+        def queue(*args: Any, **kwargs: Any) -> "FakePipeline":
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> List[Any]:
+        self._client.calls += 1
+        handlers = {
+            "set": self._client._set_command,
+            "incrby": self._client._incrby,
+            "expire": lambda key, time: self._client._expire(key, time),
+            "pexpire": lambda key, time: self._client._expire(key, time / 1000),
+            "execute_command": self._client._execute_command,
+        }
+        results = [
+            handlers[name](*args, **kwargs) for name, args, kwargs in self._commands
+        ]
+        self._commands.clear()
+        return results
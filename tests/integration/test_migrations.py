@@ -0,0 +1,145 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import inspect, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.migrations import (
+    LOCK_KEY,
+    MIGRATIONS,
+    build_indexes,
+    lock,
+    migrate,
+    schema_migrations,
+)
+
+
+def _state(conn):
+    versions = list(conn.execute(select(schema_migrations.c.version)).scalars())
+    indexes = {index["name"] for index in inspect(conn).get_indexes("notifications")}
+    return versions, indexes
+
+
+@pytest.mark.asyncio
+async def test_migrate_fresh_database():
+    """Тест создания схемы с нуля и отметки всех миграций примененными"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(migrate)
+        versions, indexes = await conn.run_sync(_state)
+
+    assert versions == [migration.VERSION for migration in MIGRATIONS]
+    assert "ix_notifications_unread_user_id_created_at_id" in indexes
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_migrate_existing_database():
+    """Тест применения миграций к базе, созданной до появления версионирования"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "CREATE TABLE notifications ("
+                "id CHAR(32) PRIMARY KEY, user_id CHAR(32) NOT NULL, "
+                "title VARCHAR(50) NOT NULL, text VARCHAR(255) NOT NULL, "
+                "created_at DATETIME NOT NULL, read_at DATETIME, "
+                "category VARCHAR(255), confidence FLOAT, "
+                "processing_status VARCHAR(10) NOT NULL)"
+            )
+        )
+        await conn.run_sync(migrate)
+        await conn.run_sync(migrate)
+        versions, indexes = await conn.run_sync(_state)
+
+    assert versions == [migration.VERSION for migration in MIGRATIONS]
+    assert {
+        "ix_notifications_created_at_id",
+        "ix_notifications_user_id_created_at_id",
+        "ix_notifications_unread_user_id_created_at_id",
+        "ix_notifications_category_created_at_id",
+        "ix_notifications_processing_status_created_at",
+        "ix_notifications_processing_status_lease",
+    } <= indexes
+    async with engine.connect() as conn:
+        columns = await conn.run_sync(
+            lambda conn: {
+                column["name"] for column in inspect(conn).get_columns("notifications")
+            }
+        )
+    assert "lease_expires_at" in columns
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_migrate_backfills_unread_counters():
+    """Тест заполнения счетчиков непрочитанных уведомлений существующей базы"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "CREATE TABLE notifications ("
+                "id CHAR(32) PRIMARY KEY, user_id CHAR(32) NOT NULL, "
+                "title VARCHAR(50) NOT NULL, text VARCHAR(255) NOT NULL, "
+                "created_at DATETIME NOT NULL, read_at DATETIME, "
+                "category VARCHAR(255), confidence FLOAT, "
+                "processing_status VARCHAR(10) NOT NULL)"
+            )
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO notifications VALUES "
+                "('a', 'u1', 'T', 'x', '2024-01-01', NULL, NULL, NULL, 'PENDING'), "
+                "('b', 'u1', 'T', 'x', '2024-01-01', NULL, NULL, NULL, 'PENDING'), "
+                "('c', 'u1', 'T', 'x', '2024-01-01', '2024-01-02', NULL, NULL, "
+                "'PENDING'), "
+                "('d', 'u2', 'T', 'x', '2024-01-01', '2024-01-02', NULL, NULL, "
+                "'PENDING')"
+            )
+        )
+        await conn.run_sync(migrate)
+        counters = (
+            await conn.execute(text("SELECT user_id, unread FROM user_unread_counters"))
+        ).all()
+
+    assert [tuple(row) for row in counters] == [("u1", 2)]
+    await engine.dispose()
+
+
+def test_migrations_are_serialized_by_advisory_lock():
+    """Тест транзакционной advisory-блокировки миграций в PostgreSQL"""
+    conn = MagicMock()
+    conn.dialect.name = "postgresql"
+
+    lock(conn)
+
+    statement, params = conn.execute.call_args.args
+    assert str(statement) == "SELECT pg_advisory_xact_lock(:key)"
+    assert params == {"key": LOCK_KEY}
+
+
+@pytest.mark.parametrize("locked", [True, False])
+def test_indexes_are_built_concurrently_by_one_process(locked):
+    """Тест построения индексов `CREATE INDEX CONCURRENTLY` процессом с блокировкой"""
+    conn = MagicMock()
+    conn.dialect.name = "postgresql"
+    conn.execute.return_value.scalar.return_value = locked
+
+    build_indexes(conn)
+
+    statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+    created = [
+        statement
+        for statement in statements
+        if statement.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS")
+    ]
+    if not locked:
+        assert statements == ["SELECT pg_try_advisory_lock(:key)"]
+        return
+    assert len(created) == sum(
+        len(getattr(migration, "CONCURRENT_INDEXES", {})) for migration in MIGRATIONS
+    )
+    assert (
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_notifications_created_at_id" in statements
+    )
+    assert statements[-1] == "SELECT pg_advisory_unlock(:key)"
@@ -1,7 +1,20 @@
+import asyncio
+import csv
+import io
+import json
+import time
+from unittest.mock import MagicMock
 from uuid import uuid4
 
 import pytest
+import pytest_asyncio
 from fastapi import status
+from httpx import ASGITransport, AsyncClient
+
+from src.config import Config
+from src.db import get_db, get_read_db
+from src.rest import app
+from src.services.notification_service import NotificationService
 
 
 @pytest.mark.asyncio
@@ -49,3 +62,360 @@ async def test_mark_notification_as_read(client, db_session):
     response = client.post(f"/v1/notifications/{notification_id}/read")
 
     assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_create_notifications_batch(client):
+    """Тест эндпоинта пакетного создания уведомлений с частично невалидным пакетом"""
+    user_id = str(uuid4())
+    payload = [
+        {"user_id": user_id, "title": "First", "text": "First text"},
+        {"user_id": user_id, "title": "x" * 51, "text": "Too long title"},
+        {"user_id": user_id, "title": "Third", "text": "Third text"},
+    ]
+
+    response = client.post("/v1/notifications/batch", json=payload)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 1
+    assert [item["index"] for item in data["items"]] == [0, 1, 2]
+    assert data["items"][0]["id"] is not None
+    assert data["items"][1]["id"] is None
+    assert data["items"][1]["errors"][0]["loc"] == ["title"]
+
+    created = client.get(f"/v1/notifications/{data['items'][2]['id']}").json()
+    assert created["title"] == "Third"
+
+
+@pytest.mark.asyncio
+async def test_get_notifications_list_cursor_pagination(client):
+    """Тест курсорной пагинации списка уведомлений в обоих направлениях"""
+    user_id = str(uuid4())
+    payload = [
+        {"user_id": user_id, "title": f"Title {i}", "text": "Text"} for i in range(5)
+    ]
+    client.post("/v1/notifications/batch", json=payload)
+
+    first = client.get(f"/v1/notifications/?user_id={user_id}&limit=2").json()
+    assert [item["title"] for item in first["data"]] == ["Title 4", "Title 3"]
+    assert first["prev_cursor"] is None
+
+    second = client.get(
+        f"/v1/notifications/?user_id={user_id}&limit=2&after={first['next_cursor']}"
+    ).json()
+    assert [item["title"] for item in second["data"]] == ["Title 2", "Title 1"]
+
+    third = client.get(
+        f"/v1/notifications/?user_id={user_id}&limit=2&after={second['next_cursor']}"
+    ).json()
+    assert [item["title"] for item in third["data"]] == ["Title 0"]
+    assert third["next_cursor"] is None
+
+    back = client.get(
+        f"/v1/notifications/?user_id={user_id}&limit=2&before={third['prev_cursor']}"
+    ).json()
+    assert [item["title"] for item in back["data"]] == ["Title 2", "Title 1"]
+
+
+@pytest.mark.asyncio
+async def test_get_notifications_list_invalid_cursor(client):
+    """Тест отклонения поврежденного курсора пагинации"""
+    response = client.get("/v1/notifications/?after=not-a-cursor")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "count_mode, expected",
+    [("exact", 3), ("estimated", 3), ("window", 3), ("none", None)],
+)
+async def test_get_notifications_list_count_modes(client, count_mode, expected):
+    """Тест способов подсчета общего количества уведомлений"""
+    user_id = str(uuid4())
+    payload = [{"user_id": user_id, "title": "Title", "text": "Text"}] * 3
+    client.post("/v1/notifications/batch", json=payload)
+
+    response = client.get(
+        f"/v1/notifications/?user_id={user_id}&limit=2&count_mode={count_mode}"
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert len(data["data"]) == 2
+    assert data["count"] == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("page", ["limit=0", "limit=2&offset=5"])
+async def test_window_count_of_empty_page(client, page):
+    """Тест подсчета оконной функцией, когда страница пуста, а записи есть"""
+    user_id = str(uuid4())
+    payload = [{"user_id": user_id, "title": "Title", "text": "Text"}] * 3
+    client.post("/v1/notifications/batch", json=payload)
+
+    response = client.get(
+        f"/v1/notifications/?user_id={user_id}&{page}&count_mode=window"
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["data"] == []
+    assert data["count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_mark_as_read_invalidates_cached_notification(client):
+    """Тест инвалидации закэшированного уведомления после отметки о прочтении"""
+    payload = {"user_id": str(uuid4()), "title": "Title", "text": "Text"}
+    notification_id = client.post("/v1/notifications/", json=payload).json()["id"]
+
+    assert client.get(f"/v1/notifications/{notification_id}").json()["read_at"] is None
+    client.post(f"/v1/notifications/{notification_id}/read")
+
+    assert (
+        client.get(f"/v1/notifications/{notification_id}").json()["read_at"]
+        is not None
+    )
+
+
+@pytest.mark.asyncio
+async def test_mark_notifications_as_read_in_bulk(client):
+    """Тест отметки списка уведомлений прочитанными с подсчетом измененных"""
+    payload = {"user_id": str(uuid4()), "title": "Title", "text": "Text"}
+    ids = [client.post("/v1/notifications/", json=payload).json()["id"] for _ in "abc"]
+    client.post(f"/v1/notifications/{ids[0]}/read")
+
+    response = client.post(
+        "/v1/notifications/read", json={"ids": [*ids, str(uuid4())]}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"updated": 2}
+    assert client.get(f"/v1/notifications/{ids[2]}").json()["read_at"] is not None
+    assert client.post("/v1/notifications/read", json={"ids": ids}).json() == {
+        "updated": 0
+    }
+
+
+@pytest.mark.asyncio
+async def test_mark_all_notifications_as_read(client):
+    """Тест отметки всех уведомлений пользователя прочитанными до момента времени"""
+    user_id = str(uuid4())
+    payload = {"user_id": user_id, "title": "Title", "text": "Text"}
+    first = client.post("/v1/notifications/", json=payload).json()
+    second = client.post("/v1/notifications/", json=payload).json()
+    other = client.post(
+        "/v1/notifications/", json={**payload, "user_id": str(uuid4())}
+    ).json()
+
+    response = client.post(
+        "/v1/notifications/read-all",
+        json={"user_id": user_id, "before": first["created_at"]},
+    )
+    assert response.json() == {"updated": 1}
+
+    response = client.post("/v1/notifications/read-all", json={"user_id": user_id})
+    assert response.json() == {"updated": 1}
+    assert client.get(f"/v1/notifications/{second['id']}").json()["read_at"]
+    assert client.get(f"/v1/notifications/{other['id']}").json()["read_at"] is None
+
+
+@pytest.mark.asyncio
+async def test_unread_count_follows_creation_and_reads(client):
+    """Тест счетчика непрочитанных уведомлений при создании и прочтении"""
+    user_id = str(uuid4())
+    payload = {"user_id": user_id, "title": "Title", "text": "Text"}
+    first = client.post("/v1/notifications/", json=payload).json()
+    client.post("/v1/notifications/batch", json=[payload, payload, payload])
+
+    def unread():
+        response = client.get(
+            "/v1/notifications/unread-count", params={"user_id": user_id}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()["unread"]
+
+    assert unread() == 4
+    client.post(f"/v1/notifications/{first['id']}/read")
+    client.post(f"/v1/notifications/{first['id']}/read")
+    assert unread() == 3
+    client.post("/v1/notifications/read-all", json={"user_id": user_id})
+    assert unread() == 0
+    response = client.get(
+        "/v1/notifications/unread-count", params={"user_id": str(uuid4())}
+    )
+    assert response.json()["unread"] == 0
+
+
+@pytest.mark.asyncio
+async def test_websocket_receives_created_notifications(client):
+    """Тест доставки событий создания уведомлений подписчику WebSocket"""
+    user_id = str(uuid4())
+    payload = {"user_id": user_id, "title": "Title", "text": "Text"}
+
+    with client.websocket_connect(f"/v1/notifications/ws?user_id={user_id}") as ws:
+        created = client.post("/v1/notifications/", json=payload).json()
+        client.post("/v1/notifications/", json={**payload, "user_id": str(uuid4())})
+        event = ws.receive_json()
+
+    assert event["event"] == "created"
+    assert event["id"] == created["id"]
+    assert event["user_id"] == user_id
+
+
+@pytest_asyncio.fixture
+async def async_client(db_session):
+    async def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_status_long_poll_returns_on_transition(async_client, db_session):
+    """Тест long-poll статуса: ответ сразу после перехода в ожидаемый статус"""
+    obj = await NotificationService.create(db_session, uuid4(), "Title", "Text")
+    url = f"/v1/notifications/{obj.id}/status"
+
+    waiting = asyncio.create_task(
+        async_client.get(url, params={"wait_for": "completed", "timeout": 5})
+    )
+    await asyncio.sleep(0.1)
+    assert not waiting.done()
+    await NotificationService.claim_for_processing(db_session, obj.id)
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+    start = time.monotonic()
+    await NotificationService.complete_processing(db_session, obj.id, "info", 0.9)
+    response = await asyncio.wait_for(waiting, 1)
+
+    assert time.monotonic() - start < 0.5
+    assert response.json() == {"status": "completed"}
+    assert response.headers["cache-control"] == "no-store"
+    assert (await async_client.get(url)).json() == {"status": "completed"}
+
+
+@pytest.mark.asyncio
+async def test_status_long_poll_times_out_with_current_status(
+    async_client, db_session
+):
+    """Тест long-poll статуса: по истечении `timeout` возвращается текущий статус"""
+    obj = await NotificationService.create(db_session, uuid4(), "Title", "Text")
+    url = f"/v1/notifications/{obj.id}/status"
+
+    response = await async_client.get(
+        url, params={"wait_for": "completed", "timeout": 0.05}
+    )
+    pending = await async_client.get(url, params={"wait_for": "pending"})
+
+    assert response.json() == {"status": "pending"}
+    assert pending.json() == {"status": "pending"}
+
+
+@pytest.mark.asyncio
+async def test_status_long_poll_reads_primary(async_client, db_session):
+    """Тест long-poll статуса: текущий статус читается из основной базы"""
+    obj = await NotificationService.create(db_session, uuid4(), "Title", "Text")
+    await NotificationService.claim_for_processing(db_session, obj.id)
+    await NotificationService.complete_processing(db_session, obj.id, "info", 0.9)
+    db_session.expunge_all()
+
+    replica = MagicMock()
+    replica.__aenter__.side_effect = AssertionError("replica must not be read")
+
+    async def lagging_replica():
+        yield replica
+
+    app.dependency_overrides[get_read_db] = lagging_replica
+    response = await async_client.get(
+        f"/v1/notifications/{obj.id}/status",
+        params={"wait_for": "completed", "timeout": 5},
+    )
+
+    assert response.json() == {"status": "completed"}
+
+
+@pytest.mark.asyncio
+async def test_export_notifications_ndjson(client, monkeypatch):
+    """Тест выгрузки уведомлений по фильтрам в NDJSON частями"""
+    monkeypatch.setattr(Config.server, "export_chunk_size", 2)
+    user_id = str(uuid4())
+    payload = {"user_id": user_id, "title": "Title", "text": "Text"}
+    client.post("/v1/notifications/batch", json=[payload] * 5)
+    client.post("/v1/notifications/", json={**payload, "user_id": str(uuid4())})
+
+    response = client.get(
+        "/v1/notifications/export", params={"user_id": user_id, "limit": 1}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["cache-control"] == "no-store"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 5
+    assert {row["user_id"] for row in rows} == {user_id}
+    assert rows[0]["processing_status"] == "pending"
+    assert [row["created_at"] for row in rows] == sorted(
+        (row["created_at"] for row in rows), reverse=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_export_notifications_csv(client):
+    """Тест выгрузки уведомлений в CSV и отсутствия кэширования выгрузки"""
+    user_id = str(uuid4())
+    payload = {"user_id": user_id, "title": "Title, quoted", "text": "Line\nbreak"}
+    client.post("/v1/notifications/", json=payload)
+    params = {"user_id": user_id, "format": "csv"}
+
+    first = client.get("/v1/notifications/export", params=params)
+    client.post("/v1/notifications/", json=payload)
+    second = client.get("/v1/notifications/export", params=params)
+
+    assert first.headers["content-type"].startswith("text/csv")
+    assert "notifications.csv" in first.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(second.text)))
+    assert len(list(csv.DictReader(io.StringIO(first.text)))) == 1
+    assert len(rows) == 2
+    assert rows[0]["title"] == payload["title"]
+    assert rows[0]["text"] == payload["text"]
+    assert rows[0]["read_at"] == ""
+
+
+@pytest.mark.asyncio
+async def test_stream_list_yields_partitions(db_session):
+    """Тест чтения выгрузки частями заданного размера"""
+    user_id = uuid4()
+    await NotificationService.create_many(
+        db_session, [{"user_id": user_id, "title": "T", "text": "X"}] * 5
+    )
+
+    sizes = [
+        len(partition)
+        async for partition in NotificationService.stream_list(
+            db_session, 2, user_id=user_id
+        )
+    ]
+
+    assert sizes == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_health_db_reports_pool_gauges(client):
+    """Тест эндпоинта состояния пула соединений базы данных"""
+    response = client.get("/v1/health/db")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["pool"] == "MeasuredQueuePool"
+    assert data["size"] == Config.db.pool_size
+    assert {"checked_out", "waiting", "wait_avg", "wait_max", "timeouts"} <= set(data)
@@ -0,0 +1,327 @@
+import asyncio
+from datetime import timedelta
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from src import tasks
+from src.models import Notification, ProcessingStatus, UserUnreadCounter, utcnow
+from src.services.event_service import EventService
+from src.services.notification_service import NotificationService
+from src.services.processing_buffer import ProcessingBuffer
+
+
+@pytest.fixture
+def task_db(db_session):
+    """Подменить сессию базы данных, используемую задачами воркера"""
+
+    @asynccontextmanager
+    async def override_get_db():
+        yield db_session
+
+    with patch.object(tasks, "get_db", override_get_db):
+        yield db_session
+
+
+async def create_notifications(db_session, texts):
+    user_id = uuid4()
+    return await NotificationService.create_many(
+        db_session,
+        [{"user_id": user_id, "title": "T", "text": text} for text in texts],
+    )
+
+
+@pytest.mark.asyncio
+async def test_claim_pending_skips_already_claimed(db_session):
+    """Тест захвата уведомлений одним запросом без повторной выдачи"""
+    created = await create_notifications(db_session, ["a", "b", "c"])
+    ids = [obj.id for obj in created]
+
+    first = await NotificationService.claim_pending(db_session, ids, limit=2)
+    second = await NotificationService.claim_pending(db_session, ids)
+    third = await NotificationService.claim_pending(db_session, ids)
+
+    assert len(first) == 2
+    assert {row.id for row in first} | {row.id for row in second} == set(ids)
+    assert third == []
+
+
+@pytest.mark.asyncio
+async def test_calculate_batch_writes_results_in_bulk(task_db):
+    """Тест пакетной обработки: один вызов AI-сервиса и запись всех результатов"""
+    created = await create_notifications(task_db, ["server error", "hello"])
+    analyze = AsyncMock(
+        side_effect=lambda texts: [
+            {"category": "critical" if "error" in text else "info", "confidence": 0.9}
+            for text in texts
+        ]
+    )
+
+    with patch.object(tasks.AIService, "analyze_batch", analyze):
+        processed = await tasks.calculate_batch([obj.id for obj in created])
+
+    assert processed == 2
+    analyze.assert_awaited_once()
+    task_db.expire_all()
+    rows = (await task_db.scalars(select(Notification))).all()
+    assert {obj.text: obj.category for obj in rows} == {
+        "server error": "critical",
+        "hello": "info",
+    }
+    assert {obj.processing_status for obj in rows} == {ProcessingStatus.COMPLETED}
+
+
+@pytest.mark.asyncio
+async def test_calculate_batch_marks_failed_on_ai_error(task_db):
+    """Тест пометки всего пакета как `failed` при ошибке AI-сервиса"""
+    created = await create_notifications(task_db, ["a", "b"])
+
+    with patch.object(
+        tasks.AIService, "analyze_batch", AsyncMock(side_effect=RuntimeError)
+    ):
+        await tasks.calculate_batch([obj.id for obj in created])
+
+    task_db.expire_all()
+    rows = (await task_db.scalars(select(Notification))).all()
+    assert {obj.processing_status for obj in rows} == {ProcessingStatus.FAILED}
+
+
+@pytest.mark.asyncio
+async def test_processing_buffer_flushes_by_size_and_linger():
+    """Тест публикации буфера при заполнении пакета и по истечении `linger`"""
+    publish = MagicMock()
+    buffer = ProcessingBuffer(batch_size=2, linger=0.01, publish=publish)
+    ids = [uuid4() for _ in range(3)]
+
+    buffer.add(ids[:2])
+    buffer.add(ids[2:])
+    assert [call.args[0] for call in publish.call_args_list] == [ids[:2]]
+
+    await asyncio.sleep(0.05)
+    assert [call.args[0] for call in publish.call_args_list] == [ids[:2], ids[2:]]
+
+
+@pytest.mark.asyncio
+async def test_processing_buffer_keeps_ids_on_publish_failure():
+    """Тест возврата уведомлений в буфер и повторной публикации после ошибки"""
+    publish = MagicMock(side_effect=[None, ConnectionError, None, None])
+    buffer = ProcessingBuffer(batch_size=2, linger=0, publish=publish)
+    ids = [uuid4() for _ in range(6)]
+
+    with patch("src.services.processing_buffer.RETRY_DELAY", 0.01):
+        buffer.add(ids)
+        assert len(publish.call_args_list) == 2
+
+        await asyncio.sleep(0.05)
+    assert [call.args[0] for call in publish.call_args_list] == [
+        ids[:2],
+        ids[2:4],
+        ids[2:4],
+        ids[4:],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_transitions_are_conditional(db_session):
+    """Тест условных переходов статуса: повторный захват и завершение - no-op"""
+    (obj,) = await create_notifications(db_session, ["text"])
+
+    claimed = await NotificationService.claim_for_processing(db_session, obj.id)
+    assert claimed.text == "text" and claimed.user_id == obj.user_id
+    assert await NotificationService.claim_for_processing(db_session, obj.id) is None
+
+    assert await NotificationService.complete_processing(
+        db_session, obj.id, category="info", confidence=0.9
+    )
+    assert not await NotificationService.fail_processing(db_session, obj.id)
+    assert await NotificationService.claim_for_processing(db_session, uuid4()) is None
+
+    await db_session.refresh(obj)
+    assert obj.processing_status == ProcessingStatus.COMPLETED
+    assert obj.category == "info"
+
+
+@pytest.mark.asyncio
+async def test_save_ai_results_skips_rows_no_longer_processing(db_session):
+    """Тест записи результатов только в уведомления, все еще находящиеся в обработке"""
+    created = await create_notifications(db_session, ["a", "b"])
+    ids = [obj.id for obj in created]
+    await NotificationService.claim_pending(db_session, ids)
+    # Аренда первого истекла, и другой воркер уже завершил его обработку
+    await NotificationService.complete_processing(db_session, ids[0], "info", 0.9)
+    failed = {"processing_status": ProcessingStatus.FAILED, "lease_expires_at": None}
+
+    async with EventService.subscribe(created[0].user_id) as subscription:
+        updated = await NotificationService.save_ai_results(
+            db_session, [{"id": _id, **failed} for _id in ids]
+        )
+        events = [subscription._queue.get_nowait()]
+        assert subscription._queue.empty()
+
+    assert updated == 1
+    assert events[0]["id"] == str(ids[1])
+    for obj in created:
+        await db_session.refresh(obj)
+    assert created[0].processing_status == ProcessingStatus.COMPLETED
+    assert created[1].processing_status == ProcessingStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_duplicate_delivery_is_noop(task_db):
+    """Тест пропуска повторно доставленной задачи без обращения к AI-сервису"""
+    (obj,) = await create_notifications(task_db, ["hello"])
+    analyze = AsyncMock(return_value={"category": "info", "confidence": 0.9})
+
+    with patch.object(tasks.AIService, "analyze_text", analyze):
+        await tasks.calculate(obj.id)
+        await tasks.calculate(obj.id)
+
+    analyze.assert_awaited_once_with("hello")
+    await task_db.refresh(obj)
+    assert obj.processing_status == ProcessingStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_expired_leases_are_requeued(db_session):
+    """Тест возврата в очередь уведомлений с истекшей арендой обработки"""
+    created = await create_notifications(db_session, ["a", "b"])
+    await NotificationService.claim_pending(db_session, [created[0].id], lease=-1)
+    await NotificationService.claim_pending(db_session, [created[1].id], lease=60)
+
+    assert await NotificationService.requeue_expired(db_session) == 1
+
+    for obj in created:
+        await db_session.refresh(obj)
+    assert created[0].processing_status == ProcessingStatus.PENDING
+    assert created[0].lease_expires_at is None
+    assert created[1].processing_status == ProcessingStatus.PROCESSNG
+    assert created[1].lease_expires_at is not None
+
+
+@pytest.mark.asyncio
+async def test_sweep_redispatches_stale_pending_once_per_lease(task_db):
+    """Тест повторной публикации зависших уведомлений не чаще раза за аренду"""
+    (obj,) = await create_notifications(task_db, ["a"])
+    await task_db.execute(
+        update(Notification).values(created_at=utcnow() - timedelta(minutes=5))
+    )
+    await task_db.commit()
+
+    with patch.object(tasks.Config.worker, "lease", 60), patch.object(
+        tasks, "dispatch_processing"
+    ) as dispatch:
+        assert await tasks.sweep() == {"requeued": 0, "redispatched": 1}
+        assert await tasks.sweep() == {"requeued": 0, "redispatched": 0}
+
+        await task_db.execute(
+            update(Notification).values(lease_expires_at=utcnow() - timedelta(1))
+        )
+        await task_db.commit()
+        assert await tasks.sweep() == {"requeued": 0, "redispatched": 1}
+
+    assert [call.args[0] for call in dispatch.call_args_list] == [
+        [obj.id],
+        [],
+        [obj.id],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_poll_processes_queue_until_stopped(task_db):
+    """Тест обработки очереди в базе данных опрашивающим обработчиком"""
+    created = await create_notifications(task_db, ["a", "b", "c"])
+    stop = asyncio.Event()
+
+    async def analyze(texts):
+        if len(texts) < 2:
+            stop.set()
+        return [{"category": "info", "confidence": 0.9} for _ in texts]
+
+    with patch.object(tasks.Config.worker, "batch_size", 2), patch.object(
+        tasks.AIService, "analyze_batch", side_effect=analyze
+    ):
+        await asyncio.wait_for(tasks.poll(stop), timeout=5)
+
+    for obj in created:
+        await task_db.refresh(obj)
+        assert obj.processing_status == ProcessingStatus.COMPLETED
+        assert obj.lease_expires_at is None
+
+
+@pytest.mark.asyncio
+async def test_duplicate_texts_are_analyzed_once(task_db):
+    """Тест кэша результатов: одинаковые тексты анализируются один раз"""
+    created = await create_notifications(
+        task_db, ["disk error", "disk  error", "hello"]
+    )
+    later = await create_notifications(task_db, ["hello"])
+    analyze = AsyncMock(
+        side_effect=lambda texts: [
+            {"category": "critical" if "error" in text else "info", "confidence": 0.9}
+            for text in texts
+        ]
+    )
+
+    with patch.object(tasks.AIService, "analyze_batch", analyze):
+        await tasks.calculate_batch([obj.id for obj in created])
+    with patch.object(tasks.AIService, "analyze_text", AsyncMock()) as analyze_text:
+        await tasks.calculate(later[0].id)
+
+    analyze.assert_awaited_once()
+    assert len(analyze.await_args.args[0]) == 2
+    analyze_text.assert_not_awaited()
+    task_db.expire_all()
+    rows = (await task_db.scalars(select(Notification))).all()
+    assert [obj.category for obj in rows].count("critical") == 2
+    assert {obj.processing_status for obj in rows} == {ProcessingStatus.COMPLETED}
+
+
+@pytest.mark.asyncio
+async def test_reconcile_repairs_unread_counters(task_db):
+    """Тест сверки разошедшихся и недостающих счетчиков непрочитанных уведомлений"""
+    created = await create_notifications(task_db, ["a", "b"])
+    user_id = created[0].user_id
+    await task_db.execute(
+        update(UserUnreadCounter)
+        .where(UserUnreadCounter.user_id == user_id)
+        .values(unread=7)
+    )
+    other = await create_notifications(task_db, ["c"])
+    await task_db.execute(
+        delete(UserUnreadCounter).where(UserUnreadCounter.user_id == other[0].user_id)
+    )
+    await task_db.commit()
+
+    assert await tasks.reconcile() == 2
+    assert await NotificationService.get_unread_count(task_db, user_id) == 2
+    assert await NotificationService.get_unread_count(task_db, other[0].user_id) == 1
+    assert await tasks.reconcile() == 0
+
+
+@pytest.mark.asyncio
+async def test_status_transitions_are_published(task_db):
+    """Тест публикации событий создания и переходов статуса обработки"""
+    user_id = uuid4()
+    async with EventService.subscribe(user_id) as subscription:
+        created = await NotificationService.create_many(
+            task_db, [{"user_id": user_id, "title": "T", "text": "server error"}]
+        )
+        with patch.object(
+            tasks.AIService,
+            "analyze_text",
+            AsyncMock(return_value={"category": "critical", "confidence": 0.9}),
+        ):
+            await tasks.calculate(created[0].id)
+
+        events = [subscription._queue.get_nowait() for _ in range(3)]
+
+    assert [event["event"] for event in events] == ["created", "status", "status"]
+    assert [event.get("status") for event in events[1:]] == [
+        "processing",
+        "completed",
+    ]
+    assert events[2]["category"] == "critical"
+    assert {event["id"] for event in events} == {str(created[0].id)}
@@ -1,11 +1,18 @@
-from unittest.mock import AsyncMock
+import asyncio
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from aiocache import Cache
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
 
+from src.cache import TieredCache, create_backend
+from src.cache_codec import EntryCodec
 from src.middlewares.cache import CacheMiddleware
+from src.services.cache_service import CacheService
+from tests.fake_redis import FakeRedis
 
 
 @pytest.fixture
@@ -126,6 +133,155 @@ def test_non_cached_endpoint_always_executes(test_app):
     assert response.json()["count"] == 2
 
 
+def test_if_none_match_returns_not_modified_from_cache(test_app):
+    """Тест выдачи ETag и ответа 304 из кэша при совпадении If-None-Match"""
+    app = test_app({"/cached": 60})
+    call_count = 0
+
+    @app.get("/cached")
+    async def get_cached():
+        nonlocal call_count
+        call_count += 1
+        return {"message": "OK"}
+
+    client = TestClient(app)
+
+    response = client.get("/cached")
+    etag = response.headers["etag"]
+    assert client.get("/cached").headers["etag"] == etag
+
+    response = client.get("/cached", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = client.get("/cached", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+    assert response.json() == {"message": "OK"}
+    assert call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidated_tags_evict_cached_responses():
+    """Тест инвалидации закэшированных ответов по тегам параметров пути и запроса"""
+    app = FastAPI()
+    cache = Cache(Cache.MEMORY)
+    app.add_middleware(
+        CacheMiddleware,
+        cache=cache,
+        cached_endpoints={"/items/{item_id}": 60, "/items/": 60},
+        tag_params=["owner"],
+    )
+    call_count = 0
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        nonlocal call_count
+        call_count += 1
+        return {"count": call_count}
+
+    @app.get("/items/")
+    async def get_items(owner: str | None = None):
+        nonlocal call_count
+        call_count += 1
+        return {"count": call_count}
+
+    client = TestClient(app)
+
+    assert client.get("/items/1").json() == {"count": 1}
+    assert client.get("/items/?owner=a").json() == {"count": 2}
+    assert client.get("/items/").json() == {"count": 3}
+
+    await CacheService.invalidate("item_id:2", "owner:b", cache=cache)
+    assert client.get("/items/1").json() == {"count": 1}
+    assert client.get("/items/?owner=a").json() == {"count": 2}
+
+    await CacheService.invalidate("item_id:1", "owner:a", cache=cache)
+    assert client.get("/items/1").json() == {"count": 4}
+    assert client.get("/items/?owner=a").json() == {"count": 5}
+    assert client.get("/items/").json() == {"count": 3}
+
+    await CacheService.invalidate("all", cache=cache)
+    assert client.get("/items/").json() == {"count": 6}
+
+
+@pytest.mark.asyncio
+async def test_tag_versions_expire_and_are_written_in_one_round_trip(monkeypatch):
+    """Тест записи версий тегов со сроком жизни одним обращением к Redis"""
+    backend = create_backend("redis://localhost:6379/0")
+    backend.client = FakeRedis()
+    monkeypatch.setattr(CacheService, "_tag_ttl", 90)
+    tags = [f"notification_id:{i}" for i in range(1000)]
+
+    await CacheService.invalidate(*tags, cache=backend)
+
+    assert backend.client.calls == 1
+    assert 0 < backend.client.ttl_of(CacheService.tag_key(tags[0])) <= 90
+    first = await backend.multi_get([CacheService.tag_key(tags[0])])
+    await CacheService.invalidate(tags[0], cache=backend)
+    assert await backend.multi_get([CacheService.tag_key(tags[0])]) != first
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("distributed_lock", [False, True])
+async def test_concurrent_misses_are_coalesced(distributed_lock):
+    """Тест единственного вычисления ответа для конкурентных промахов по одному ключу"""
+    app = FastAPI()
+    app.add_middleware(
+        CacheMiddleware,
+        cache=Cache(Cache.MEMORY),
+        cached_endpoints={"/cached": 60},
+        distributed_lock=distributed_lock,
+    )
+    call_count = 0
+
+    @app.get("/cached")
+    async def get_cached():
+        nonlocal call_count
+        call_count += 1
+        await asyncio.sleep(0.05)
+        return {"count": call_count}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        responses = await asyncio.gather(*(client.get("/cached") for _ in range(10)))
+
+    assert call_count == 1
+    assert all(response.json() == {"count": 1} for response in responses)
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_revalidating():
+    """Тест выдачи устаревшей записи с ее обновлением в фоне"""
+    app = FastAPI()
+    app.add_middleware(
+        CacheMiddleware,
+        cache=Cache(Cache.MEMORY),
+        cached_endpoints={"/cached": 10},
+        stale_ttl=60,
+    )
+    call_count = 0
+
+    @app.get("/cached")
+    async def get_cached():
+        nonlocal call_count
+        call_count += 1
+        return {"count": call_count}
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        assert (await client.get("/cached")).json() == {"count": 1}
+
+        with patch("src.middlewares.cache.time.time", return_value=10**10):
+            assert (await client.get("/cached")).json() == {"count": 1}
+            await asyncio.sleep(0.05)
+        assert call_count == 2
+
+        assert (await client.get("/cached")).json() == {"count": 2}
+
+
 @pytest.mark.asyncio
 async def test_cache_errors_do_not_break_request_handling():
     """Тест обработки ошибок кэширования без прерывания запроса"""
@@ -149,3 +305,180 @@ async def test_cache_errors_do_not_break_request_handling():
 
     response = client.get("/cached")
     assert response.status_code == 200
+
+
+def test_bypassed_requests_do_not_touch_cache():
+    """Тест передачи запросов к исключенным эндпоинтам и с long-poll без обращений к кэшу"""
+    app = FastAPI()
+    cache = Cache(Cache.MEMORY)
+    app.add_middleware(
+        CacheMiddleware,
+        cache=cache,
+        cached_endpoints={"/items/{item_id}": 60},
+        distributed_lock=True,
+        bypass_endpoints=["/items/export"],
+        bypass_params=["wait_for"],
+    )
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    client = TestClient(app)
+
+    with patch.object(cache, "multi_get", wraps=cache.multi_get) as multi_get:
+        assert client.get("/items/export").json() == {"id": "export"}
+        assert client.get("/items/1", params={"wait_for": "x"}).json() == {"id": "1"}
+        assert multi_get.await_count == 0
+
+        client.get("/items/1")
+        assert multi_get.await_count > 0
+
+
+def test_streaming_response_is_cached_after_completion():
+    """Тест кэширования потокового ответа, переданного клиенту по фрагментам"""
+    app = FastAPI()
+    app.add_middleware(
+        CacheMiddleware, cache=Cache(Cache.MEMORY), cached_endpoints={"/stream": 60}
+    )
+    call_count = 0
+
+    @app.get("/stream")
+    async def get_stream():
+        nonlocal call_count
+        call_count += 1
+
+        async def chunks():
+            for chunk in (b"a", b"b", b"c"):
+                yield chunk
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    client = TestClient(app)
+
+    assert client.get("/stream").content == b"abc"
+    response = client.get("/stream")
+    assert response.content == b"abc"
+    assert "etag" in response.headers
+    assert call_count == 1
+
+
+def test_response_over_max_size_is_not_cached():
+    """Тест пропуска кэширования ответа больше `max_size` при полной передаче клиенту"""
+    app = FastAPI()
+    app.add_middleware(
+        CacheMiddleware,
+        cache=Cache(Cache.MEMORY),
+        cached_endpoints={"/large": 60},
+        max_size=16,
+    )
+    call_count = 0
+
+    @app.get("/large")
+    async def get_large():
+        nonlocal call_count
+        call_count += 1
+        return PlainTextResponse("x" * 64)
+
+    client = TestClient(app)
+
+    assert client.get("/large").text == "x" * 64
+    assert client.get("/large").text == "x" * 64
+    assert call_count == 2
+
+
+def test_entries_are_stored_encoded_and_compressed():
+    """Тест хранения записей сжатыми в бинарном формате без лишних заголовков"""
+    app = FastAPI()
+    cache = Cache(Cache.MEMORY)
+    codec = EntryCodec(compression="gzip", compress_threshold=0, measure=True)
+    app.add_middleware(
+        CacheMiddleware, cache=cache, cached_endpoints={"/items": 60}, codec=codec
+    )
+
+    @app.get("/items")
+    async def get_items():
+        return {"items": ["notification"] * 500}
+
+    client = TestClient(app)
+
+    first = client.get("/items")
+    second = client.get("/items")
+    assert second.json() == first.json()
+    assert second.headers["content-type"] == "application/json"
+    assert second.headers["etag"] == first.headers["etag"]
+
+    stats = codec.metrics.snapshot()["/items"]
+    assert stats["writes"] == 1 and stats["reads"] == 1
+    assert stats["stored_bytes_per_key"] < stats["raw_bytes_per_key"] / 10
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_binary_entries_are_served_from_redis(compression):
+    """Тест попаданий бинарных записей через бэкенд Redis (значения не UTF-8)"""
+    app = FastAPI()
+    backend = create_backend("redis://localhost:6379/0")
+    backend.client = FakeRedis()
+    cache = TieredCache(backend, l1_max_bytes=0, l1_ttl=1)
+    codec = EntryCodec(compression=compression, compress_threshold=0)
+    app.add_middleware(
+        CacheMiddleware,
+        cache=cache,
+        cached_endpoints={"/items/{item_id}": 60},
+        distributed_lock=True,
+        codec=codec,
+    )
+    call_count = 0
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        nonlocal call_count
+        call_count += 1
+        return {"id": item_id, "items": ["notification"] * 50}
+
+    client = TestClient(app)
+
+    first = client.get("/items/1")
+    second = client.get("/items/1")
+
+    assert call_count == 1
+    assert second.json() == first.json()
+    assert cache.stats()["l2_hits"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_no_store_response_is_not_cached_and_releases_waiters():
+    """Тест ответа `no-store`: не кэшируется, ожидающие запросы не блокируются"""
+    app = FastAPI()
+    app.add_middleware(
+        CacheMiddleware,
+        cache=Cache(Cache.MEMORY),
+        cached_endpoints={"/events": 60},
+    )
+    started = []
+    both_started = asyncio.Event()
+
+    @app.get("/events")
+    async def get_events():
+        started.append(1)
+        if len(started) == 2:
+            both_started.set()
+
+        async def stream():
+            yield b"first\n"
+            await both_started.wait()
+            yield b"last\n"
+
+        return StreamingResponse(stream(), headers={"Cache-Control": "no-store"})
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        responses = await asyncio.wait_for(
+            asyncio.gather(client.get("/events"), client.get("/events")), 5
+        )
+        third = await client.get("/events")
+
+    assert [response.text for response in responses] == ["first\nlast\n"] * 2
+    assert third.text == "first\nlast\n"
+    assert len(started) == 3
@@ -0,0 +1,21 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.middlewares.logging import RequestLoggingMiddleware
+
+
+def test_request_id_header_is_added():
+    """Тест добавления уникального заголовка `X-Request-ID` к каждому ответу"""
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    client = TestClient(app)
+
+    first = client.get("/ping")
+    second = client.get("/ping")
+    assert first.json() == {"ok": True}
+    assert first.headers["x-request-id"] != second.headers["x-request-id"]
@@ -0,0 +1,73 @@
+from typing import Annotated
+
+from aiocache import Cache
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import src.db
+from src.db import ReplicaBalancer, get_read_db, make_session_factory
+from src.middlewares.cache import CacheMiddleware
+from src.middlewares.read_your_writes import ReadYourWritesMiddleware
+
+
+def test_reads_go_to_primary_after_write(monkeypatch):
+    """Тест чтения из основной базы в окне после записи и из реплики вне его"""
+    primary = create_async_engine("sqlite+aiosqlite:///primary.sqlite")
+    replica = create_async_engine("sqlite+aiosqlite:///replica.sqlite")
+    monkeypatch.setattr(
+        src.db, "session_factory", make_session_factory(primary), raising=False
+    )
+    monkeypatch.setattr(src.db, "replicas", ReplicaBalancer([replica]))
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, window=60)
+
+    @app.get("/read")
+    async def read(session: Annotated[AsyncSession, Depends(get_read_db)]):
+        async with session as db:
+            return {"database": db.bind.url.database}
+
+    @app.post("/write")
+    async def write():
+        return {}
+
+    client = TestClient(app)
+
+    assert client.get("/read").json() == {"database": "replica.sqlite"}
+    response = client.post("/write")
+    assert "read_primary" in response.headers["set-cookie"]
+    assert client.get("/read").json() == {"database": "primary.sqlite"}
+
+    client.cookies.clear()
+    assert client.get("/read").json() == {"database": "replica.sqlite"}
+    headers = {"X-Read-Primary": "0"}
+    assert client.get("/read", headers=headers).json() == {"database": "replica.sqlite"}
+
+
+def test_cache_is_filled_from_primary(monkeypatch):
+    """Тест заполнения кэша ответом из основной базы, а не из реплики"""
+    primary = create_async_engine("sqlite+aiosqlite:///primary.sqlite")
+    replica = create_async_engine("sqlite+aiosqlite:///replica.sqlite")
+    monkeypatch.setattr(
+        src.db, "session_factory", make_session_factory(primary), raising=False
+    )
+    monkeypatch.setattr(src.db, "replicas", ReplicaBalancer([replica]))
+    app = FastAPI()
+    app.add_middleware(
+        CacheMiddleware,
+        cache=Cache(Cache.MEMORY),
+        cached_endpoints={"/read": 60, "/uncached": 60},
+        bypass_endpoints=["/uncached"],
+    )
+
+    @app.get("/read")
+    @app.get("/uncached")
+    async def read(session: Annotated[AsyncSession, Depends(get_read_db)]):
+        async with session as db:
+            return {"database": db.bind.url.database}
+
+    client = TestClient(app)
+
+    assert client.get("/read").json() == {"database": "primary.sqlite"}
+    assert client.get("/read").json() == {"database": "primary.sqlite"}
+    assert client.get("/uncached").json() == {"database": "replica.sqlite"}
@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+import pytest
+from aiocache import Cache
+
+from src.services.analysis_cache import AnalysisCache, text_key
+
+RESULT = {"category": "critical", "confidence": 0.9, "keywords": ["error"]}
+
+
+def test_text_key_normalizes_whitespace_and_includes_version():
+    """Тест ключа: нормализация пробелов и зависимость от версии категоризации"""
+    assert text_key(" Disk\n error ", "v1") == text_key("Disk error", "v1")
+    assert text_key("Disk error", "v1") != text_key("disk error", "v1")
+    assert text_key("Disk error", "v1") != text_key("Disk error", "v2")
+
+
+@pytest.mark.asyncio
+async def test_results_are_served_from_process_cache():
+    """Тест попаданий в кэш процесса и промахов для новой версии"""
+    cache = AnalysisCache(l1_max_bytes=1 << 20, l1_ttl=60, ttl=60)
+
+    assert await cache.get_many(["disk error"], "v1") == [None]
+    await cache.set_many(["disk error"], [RESULT], "v1")
+
+    assert await cache.get_many(["disk  error", "other"], "v1") == [RESULT, None]
+    assert await cache.get_many(["disk error"], "v2") == [None]
+    stats = await cache.stats()
+    assert (stats["l1_hits"], stats["misses"]) == (1, 3)
+    assert stats["hit_ratio"] == 0.25
+
+
+@pytest.mark.asyncio
+async def test_shared_tier_is_visible_to_other_processes():
+    """Тест общего уровня: результат одного процесса доступен другому"""
+    shared = Cache(Cache.MEMORY)
+    writer = AnalysisCache(l1_max_bytes=1 << 20, l1_ttl=60, ttl=60, l2=shared)
+    reader = AnalysisCache(l1_max_bytes=1 << 20, l1_ttl=60, ttl=60, l2=shared)
+
+    await writer.get_many(["disk error"], "v1")
+    await writer.set_many(["disk error"], [RESULT], "v1")
+
+    assert await reader.get_many(["disk error"], "v1") == [RESULT]
+    assert await reader.get_many(["disk error"], "v1") == [RESULT]
+    stats = await reader.stats()
+    assert (stats["l1_hits"], stats["l2_hits"], stats["misses"]) == (1, 1, 0)
+    assert stats["shared"] == {"hits": 2, "misses": 1, "hit_ratio": 2 / 3}
+
+
+@pytest.mark.asyncio
+async def test_shared_stats_are_flushed_periodically():
+    """Тест переноса общих счетчиков в бэкенд не чаще раза в `stats_interval`"""
+    shared = Cache(Cache.MEMORY)
+    cache = AnalysisCache(
+        l1_max_bytes=1 << 20, l1_ttl=60, ttl=60, l2=shared, stats_interval=60
+    )
+    await cache.set_many(["disk error"], [RESULT], "v1")
+
+    with patch.object(shared, "increment", wraps=shared.increment) as increment:
+        for _ in range(10):
+            assert await cache.get_many(["disk error"], "v1") == [RESULT]
+        assert increment.await_count == 1
+
+        stats = await cache.stats()
+    assert stats["shared"] == {"hits": 10, "misses": 0, "hit_ratio": 1.0}
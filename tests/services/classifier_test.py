@@ -0,0 +1,96 @@
+import os
+import re
+
+import pytest
+
+from src.config.classifier import ClassifierConfig, ClassifierRule
+from src.services import classifier as classifier_module
+from src.services.classifier import RuleClassifier, trie_pattern
+
+
+@pytest.fixture
+def rule_classifier():
+    return RuleClassifier(
+        [
+            ClassifierRule(category="critical", keywords=["error", "failed"], weight=2),
+            ClassifierRule(category="warning", keywords=["warning", "error rate"]),
+            ClassifierRule(
+                category="billing", keywords=["invoice", "payment", "refund"]
+            ),
+        ]
+    )
+
+
+def test_trie_pattern_prefers_longest_keyword():
+    """Тест объединения общих префиксов и выбора самого длинного совпадения"""
+    pattern = re.compile(trie_pattern(["fail", "failed", "file"]))
+
+    assert pattern.findall("failed to fail on file") == ["failed", "fail", "file"]
+
+
+def test_classify_uses_weights(rule_classifier):
+    """Тест выбора категории с наибольшим суммарным весом ключевых слов"""
+    result = rule_classifier.classify("Payment FAILED: invoice refund")
+
+    assert result["category"] == "billing"
+    assert result["keywords"] == ["payment", "failed", "invoice"]
+    assert 0 < result["confidence"] < 1
+
+
+def test_classify_without_matches_returns_default(rule_classifier):
+    """Тест категории по умолчанию для текста без ключевых слов"""
+    assert rule_classifier.classify("hello world") == {
+        "category": "info",
+        "confidence": 0.8,
+        "keywords": [],
+    }
+
+
+def test_classify_batch_matches_single_classification(rule_classifier):
+    """Тест совпадения пакетной классификации с поштучной"""
+    texts = ["error", "", "invoice error", "warn\x00ing", "error rate is high"]
+
+    assert rule_classifier.classify_batch(texts) == [
+        rule_classifier.classify(text) for text in texts
+    ]
+
+
+def test_overlapping_keywords_match_like_substring_search():
+    """Тест поиска перекрывающихся и вложенных слов, как `word in text.lower()`"""
+    rules = [
+        ClassifierRule(category="critical", keywords=["failed", "fail"], weight=2),
+        ClassifierRule(category="warning", keywords=["led", "mentor"]),
+        ClassifierRule(category="billing", keywords=["payment", "pay"]),
+    ]
+    keywords = [keyword for rule in rules for keyword in rule.keywords]
+    texts = ["Job FAILED", "paymentor", "led", "pay later", "nothing here"]
+    rule_classifier = RuleClassifier(rules)
+
+    for text, result in zip(texts, rule_classifier.classify_batch(texts)):
+        expected = [keyword for keyword in keywords if keyword in text.lower()]
+        reference = rule_classifier._result(expected)
+        assert set(result["keywords"]) == set(expected[:3])
+        assert result["category"] == reference["category"]
+        assert result["confidence"] == pytest.approx(reference["confidence"])
+
+
+def test_rules_file_is_hot_reloaded(tmp_path, monkeypatch):
+    """Тест перекомпиляции правил при изменении файла"""
+    rules_file = tmp_path / "rules.yaml"
+    rules_file.write_text("rules:\n  - category: alpha\n    keywords: [foo]\n")
+    config = ClassifierConfig(rules_file=str(rules_file), reload_interval=0)
+    monkeypatch.setattr(classifier_module, "classifier", None)
+
+    classifier_module.init_classifier(config)
+    first = classifier_module.get_classifier()
+    assert first.classify("foo")["category"] == "alpha"
+
+    rules_file.write_text("rules:\n  - category: beta\n    keywords: [foo]\n")
+    os.utime(rules_file, (1, 1))
+    second = classifier_module.get_classifier()
+    assert second.classify("foo")["category"] == "beta"
+    assert second.version != first.version
+
+    rules_file.write_text("rules: [{category: broken}]\n")
+    os.utime(rules_file, (2, 2))
+    assert classifier_module.get_classifier() is second
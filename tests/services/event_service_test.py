@@ -0,0 +1,43 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import pytest
+
+from src.broadcast import MemoryBroadcaster
+from src.models import ProcessingStatus
+from src.services.event_service import EventService
+
+
+@pytest.fixture(autouse=True)
+def broadcaster():
+    previous = EventService.broadcaster()
+    EventService.init(MemoryBroadcaster())
+    yield EventService.broadcaster()
+    EventService.init(previous)
+
+
+@pytest.mark.asyncio
+async def test_stream_formats_events_and_keepalives():
+    """Тест потока SSE: приветствие, события пользователя и пинги"""
+    user_id, notification_id = uuid4(), uuid4()
+    stream = EventService.stream(user_id, keepalive=0.05)
+
+    assert await anext(stream) == ": connected\n\n"
+    await EventService.publish_status(
+        {notification_id: user_id}, ProcessingStatus.COMPLETED, category="info"
+    )
+    await EventService.publish_status({uuid4(): uuid4()}, ProcessingStatus.FAILED)
+
+    message = await anext(stream)
+    assert message.startswith("event: status\ndata: ")
+    assert json.loads(message.split("data: ", 1)[1]) == {
+        "event": "status",
+        "id": str(notification_id),
+        "user_id": str(user_id),
+        "status": "completed",
+        "category": "info",
+    }
+    assert await asyncio.wait_for(anext(stream), 1) == ": keepalive\n\n"
+    await stream.aclose()
+    assert EventService.broadcaster()._subscribers == {}
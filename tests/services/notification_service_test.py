@@ -5,9 +5,10 @@ from uuid import uuid4
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.exceptions import NotificationNotFoundExc
+from src.exceptions import InvalidCursorExc, NotificationNotFoundExc
 from src.models import Notification, ProcessingStatus
-from src.services.notification_service import NotificationService
+from src.services.cursor import encode_cursor
+from src.services.notification_service import CountMode, NotificationService
 
 
 @pytest.mark.asyncio
@@ -29,6 +30,35 @@ async def test_create_notification():
     mock_db.commit.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_create_many_notifications():
+    """Тест пакетного создания уведомлений одним INSERT-запросом"""
+    mock_db = AsyncMock(spec=AsyncSession)
+    created = [Notification(id=uuid4()) for _ in range(2)]
+    mock_scalars_result = MagicMock()
+    mock_scalars_result.all = MagicMock(return_value=created)
+    mock_db.scalars = AsyncMock(return_value=mock_scalars_result)
+
+    items = [{"user_id": uuid4(), "title": "T", "text": "Text"} for _ in range(2)]
+    result = await NotificationService.create_many(mock_db, items)
+
+    assert result == created
+    mock_db.scalars.assert_awaited_once()
+    insert_call = mock_db.scalars.call_args.args
+    assert "INSERT INTO notifications" in str(insert_call[0])
+    assert insert_call[1] == items
+    mock_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_many_empty():
+    """Тест пакетного создания без элементов"""
+    mock_db = AsyncMock(spec=AsyncSession)
+
+    assert await NotificationService.create_many(mock_db, []) == []
+    mock_db.commit.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_get_notification_found():
     """Тест получения существующего уведомления из базы данных"""
@@ -165,3 +195,82 @@ async def test_get_list_empty():
     assert len(notifications) == 0
     assert total == 0
     assert mock_db.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_list_with_cursor():
+    """Тест получения страницы уведомлений по курсору без OFFSET"""
+    mock_db = AsyncMock(spec=AsyncSession)
+
+    mock_count_result = AsyncMock()
+    mock_count_result.scalar = MagicMock(return_value=0)
+
+    mock_scalars_result = MagicMock()
+    mock_scalars_result.all = MagicMock(return_value=[])
+
+    mock_result = AsyncMock()
+    mock_result.scalars = MagicMock(return_value=mock_scalars_result)
+
+    mock_db.execute = AsyncMock(side_effect=[mock_count_result, mock_result])
+
+    cursor = encode_cursor(datetime.now(), uuid4())
+    await NotificationService.get_list(mock_db, after=cursor, offset=5)
+
+    query_str = str(mock_db.execute.call_args_list[1].args[0])
+    assert "(notifications.created_at, notifications.id) < " in query_str
+    assert "ORDER BY notifications.created_at DESC, notifications.id DESC" in query_str
+    assert "OFFSET" not in query_str
+
+
+@pytest.mark.asyncio
+async def test_get_list_with_invalid_cursor():
+    """Тест ошибки при поврежденном курсоре"""
+    mock_db = AsyncMock(spec=AsyncSession)
+    mock_count_result = AsyncMock()
+    mock_count_result.scalar = MagicMock(return_value=0)
+    mock_db.execute = AsyncMock(return_value=mock_count_result)
+
+    with pytest.raises(InvalidCursorExc):
+        await NotificationService.get_list(mock_db, after="broken")
+
+
+@pytest.mark.asyncio
+async def test_get_list_without_count():
+    """Тест получения списка уведомлений без подсчета общего количества"""
+    mock_db = AsyncMock(spec=AsyncSession)
+
+    mock_scalars_result = MagicMock()
+    mock_scalars_result.all = MagicMock(return_value=[Notification()])
+
+    mock_result = AsyncMock()
+    mock_result.scalars = MagicMock(return_value=mock_scalars_result)
+
+    mock_db.execute = AsyncMock(return_value=mock_result)
+
+    notifications, total = await NotificationService.get_list(
+        mock_db, count_mode=CountMode.NONE
+    )
+
+    assert len(notifications) == 1
+    assert total is None
+    assert mock_db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_list_with_window_count():
+    """Тест подсчета общего количества оконной функцией в запросе страницы"""
+    mock_db = AsyncMock(spec=AsyncSession)
+    rows = [(Notification(), 7), (Notification(), 7)]
+
+    mock_result = MagicMock()
+    mock_result.all = MagicMock(return_value=rows)
+    mock_db.execute = AsyncMock(return_value=mock_result)
+
+    notifications, total = await NotificationService.get_list(
+        mock_db, count_mode=CountMode.WINDOW
+    )
+
+    assert len(notifications) == 2
+    assert total == 7
+    assert mock_db.execute.await_count == 1
+    assert "count(*) OVER ()" in str(mock_db.execute.call_args.args[0])
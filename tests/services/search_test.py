@@ -0,0 +1,131 @@
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.migrations import migrate
+from src.models import Base, Notification
+from src.services import search
+from src.services.notification_service import NotificationService, Ordering
+
+
+@pytest_asyncio.fixture
+async def fts_session():
+    """Сессия SQLite с примененными миграциями и включенным бэкендом FTS5"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(migrate)
+        await conn.run_sync(search.init_search_backend, "fts5")
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    search.backend = search.BACKENDS["like"]
+    await engine.dispose()
+
+
+def fake_connection(dialect, scalar=None):
+    """Синхронное соединение, возвращающее `scalar` на любой запрос"""
+    conn = MagicMock()
+    conn.dialect.name = dialect
+    conn.execute.return_value.scalar.return_value = scalar
+    return conn
+
+
+def test_auto_backend_follows_dialect():
+    """Тест выбора поискового бэкенда по диалекту"""
+    search.init_search_backend(fake_connection("postgresql", 1), "auto")
+    assert search.get_search_backend().name == "trigram"
+    search.init_search_backend(fake_connection("mysql"), "auto")
+    assert search.get_search_backend().name == "like"
+
+
+@pytest.mark.asyncio
+async def test_auto_backend_falls_back_without_search_structures():
+    """Тест выбора `like`, если миграция не создала структуры поиска"""
+    search.init_search_backend(fake_connection("postgresql"), "auto")
+    assert search.get_search_backend().name == "like"
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(search.init_search_backend, "auto")
+    await engine.dispose()
+    assert search.get_search_backend().name == "like"
+
+
+@pytest.mark.asyncio
+async def test_fts_index_is_rebuilt_on_startup(fts_session):
+    """Тест перестроения индекса FTS5, ссылающегося на устаревшие rowid"""
+    obj = Notification(user_id=uuid4(), title="Disk Failure", text="disk is full")
+    fts_session.add(obj)
+    await fts_session.commit()
+    # Так rowid меняются после VACUUM: триггеры индекса не срабатывают
+    await fts_session.execute(text("UPDATE notifications SET rowid = rowid + 100"))
+    await fts_session.commit()
+    found, _ = await NotificationService.get_list(
+        fts_session, title="fail", title_strict=False
+    )
+    assert found == []
+
+    connection = await fts_session.connection()
+    await connection.run_sync(search.init_search_backend, "auto")
+    await fts_session.commit()
+
+    assert search.get_search_backend().name == "fts5"
+    found, _ = await NotificationService.get_list(
+        fts_session, title="fail", title_strict=False
+    )
+    assert [row.id for row in found] == [obj.id]
+
+
+@pytest.mark.asyncio
+async def test_fts_backend_filters(fts_session):
+    """Тест фильтрации по подстроке через теневую таблицу FTS5"""
+    user_id = uuid4()
+    fts_session.add_all(
+        [
+            Notification(user_id=user_id, title="Disk Failure", text="disk is full"),
+            Notification(user_id=user_id, title="Weekly digest", text="all good"),
+        ]
+    )
+    await fts_session.commit()
+
+    found, total = await NotificationService.get_list(
+        fts_session, title="FAIL", title_strict=False
+    )
+    assert [obj.title for obj in found] == ["Disk Failure"]
+    assert total == 1
+
+    found, _ = await NotificationService.get_list(fts_session, text="go")
+    assert [obj.title for obj in found] == ["Weekly digest"]
+
+    obj = found[0]
+    obj.title = "Failure report"
+    await fts_session.commit()
+    found, _ = await NotificationService.get_list(
+        fts_session, title="fail", title_strict=False
+    )
+    assert {obj.title for obj in found} == {"Disk Failure", "Failure report"}
+
+
+@pytest.mark.asyncio
+async def test_fts_backend_relevance_ordering(fts_session):
+    """Тест сортировки по релевантности"""
+    user_id = uuid4()
+    fts_session.add_all(
+        [
+            Notification(user_id=user_id, title="error", text="error error error"),
+            Notification(
+                user_id=user_id, title="note", text="one error in a long text"
+            ),
+        ]
+    )
+    await fts_session.commit()
+
+    found, _ = await NotificationService.get_list(
+        fts_session, text="error", ordering=Ordering.RELEVANCE
+    )
+
+    assert [obj.title for obj in found] == ["error", "note"]
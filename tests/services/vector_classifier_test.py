@@ -0,0 +1,97 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from src.config import Config
+from src.services import vector_classifier as vector_module
+from src.services.ai_service import AIService
+from src.services.vector_classifier import NaiveBayesClassifier
+
+
+@pytest.fixture
+def model():
+    return NaiveBayesClassifier.train(
+        [
+            "disk error on server",
+            "backup failed with exception",
+            "invoice paid",
+            "refund for payment",
+            "new comment on post",
+            "friend request accepted",
+        ],
+        ["critical", "critical", "billing", "billing", "social", "social"],
+        n_features=1024,
+    )
+
+
+def test_classify_batch_scores_all_categories(model):
+    """Тест выбора наиболее вероятной категории и ключевых слов"""
+    results = model.classify_batch(["payment invoice", "server exception", ""])
+
+    assert [result["category"] for result in results[:2]] == ["billing", "critical"]
+    assert results[0]["keywords"] == ["payment", "invoice"]
+    assert all(0 < result["confidence"] <= 1 for result in results)
+    assert results[2]["keywords"] == []
+
+
+def test_classify_batch_matches_single_classification(model, monkeypatch):
+    """Тест совпадения пакетной (в т.ч. по частям) классификации с поштучной"""
+    monkeypatch.setattr(vector_module, "CHUNK_SIZE", 2)
+    texts = ["invoice", "", "comment on invoice", "error", "unknown words"]
+
+    batch = model.classify_batch(texts)
+    single = [model.classify(text) for text in texts]
+
+    assert [r["category"] for r in batch] == [r["category"] for r in single]
+    assert [r["keywords"] for r in batch] == [r["keywords"] for r in single]
+    assert np.allclose(
+        [r["confidence"] for r in batch], [r["confidence"] for r in single]
+    )
+
+
+def test_save_and_load_memory_mapped(model, tmp_path):
+    """Тест сохранения модели и загрузки весов через memory-mapping"""
+    model.save(str(tmp_path))
+
+    loaded = NaiveBayesClassifier.load(str(tmp_path))
+
+    assert isinstance(loaded.weights, np.memmap)
+    assert loaded.categories == model.categories
+    assert loaded.version == model.version
+    assert loaded.classify_batch(["refund"]) == model.classify_batch(["refund"])
+
+
+@pytest.mark.skipif(
+    sys.platform == "win32", reason="Windows не заменяет отображенные в память файлы"
+)
+def test_save_replaces_files_under_loaded_model(model, tmp_path):
+    """Тест сохранения поверх загруженной модели: прежние веса остаются целыми"""
+    model.save(str(tmp_path))
+    loaded = NaiveBayesClassifier.load(str(tmp_path))
+    expected = np.array(loaded.weights)
+
+    retrained = NaiveBayesClassifier(
+        model.categories, np.zeros_like(model.weights), model.priors, "v2"
+    )
+    retrained.save(str(tmp_path))
+
+    assert np.array_equal(loaded.weights, expected)
+    assert NaiveBayesClassifier.load(str(tmp_path)).version == "v2"
+    assert sorted(os.listdir(tmp_path)) == ["meta.json", "priors.npy", "weights.npy"]
+
+
+def test_model_categorizes_texts_without_rule_matches(model, tmp_path, monkeypatch):
+    """Тест использования модели для текстов, не совпавших ни с одним правилом"""
+    model.save(str(tmp_path))
+    monkeypatch.setattr(Config.classifier, "model_path", str(tmp_path))
+    monkeypatch.setattr(vector_module, "model", None)
+
+    rule_match, fallback = AIService.classify_batch(
+        ["error in payment", "friend accepted"]
+    )
+
+    assert rule_match["category"] == "critical"
+    assert "error" in rule_match["keywords"]
+    assert fallback["category"] == "social"
@@ -0,0 +1,58 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src import tasks
+from src.broadcast import MemoryBroadcaster, RedisBroadcaster
+from src.services.event_service import EventService
+
+
+@pytest.mark.asyncio
+async def test_messages_are_delivered_to_channel_subscribers():
+    """Тест доставки сообщений всем подписчикам канала и только им"""
+    broadcaster = MemoryBroadcaster()
+
+    async with broadcaster.subscribe("a") as first, broadcaster.subscribe(
+        "a"
+    ) as second, broadcaster.subscribe("b") as other:
+        await broadcaster.publish("a", {"n": 1})
+
+        assert await first.get() == {"n": 1}
+        assert await second.get() == {"n": 1}
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(other.get(), 0.01)
+
+    assert broadcaster._subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest_messages():
+    """Тест ограниченной очереди подписчика: вытесняются самые старые сообщения"""
+    broadcaster = MemoryBroadcaster(queue_size=2)
+
+    async with broadcaster.subscribe("a") as subscription:
+        for n in range(3):
+            await broadcaster.publish("a", {"n": n})
+
+        assert [await subscription.get() for _ in range(2)] == [{"n": 1}, {"n": 2}]
+
+
+def test_redis_clients_are_closed_with_task_loops():
+    """Тест закрытия клиента Redis при завершении цикла событий задачи"""
+    broadcaster = RedisBroadcaster("redis://localhost")
+    clients = [AsyncMock(), AsyncMock()]
+
+    async def publish() -> None:
+        await broadcaster.publish("a", {"n": 1})
+
+    with patch("src.broadcast.Redis.from_url", side_effect=clients), patch.object(
+        EventService, "_broadcaster", broadcaster
+    ), patch.object(tasks.Config.worker, "runtime", "sync"):
+        tasks.run_async(publish)
+        tasks.run_async(publish)
+
+    assert broadcaster._clients == {}
+    for client in clients:
+        client.publish.assert_awaited_once()
+        client.aclose.assert_awaited_once()
@@ -0,0 +1,82 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from aiocache import Cache
+
+from src.cache import LRUCache, TieredCache
+
+
+def test_lru_cache_evicts_least_recently_used_by_size():
+    """Тест вытеснения давно не использованных записей при превышении лимита байт"""
+    lru = LRUCache(max_bytes=30, max_ttl=60)
+    lru.set("a", b"x" * 10)
+    lru.set("b", b"x" * 10)
+    assert lru.get("a") is not None
+
+    lru.set("c", b"x" * 10)
+
+    assert lru.get("a") is not None
+    assert lru.get("b") is None
+    assert lru.get("c") is not None
+    assert lru.size <= 30
+
+
+def test_lru_cache_caps_ttl():
+    """Тест ограничения времени жизни записи лимитом L1"""
+    lru = LRUCache(max_bytes=1024, max_ttl=5)
+    with patch("src.cache.time.monotonic", return_value=100.0):
+        lru.set("a", "value", ttl=3600)
+    with patch("src.cache.time.monotonic", return_value=104.0):
+        assert lru.get("a") == "value"
+    with patch("src.cache.time.monotonic", return_value=106.0):
+        assert lru.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_serves_hits_from_l1():
+    """Тест обслуживания повторных чтений из L1 и подсчета статистики по уровням"""
+    l2 = Cache(Cache.MEMORY)
+    cache = TieredCache(l2, l1_max_bytes=1024, l1_ttl=60)
+    await l2.set("key", "value")
+
+    assert await cache.get("key") == "value"
+    await l2.delete("key")
+    assert await cache.get("key") == "value"
+    assert await cache.get("missing") is None
+
+    assert cache.stats()["l1_hits"] == 1
+    assert cache.stats()["l1_misses"] == 2
+    assert cache.stats()["l2_hits"] == 1
+    assert cache.stats()["l2_misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_remembers_absent_keys_in_l1():
+    """Тест запоминания отсутствующих в L2 ключей: повторное чтение без L2"""
+    l2 = Cache(Cache.MEMORY)
+    cache = TieredCache(l2, l1_max_bytes=1024, l1_ttl=5)
+
+    assert await cache.multi_get(["tag:all", "key"]) == [None, None]
+    await l2.set("tag:all", 1)
+    assert await cache.multi_get(["tag:all", "key"]) == [None, None]
+    assert cache.stats()["l2_misses"] == 2
+
+    await cache.set("key", "value")
+    assert await cache.get("key") == "value"
+    with patch("src.cache.time.monotonic", return_value=time.monotonic() + 6):
+        assert await cache.get("tag:all") == 1
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_increment_updates_both_tiers():
+    """Тест записи инкремента в L2 с обновлением L1"""
+    l2 = Cache(Cache.MEMORY)
+    cache = TieredCache(l2, l1_max_bytes=1024, l1_ttl=60)
+
+    assert await cache.multi_get(["counter"]) == [None]
+    await cache.increment("counter")
+    await cache.increment("counter")
+
+    assert await cache.multi_get(["counter"]) == [2]
+    assert await l2.get("counter") == 2
@@ -0,0 +1,68 @@
+import pytest
+
+from src.cache_codec import EntryCodec, create_codec
+
+
+def make_entry(content: bytes) -> dict:
+    return {
+        "content": content,
+        "status_code": 200,
+        "media_type": "application/json",
+        "etag": '"0123456789abcdef"',
+        "tags": [3, 0],
+        "expires_at": 1700000000.5,
+    }
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_entry_roundtrip(compression):
+    """Тест кодирования и декодирования записи без потери полей"""
+    codec = EntryCodec(compression=compression, compress_threshold=0)
+    entry = make_entry(b'{"items": []}' * 100)
+
+    assert codec.decode(codec.encode(entry)) == entry
+
+
+def test_small_bodies_are_not_compressed():
+    """Тест хранения тел меньше порога без сжатия"""
+    codec = EntryCodec(compression="gzip", compress_threshold=1024)
+    small, large = make_entry(b"x" * 100), make_entry(b"x" * 4096)
+
+    assert small["content"] in codec.encode(small)
+    assert len(codec.encode(large)) < 200
+
+
+def test_foreign_values_are_treated_as_missing():
+    """Тест пропуска значений в другом формате (например, старых записей кэша)"""
+    codec = EntryCodec()
+
+    assert codec.decode({"content": b""}) is None
+    assert codec.decode(b"\x00garbage") is None
+
+
+def test_measure_mode_reports_bytes_and_timings_per_route():
+    """Тест статистики размера записей и времени кодирования по маршрутам"""
+    codec = EntryCodec(compression="gzip", compress_threshold=0, measure=True)
+    raw = codec.encode(make_entry(b"x" * 4096), route="/items")
+    codec.decode(raw, route="/items")
+
+    stats = codec.metrics.snapshot()["/items"]
+    assert stats["writes"] == 1 and stats["reads"] == 1
+    assert stats["raw_bytes_per_key"] == 4096
+    assert stats["stored_bytes_per_key"] == len(raw)
+    assert stats["encode_us"] > 0 and stats["decode_us"] > 0
+
+
+def test_msgpack_codec_roundtrip():
+    """Тест формата записи на основе msgpack"""
+    pytest.importorskip("msgpack")
+    codec = create_codec("msgpack", compression="gzip", compress_threshold=0)
+    entry = make_entry(b"payload" * 100)
+
+    assert codec.decode(codec.encode(entry)) == entry
+
+
+def test_unknown_codec_is_rejected():
+    """Тест ошибки при неизвестном формате записи"""
+    with pytest.raises(ValueError):
+        create_codec("pickle")
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+from src.runner import AsyncRunner
+
+
+def test_runner_reuses_one_event_loop():
+    """Тест выполнения всех корутин в одном долгоживущем цикле событий"""
+    runner = AsyncRunner(max_in_flight=4)
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    try:
+        assert runner.run(current_loop()) is runner.run(current_loop())
+    finally:
+        runner.stop()
+
+
+def test_runner_bounds_in_flight_coroutines():
+    """Тест конкурентного выполнения корутин не более `max_in_flight` одновременно"""
+    runner = AsyncRunner(max_in_flight=3)
+    peak = 0
+
+    async def job():
+        nonlocal peak
+        peak = max(peak, runner.in_flight)
+        await asyncio.sleep(0.02)
+        return threading.current_thread().name
+
+    try:
+        futures = [runner.submit(job()) for _ in range(10)]
+        names = {future.result(timeout=5) for future in futures}
+    finally:
+        runner.stop()
+
+    assert names == {"async-runner"}
+    assert peak == 3
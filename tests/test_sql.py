@@ -0,0 +1,21 @@
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from src.services.notification_service import NotificationService
+from src.sql import Explain
+
+
+def test_explain_inlines_parameters():
+    """Тест подстановки значений параметров во вложенный запрос `EXPLAIN`"""
+    user_id = uuid4()
+    query, _ = NotificationService.build_query(
+        user_id=user_id, created_at_start=datetime(2024, 1, 1)
+    )
+
+    sql = str(Explain(query).compile(dialect=postgresql.asyncpg.dialect()))
+
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert f"'{user_id}'" in sql
+    assert "'2024-01-01 00:00:00'" in sql